@@ -0,0 +1,123 @@
+#!/usr/bin/python3
+"""
+Stripe decryption throughput of the windowed engine in
+deezspot.deezloader.__download_utils__ against the previous per-block
+implementation.
+"""
+
+import io
+import os
+import sys
+import time
+from binascii import a2b_hex
+from Crypto.Cipher import Blowfish
+
+# Runnable from any directory of a checkout, without installing deezspot
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [path for path in (_HERE, os.path.dirname(_HERE)) if path not in sys.path]
+
+from deezspot.deezloader.__download_utils__ import build_decrypt_stage, decrypt_blowfish_stripes
+
+# BF_CBC_STRIPE layout, as in __download_utils__
+STRIPE_SIZE = 2048
+STRIPE_PERIOD = STRIPE_SIZE * 3
+IDK = a2b_hex("0001020304050607")
+
+
+def legacy_decrypt_blowfish(crypted_audio, bf_key, output_file):
+    """
+    The previous per-block stripe decryptor, the baseline of this benchmark:
+    it re-slices the buffer and rebuilds the CBC cipher for every stripe.
+    """
+    block_size = STRIPE_SIZE
+    buffer = bytearray()
+    block_count = 0
+    for chunk in crypted_audio:
+        if not chunk:
+            continue
+        buffer.extend(chunk)
+        while len(buffer) >= block_size:
+            block = buffer[:block_size]
+            buffer = buffer[block_size:]
+            if block_count % 3 == 0:
+                cipher = Blowfish.new(bf_key.encode(), Blowfish.MODE_CBC, IDK)
+                block = cipher.decrypt(block)
+            output_file.write(block)
+            block_count += 1
+    if buffer:
+        output_file.write(buffer)
+
+def encrypt_blowfish_stripes(data, bf_key):
+    """
+    Encrypt plain audio with the BF_CBC_STRIPE scheme, e.g. to build local
+    fixtures for benchmarks.
+
+    Args:
+        data: Plain bytes
+        bf_key: The Blowfish key as a string
+
+    Returns:
+        bytes: The striped, encrypted data
+    """
+    out = bytearray(data)
+    view = memoryview(out)
+    for offset in range(0, len(out) - STRIPE_SIZE + 1, STRIPE_PERIOD):
+        cipher = Blowfish.new(bf_key.encode(), Blowfish.MODE_CBC, IDK)
+        view[offset:offset + STRIPE_SIZE] = cipher.encrypt(view[offset:offset + STRIPE_SIZE])
+    return bytes(out)
+
+def benchmark_blowfish_decrypt(size_mb=16, chunk_size=2048, repeat=3):
+    """
+    Compare stripe decryption throughput of the windowed engine against the
+    previous per-block implementation on random, locally encrypted data:
+
+        python benchmarks/blowfish_decrypt.py [size_mb]
+
+    Args:
+        size_mb: Size of the generated fixture in MB
+        chunk_size: Size of the chunks fed to the decryptors (as iter_content would)
+        repeat: Runs per implementation; the best run is kept
+
+    Returns:
+        dict: Throughput in MB/s for both implementations and the speedup
+    """
+    bf_key = build_decrypt_stage({'encryption_type': 'blowfish', 'track_id': '3135556'}).bf_key
+    size = int(size_mb * 1024 * 1024)
+    encrypted = encrypt_blowfish_stripes(os.urandom(size), bf_key)
+
+    def chunks():
+        view = memoryview(encrypted)
+        for offset in range(0, size, chunk_size):
+            yield view[offset:offset + chunk_size]
+
+    def best_rate(decrypt):
+        best = None
+        for _ in range(repeat):
+            with open(os.devnull, 'wb') as sink:
+                start = time.perf_counter()
+                decrypt(chunks(), bf_key, sink)
+                elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return size / (1024 * 1024) / best
+
+    # Both implementations must produce the same plaintext
+    legacy_out, engine_out = io.BytesIO(), io.BytesIO()
+    legacy_decrypt_blowfish(chunks(), bf_key, legacy_out)
+    decrypt_blowfish_stripes(chunks(), bf_key, engine_out)
+    if legacy_out.getvalue() != engine_out.getvalue():
+        raise AssertionError("Stripe decryption engine output differs from the legacy implementation")
+
+    legacy_rate = best_rate(legacy_decrypt_blowfish)
+    engine_rate = best_rate(decrypt_blowfish_stripes)
+
+    return {
+        "size_mb": size_mb,
+        "chunk_size": chunk_size,
+        "legacy_mb_s": round(legacy_rate, 2),
+        "engine_mb_s": round(engine_rate, 2),
+        "speedup": round(engine_rate / legacy_rate, 2)
+    }
+
+
+if __name__ == "__main__":
+    print(benchmark_blowfish_decrypt(*(float(arg) for arg in sys.argv[1:2])))
@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+"""
+Decryption throughput of the opt-in process pool (see
+deezspot.enable_process_decryption) against the in-thread engine.
+
+Only single CPU hardware was available when the pool was written, so
+multi-core scaling is still unmeasured. On one CPU there is nothing to
+scale: 4 concurrent 32 MB streams, in MB/s (`process_decrypt.py 32 1 2 4`),
+
+    cpus  in-thread  1 worker  2 workers  4 workers
+    1     180        165       217        217
+
+and a single 64 MB stream gave 188 in-thread vs 196 with one worker.
+Differences of this size are within run-to-run noise (another run gave
+247 vs 200). Run it on the target hardware before relying on
+enable_process_decryption for speed.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Runnable from any directory of a checkout, without installing deezspot
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [path for path in (_HERE, os.path.dirname(_HERE)) if path not in sys.path]
+
+from deezspot.deezloader.__download_utils__ import build_decrypt_stage, decryptfile
+from deezspot.deezloader.decrypt_pool import (
+    disable_process_decryption,
+    enable_process_decryption,
+)
+from blowfish_decrypt import encrypt_blowfish_stripes
+
+
+def benchmark_process_decrypt(size_mb=64, process_counts=None, streams=None):
+    """
+    Measure decryption throughput scaling with worker processes on locally
+    generated BF_CBC_STRIPE fixtures, against the in-thread engine:
+
+        python benchmarks/process_decrypt.py [size_mb [worker counts...]]
+
+    Args:
+        size_mb: Size of each fixture in MB
+        process_counts: Worker counts to try (defaults to 1, 2, 4 ... up to the CPU count)
+        streams: Number of downloads decrypted concurrently (defaults to the largest worker count)
+
+    Returns:
+        dict: MB/s for the in-thread engine and for each worker count
+    """
+    cpus = os.cpu_count() or 1
+    if not process_counts:
+        process_counts = sorted({1, cpus} | {2 ** i for i in range(1, cpus.bit_length()) if 2 ** i <= cpus})
+    streams = streams or max(process_counts)
+
+    ids = {'encryption_type': 'blowfish', 'track_id': '3135556'}
+    stage = build_decrypt_stage(ids)
+    size = int(size_mb * 1024 * 1024)
+    plain = os.urandom(size)
+    encrypted = encrypt_blowfish_stripes(plain, stage.bf_key)
+    total_mb = size * streams / (1024 * 1024)
+
+    def chunks():
+        view = memoryview(encrypted)
+        for offset in range(0, size, 65536):
+            yield view[offset:offset + 65536]
+
+    results = {"size_mb": size_mb, "streams": streams, "cpus": cpus}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = [os.path.join(tmp_dir, f"{i}.mp3") for i in range(streams)]
+
+        def run(decrypt_one):
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=streams) as executor:
+                list(executor.map(decrypt_one, paths))
+            return round(total_mb / (time.perf_counter() - start), 2)
+
+        disable_process_decryption()
+        results["in_thread_mb_s"] = run(lambda path: decryptfile(chunks(), ids, path))
+
+        for count in process_counts:
+            pool = enable_process_decryption(processes=count)
+            # Warm the workers up so process start-up is not measured
+            pool.decrypt_to_file(chunks(), stage, paths[0])
+            results[f"processes_{count}_mb_s"] = run(lambda path: pool.decrypt_to_file(chunks(), stage, path))
+
+            with open(paths[-1], 'rb') as f:
+                if f.read() != plain:
+                    raise AssertionError(f"Process decryption with {count} workers produced a different output")
+
+        disable_process_decryption()
+
+    return results
+
+
+if __name__ == "__main__":
+    # process_decrypt.py [size_mb [worker counts...]]
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 64
+    print(benchmark_process_decrypt(size_mb, [int(arg) for arg in sys.argv[2:]] or None))
@@ -6,9 +6,15 @@ Deezspot - A Deezer/Spotify downloading library with proper logging support.
 
 import logging
 from deezspot.libutils.logging_utils import configure_logger, logger
+from deezspot.libutils import http_client
+from deezspot.libutils import library_index
+from deezspot.libutils import cover_cache
+from deezspot.libutils import write_tags
+from deezspot.libutils import id_map
 
 # Export key functionality
 from deezspot.deezloader import DeeLogin
+from deezspot.deezloader.decrypt_pool import enable_process_decryption, disable_process_decryption
 from deezspot.models.download import Track, Album, Playlist, Smart, Episode
 
 __version__ = "1.2.0"
@@ -38,3 +44,100 @@ def enable_file_logging(filepath, level=logging.INFO):
         level: Logging level (defaults to INFO)
     """
     configure_logger(level=level, to_file=filepath, to_console=True)
+
+def configure_http_client(pool_size=None, max_retries=None, backoff_factor=None, timeout=None):
+    """
+    Tune the shared HTTP client used for Deezer API, media and cover requests.
+    
+    Args:
+        pool_size: Keep-alive connections per host
+        max_retries: Retries on connection errors and 429/5xx responses
+        backoff_factor: Exponential backoff factor between retries
+        timeout: Default request timeout in seconds
+    """
+    http_client.configure(
+        pool_size=pool_size,
+        max_retries=max_retries,
+        backoff_factor=backoff_factor,
+        timeout=timeout
+    )
+
+def http_pool_stats():
+    """
+    Get connection pool statistics of the shared HTTP client.
+    
+    Returns:
+        dict: Request/error counters, configuration and per-host pool usage
+    """
+    return http_client.pool_stats()
+
+def configure_library_index(db_path=None):
+    """
+    Choose where the library index used by skip detection is stored.
+    
+    Args:
+        db_path: SQLite file path, ":memory:" to not persist it, or None for
+                 the default location in the user's cache directory
+    """
+    library_index.configure_library_index(db_path)
+
+def index_library(root, background=True):
+    """
+    Index the audio files below a library root so later skip checks are lookups.
+    
+    Args:
+        root: Library root directory
+        background: Scan in a background thread instead of blocking
+    
+    Returns:
+        Thread | int: The scanning thread, or the number of files read
+    """
+    index = library_index.get_library_index()
+    if background:
+        return index.warm(root)
+    return index.scan_tree(root)
+
+def configure_cover_cache(directory=None, memory_bytes=None, disk_bytes=None):
+    """
+    Tune the cover art cache shared by all downloads.
+    
+    Args:
+        directory: On-disk store location (defaults to ~/.cache/deezspot/covers)
+        memory_bytes: Size limit of the in-memory LRU
+        disk_bytes: Size limit of the on-disk store
+    """
+    cover_cache.configure_cover_cache(directory, memory_bytes, disk_bytes)
+
+def count_tag_writes(enabled=True):
+    """
+    Start or stop counting tag writes per file, for tag_write_stats.
+    Counting is off by default.
+    
+    Args:
+        enabled: Count from now on; False stops and drops the counters
+    """
+    write_tags.count_tag_writes(enabled)
+
+def tag_write_stats(reset=False):
+    """
+    Count the tag writes made by downloads since count_tag_writes was
+    called, e.g. to check that every file was tagged exactly once.
+    
+    Args:
+        reset: Clear the counters after reading them
+    
+    Returns:
+        dict: Total writes, distinct files and the files tagged more than once
+    """
+    return write_tags.tag_write_stats(reset)
+
+def configure_id_map(db_path=None, miss_ttl=None):
+    """
+    Choose where the Spotify to Deezer id mapping used by conversions is stored.
+    
+    Args:
+        db_path: SQLite file path, ":memory:" to not persist it, or None for
+                 the default location in the user's cache directory
+        miss_ttl: Seconds before a track without Deezer equivalent is looked up again
+    """
+    id_map.configure_id_map(db_path, miss_ttl)
@@ -8,12 +8,14 @@ from deezspot.libutils.audio_converter import convert_audio
 from deezspot.deezloader.dee_api import API
 from deezspot.deezloader.deegw_api import API_GW
 from deezspot.deezloader.deezer_settings import qualities
-from deezspot.libutils.others_settings import answers
-from deezspot.deezloader.__download_utils__ import decryptfile, gen_song_hash
+from deezspot.libutils.others_settings import answers, stock_stream_tags
+from deezspot.deezloader.__download_utils__ import decryptfile_resumable, gen_song_hash
+from deezspot.deezloader.media_resolver import media_resolver, media_format, quality_ladder
 from deezspot.exceptions import (
     TrackNotFound,
     NoRightOnMedia,
     QualityNotFound,
+    MediaUrlExpired,
 )
 from deezspot.models.download import (
     Track,
@@ -46,6 +48,7 @@ from deezspot.libutils.taggers import (
     enhance_metadata_with_image, add_deezer_enhanced_metadata, add_spotify_enhanced_metadata, process_and_tag_track,
     save_cover_image_for_track
 )
+from deezspot.libutils.write_tags import build_tag_header
 from mutagen.flac import FLAC
 from mutagen.mp3 import MP3
 from mutagen.id3 import ID3
@@ -54,6 +57,7 @@ from mutagen import File
 from deezspot.libutils.logging_utils import logger, ProgressReporter, report_progress
 from deezspot.libutils.skip_detection import check_track_exists
 from deezspot.libutils.cleanup_utils import register_active_download, unregister_active_download
+from deezspot.libutils.concurrency import run_in_order, Prefetcher
 from deezspot.libutils.audio_converter import AUDIO_FORMATS # Added for parse_format_string
 from deezspot.models.callback.callbacks import (
     trackCallbackObject,
@@ -157,9 +161,16 @@ class Download_JOB:
     def check_sources(
         cls,
         infos_dw: list,
-        quality_download: str  
+        quality_download: str,
+        negotiate: bool = False
     ) -> list:
-        from deezspot.deezloader.deegw_api import API_GW
+        """
+        Get the media of each track for quality_download.
+
+        With negotiate, every track's quality ladder is sent in one get_url
+        request and each track gets its best available quality instead
+        (see media_resolver.quality_ladder).
+        """
         # Preprocess episodes separately
         medias = []
         for track in infos_dw:
@@ -167,41 +178,15 @@ class Download_JOB:
                 media_json = cls.__get_url(track, quality_download)
                 medias.append(media_json)
 
-        # For non-episodes, gather tokens
+        # Non-episodes go through the shared resolver: batched, concurrent
+        # get_url requests whose answers are cached until the urls expire
         non_episode_tracks = [c_track for c_track in infos_dw if c_track.get('__TYPE__') != 'episode']
-        tokens = [check_track_token(c_track) for c_track in non_episode_tracks]
-
-        def chunk_list(lst, chunk_size):
-            """Yield successive chunk_size chunks from lst."""
-            for i in range(0, len(lst), chunk_size):
-                yield lst[i:i + chunk_size]
-
-        # Prepare list for media results for non-episodes
-        non_episode_medias = []
-
-        # Split tokens into chunks of 25
-        for tokens_chunk in chunk_list(tokens, 25):
-            try:
-                chunk_medias = API_GW.get_medias_url(tokens_chunk, quality_download)
-                # Post-process each returned media in the chunk
-                for idx in range(len(chunk_medias)):
-                    if "errors" in chunk_medias[idx]:
-                        # Do not fallback to legacy URL; mark as unavailable for this quality
-                        chunk_medias[idx] = {"media": []}
-                    else:
-                        if not chunk_medias[idx]['media']:
-                            # Do not fallback to legacy URL; mark as unavailable
-                            chunk_medias[idx] = {"media": []}
-                        elif len(chunk_medias[idx]['media'][0]['sources']) == 1:
-                            # Keep single-source media as-is; do not fallback
-                            pass
-                non_episode_medias.extend(chunk_medias)
-            except NoRightOnMedia:
-                for c_track in tokens_chunk:
-                    # Find the corresponding full track info from non_episode_tracks
-                    track_index = len(non_episode_medias)
-                    c_media_json = cls.__get_url(non_episode_tracks[track_index], quality_download)
-                    non_episode_medias.append(c_media_json)
+        resolve = media_resolver.resolve_ladder if negotiate else media_resolver.get
+        non_episode_medias = resolve(
+            non_episode_tracks,
+            quality_download,
+            fallback=cls.__get_url
+        ) if non_episode_tracks else []
 
         # Now, merge the medias. We need to preserve the original order.
         # We'll create a final list that contains media for each track in infos_dw.
@@ -218,6 +203,56 @@ class Download_JOB:
 
         return final_medias
 
+    @classmethod
+    def resolve_media(
+        cls,
+        infos_dw: list,
+        quality_download: str,
+        negotiate: bool = False
+    ) -> None:
+        """
+        Resolve the media URLs of every track that has none yet, before any
+        download starts: media_resolver sends them in concurrent chunks of
+        CHUNK_SIZE tracks instead of one request per few tracks.
+
+        Args:
+            infos_dw: infos_dw items; they receive their 'media_url'
+            quality_download: Requested quality key
+            negotiate: Negotiate each track's best available quality (see check_sources)
+        """
+        missing = [c_infos for c_infos in infos_dw if 'media_url' not in c_infos]
+        if missing:
+            for c_infos, media in zip(missing, cls.check_sources(missing, quality_download, negotiate)):
+                c_infos['media_url'] = media
+
+    @classmethod
+    def prefetch(cls, entries: list) -> None:
+        """
+        Warm what tracks need once downloaded: covers (into the shared cover
+        cache) and lyrics (into the API_GW lyrics cache).
+
+        Args:
+            entries: (infos_dw item, track preferences) pairs
+        """
+        from deezspot.deezloader.deegw_api import API_GW
+        from deezspot.libutils.metadata_converter import _get_best_image_url
+        from deezspot.libutils.taggers import fetch_and_process_image
+
+        for c_infos, c_preferences in entries:
+            try:
+                spo_track = getattr(c_preferences, 'spotify_track_obj', None)
+                if getattr(c_preferences, 'spotify_metadata', False) and spo_track is not None:
+                    album = getattr(spo_track, 'album', None)
+                    if album is not None and getattr(album, 'images', None):
+                        fetch_and_process_image(_get_best_image_url(album.images, 'spotify'))
+                    continue
+                if c_infos.get('ALB_PICTURE'):
+                    API.choose_img(c_infos['ALB_PICTURE'])
+                if c_infos.get('LYRICS_ID', 0) != 0:
+                    API_GW.get_lyric(c_preferences.ids)
+            except Exception as e:
+                logger.debug(f"Prefetch for track {c_infos.get('SNG_ID')} incomplete: {e}")
+
 class EASY_DW:
     progress_reporter = None
     
@@ -305,6 +340,10 @@ class EASY_DW:
 
         self.__c_quality = qualities[self.__quality_download]
         self.__fallback_ids = self.__ids
+        # Enhanced tagging metadata, built once by __get_tagging_metadata
+        self.__tagging_metadata = None
+        # Tags streamed in front of the audio, see __prepare_tag_header
+        self.__tag_header = None
 
         self.__set_quality()
         self.__write_track()
@@ -445,27 +484,57 @@ class EASY_DW:
         self.__c_episode.md5_image = self.__ids
         self.__c_episode.set_fallback_ids(self.__fallback_ids)
 
-    def easy_dw(self) -> Track:
-        # Get image URL and enhance metadata
-        pic = None
-        if self.__infos_dw.get('__TYPE__') == 'episode':
-            pic = self.__infos_dw.get('EPISODE_IMAGE_MD5', '')
-            image = API.choose_img(pic)
-        else:
-            # If using Spotify metadata, prefer the best Spotify image URL from the track object
-            if getattr(self.__preferences, 'spotify_metadata', False) and hasattr(self.__track_obj, 'album') and getattr(self.__track_obj.album, 'images', None):
-                from deezspot.libutils.metadata_converter import _get_best_image_url
-                image = _get_best_image_url(self.__track_obj.album.images, 'spotify')
+    def __get_tagging_metadata(self) -> dict:
+        """Contributors, lyrics and cover bytes, gathered once per track."""
+        from deezspot.deezloader.deegw_api import API_GW
+        if self.__tagging_metadata is None:
+            if getattr(self.__preferences, 'spotify_metadata', False):
+                self.__tagging_metadata = add_spotify_enhanced_metadata(self.__song_metadata, self.__track_obj)
             else:
-                pic = self.__infos_dw['ALB_PICTURE']
-                image = API.choose_img(pic)
-        self.__song_metadata['image'] = image
-        
-        # Process image data using unified utility
-        self.__song_metadata = enhance_metadata_with_image(self.__song_metadata)
-        song = f"{self.__song_metadata['music']} - {self.__song_metadata['artist']}"
+                self.__tagging_metadata = add_deezer_enhanced_metadata(
+                    self.__song_metadata,
+                    self.__infos_dw,
+                    self.__ids,
+                    API_GW
+                )
+        return self.__tagging_metadata
+
+    def __prepare_tag_header(self):
+        """
+        Render the tags ahead of the download so they are written with the
+        audio, unless the file is converted afterwards (the converted file
+        is tagged instead).
+        """
+        self.__tag_header = None
+        if not stock_stream_tags or self.__convert_to:
+            return None
+        self.__tag_header = build_tag_header(self.__get_tagging_metadata(), self.__file_format)
+        return self.__tag_header
+
+    def __tag_track(self, save_cover: bool = False) -> None:
+        """Write the tags of the final file in a single pass."""
+        use_spotify = getattr(self.__preferences, 'spotify_metadata', False)
+        metadata = self.__get_tagging_metadata()
+        if self.__tag_header is not None and self.__tag_header.applied:
+            # Already written in front of the audio while it streamed
+            self.__c_track.tags = metadata
+            save_cover_image_for_track(metadata, self.__c_track.song_path, save_cover)
+            return
+        process_and_tag_track(
+            track=self.__c_track,
+            metadata_dict=metadata,
+            source_type='spotify' if use_spotify else 'deezer',
+            save_cover=save_cover
+        )
+
+    def skip_if_exists(self) -> Track:
+        """
+        Check the library for the track before anything is fetched for it.
 
-        # Check if track already exists based on metadata
+        Returns:
+            Track: The skipped Track pointing at the existing file (reported as
+                   skipped), or None if the track has to be downloaded
+        """
         current_title = self.__song_metadata['music']
         current_album = self.__song_metadata['album']
         current_artist = self.__song_metadata.get('artist') # For logging
@@ -478,7 +547,9 @@ class EASY_DW:
             title=current_title,
             album=current_album,
             convert_to=self.__convert_to, # User's target conversion format
-            logger=logger
+            logger=logger,
+            isrc=self.__song_metadata.get('isrc'),
+            platform_id=self.__song_metadata.get('deezspot_id')
         )
 
         if exists and existing_file_path:
@@ -514,6 +585,33 @@ class EASY_DW:
             self.__c_track = skipped_item
             return self.__c_track
 
+        return None
+
+    def easy_dw(self) -> Track:
+        # Check if track already exists based on metadata, before the cover is fetched
+        skipped_item = self.skip_if_exists()
+        if skipped_item:
+            return skipped_item
+
+        # Get image URL and enhance metadata
+        pic = None
+        if self.__infos_dw.get('__TYPE__') == 'episode':
+            pic = self.__infos_dw.get('EPISODE_IMAGE_MD5', '')
+            image = API.choose_img(pic)
+        else:
+            # If using Spotify metadata, prefer the best Spotify image URL from the track object
+            if getattr(self.__preferences, 'spotify_metadata', False) and hasattr(self.__track_obj, 'album') and getattr(self.__track_obj.album, 'images', None):
+                from deezspot.libutils.metadata_converter import _get_best_image_url
+                image = _get_best_image_url(self.__track_obj.album.images, 'spotify')
+            else:
+                pic = self.__infos_dw['ALB_PICTURE']
+                image = API.choose_img(pic)
+        self.__song_metadata['image'] = image
+        
+        # Process image data using unified utility
+        self.__song_metadata = enhance_metadata_with_image(self.__song_metadata)
+        song = f"{self.__song_metadata['music']} - {self.__song_metadata['artist']}"
+
         # Initialize success to False for the item being processed
         if self.__infos_dw.get('__TYPE__') == 'episode':
             if hasattr(self, '_EASY_DW__c_episode') and self.__c_episode:
@@ -620,36 +718,73 @@ class EASY_DW:
             raise TrackNotFound(message=final_error_msg, url=current_link_attr)
 
                 # If we reach here, the item should be successful and not skipped.
+        # Tags were already written by download_try / download_episode_try
         if current_item.success:
             if self.__infos_dw.get('__TYPE__') != 'episode' and pic: # Assuming pic is for tracks
                 current_item.md5_image = pic # Set md5_image for tracks
-            # Apply tags using unified utility with Deezer or Spotify enhancements
-            from deezspot.deezloader.deegw_api import API_GW
-            use_spotify = getattr(self.__preferences, 'spotify_metadata', False)
-            if use_spotify:
-                enhanced_metadata = add_spotify_enhanced_metadata(self.__song_metadata, self.__track_obj)
-                process_and_tag_track(
-                    track=current_item,
-                    metadata_dict=enhanced_metadata,
-                    source_type='spotify'
-                )
-            else:
-                enhanced_metadata = add_deezer_enhanced_metadata(
-                    self.__song_metadata,
-                    self.__infos_dw,
-                    self.__ids,
-                    API_GW
-                )
-                process_and_tag_track(
-                    track=current_item,
-                    metadata_dict=enhanced_metadata,
-                    source_type='deezer'
-                )
         
         return current_item
 
+    def __open_media_sources(self, media_list, offset=0):
+        """
+        Race every source of a get_url media list, plus its CDN mirrors.
+
+        Args:
+            media_list: The 'media' entries of a get_url response
+            offset: Byte offset to resume from with a Range request
+
+        Urls the CDN refuses as expired are resolved again once, and the
+        fresh media replaces infos_dw['media_url'].
+
+        Returns:
+            tuple: (AudioStream or None, last error or None)
+        """
+        from deezspot.deezloader.deegw_api import API_GW
+        song_links = [
+            src.get('url')
+            for media_entry in media_list
+            for src in (media_entry.get('sources') or [])
+            if src.get('url')
+        ]
+        if not song_links:
+            return None, None
+        try:
+            return API_GW.open_best_source(song_links, offset), None
+        except MediaUrlExpired as e:
+            if self.__infos_dw.get('__TYPE__') == 'episode':
+                return None, e
+            # The cached urls went stale: resolve this track again, once
+            media_resolver.invalidate(check_track_token(self.__infos_dw))
+            quality = media_format({'media': media_list}) or self.__quality_download
+            logger.debug(f"Media urls of {self.__song_metadata['music']} expired, resolving {quality} again")
+            media = Download_JOB.check_sources([self.__infos_dw], quality)
+            if not media or not media[0].get('media'):
+                return None, e
+            self.__infos_dw['media_url'] = media[0]
+            song_links = [
+                src.get('url')
+                for media_entry in media[0]['media']
+                for src in (media_entry.get('sources') or [])
+                if src.get('url')
+            ]
+        except Exception as e:
+            return None, e
+        try:
+            return API_GW.open_best_source(song_links, offset), None
+        except Exception as e:
+            return None, e
+
     def download_try(self) -> Track:
         from deezspot.deezloader.deegw_api import API_GW
+        # A negotiated media_url (see check_sources) can be for another
+        # quality than the requested one: download that one directly
+        negotiated = media_format(self.__infos_dw.get('media_url'))
+        if negotiated and negotiated != self.__quality_download and negotiated in qualities:
+            logger.info(f"{self.__quality_download} not available for {self.__song_metadata['music']}, downloading {negotiated}")
+            self.__quality_download = negotiated
+            self.__c_quality = qualities[negotiated]
+            self.__set_quality()
+
         # Pre-check: if FLAC is requested but filesize is zero, fallback to MP3.
         if self.__file_format == '.flac':
             filesize_str = self.__infos_dw.get('FILESIZE_FLAC', '0')
@@ -677,25 +812,8 @@ class EASY_DW:
         try:
             media_list = self.__infos_dw['media_url']['media']
 
-            # Try all sources for the requested quality before attempting any fallback
-            crypted_audio = None
-            last_error = None
-            for media_entry in media_list:
-                sources = media_entry.get('sources') or []
-                for src in sources:
-                    song_link = src.get('url')
-                    if not song_link:
-                        continue
-                    try:
-                        crypted_audio = API_GW.song_exist(song_link)
-                        if crypted_audio:
-                            last_error = None
-                            break
-                    except Exception as e_try_src:
-                        last_error = e_try_src
-                        continue
-                if crypted_audio:
-                    break
+            # Race all sources (and CDN mirrors) for the requested quality before attempting any fallback
+            crypted_audio, last_error = self.__open_media_sources(media_list)
 
             if not crypted_audio:
                 song = self.__song_metadata['music']
@@ -713,23 +831,8 @@ class EASY_DW:
                     if media:
                         self.__infos_dw['media_url'] = media[0]
                         media_list = self.__infos_dw['media_url']['media']
-                        # Try all sources for fallback quality
-                        for media_entry in media_list:
-                            sources = media_entry.get('sources') or []
-                            for src in sources:
-                                song_link = src.get('url')
-                                if not song_link:
-                                    continue
-                                try:
-                                    crypted_audio = API_GW.song_exist(song_link)
-                                    if crypted_audio:
-                                        last_error = None
-                                        break
-                                except Exception as e_try_src2:
-                                    last_error = e_try_src2
-                                    continue
-                            if crypted_audio:
-                                break
+                        # Race all sources for fallback quality
+                        crypted_audio, last_error = self.__open_media_sources(media_list)
                         if not crypted_audio:
                             raise TrackNotFound(f"Track {song} - {artist} not available in MP3 after FLAC attempt failed (all sources unreachable). Last error: {last_error}")
                     else:
@@ -737,38 +840,39 @@ class EASY_DW:
                 else:
                     if not self.__recursive_quality:
                         raise QualityNotFound(f"Quality {self.__quality_download} not found for {song} - {artist} and recursive quality search is disabled.")
-                    for c_quality in qualities:
+                    # Qualities known to be missing (FILESIZE_* of 0) are not tried
+                    for c_quality in quality_ladder(self.__quality_download, self.__infos_dw):
                         if self.__quality_download == c_quality:
                             continue
                         media = Download_JOB.check_sources([self.__infos_dw], c_quality)
                         if media:
                             self.__infos_dw['media_url'] = media[0]
                             media_list = self.__infos_dw['media_url']['media']
-                            # Try all sources for alternative quality
-                            for media_entry in media_list:
-                                sources = media_entry.get('sources') or []
-                                for src in sources:
-                                    song_link = src.get('url')
-                                    if not song_link:
-                                        continue
-                                    try:
-                                        crypted_audio = API_GW.song_exist(song_link)
-                                        if crypted_audio:
-                                            self.__c_quality = qualities[c_quality]
-                                            self.__set_quality()
-                                            last_error = None
-                                            break
-                                    except Exception as e_try_src3:
-                                        last_error = e_try_src3
-                                        continue
-                                if crypted_audio:
-                                    break
-                        if crypted_audio:
-                            break
+                            # Race all sources for alternative quality
+                            crypted_audio, last_error = self.__open_media_sources(media_list)
+                            if crypted_audio:
+                                self.__c_quality = qualities[c_quality]
+                                self.__set_quality()
+                                break
                     if not crypted_audio:
                         raise TrackNotFound(f"Error with {song} - {artist}. All available qualities failed. Last error: {last_error}. Link: {self.__link}")
 
-            c_crypted_audio = crypted_audio.iter_content(2048)
+            pending_stream = crypted_audio
+
+            def open_stream(offset):
+                # The probed stream serves the first attempt; resumes reopen
+                # the sources at the checkpoint offset with a Range request
+                nonlocal pending_stream
+                stream, pending_stream = pending_stream, None
+                if stream is not None:
+                    if offset == 0:
+                        return stream
+                    stream.close()
+                # media_url may have been refreshed since the first attempt
+                stream, error = self.__open_media_sources(self.__infos_dw['media_url']['media'], offset)
+                if not stream:
+                    raise error or TrackNotFound(self.__link, f"No source to resume {self.__song_path} from byte {offset}")
+                return stream
             
             self.__fallback_ids = check_track_ids(self.__infos_dw)
             encryption_type = self.__fallback_ids.get('encryption_type', 'unknown')
@@ -790,9 +894,17 @@ class EASY_DW:
                 
                 register_active_download(self.__song_path)
                 try:
-                    decryptfile(c_crypted_audio, self.__fallback_ids, self.__song_path)
+                    # Chunks are decrypted straight from the socket to disk; a
+                    # broken transfer resumes from the .part checkpoint
+                    decryptfile_resumable(
+                        open_stream, self.__fallback_ids, self.__song_path,
+                        tag_header=self.__prepare_tag_header(),
+                        quality=self.__quality_download
+                    )
                     logger.debug(f"Successfully decrypted track using {encryption_type} encryption")
                 except Exception as e_decrypt:
+                    if pending_stream is not None:
+                        pending_stream.close()
                     unregister_active_download(self.__song_path)
                     if isfile(self.__song_path):
                         try:
@@ -824,34 +936,6 @@ class EASY_DW:
                     
                     raise TrackNotFound(f"Failed to process {self.__song_path}. Error: {str(e_decrypt)}") from e_decrypt
 
-                # Add Deezer-specific enhanced metadata and apply tags
-                from deezspot.deezloader.deegw_api import API_GW
-                # Build metadata: if using Spotify metadata, enhance for Spotify; else Deezer
-                use_spotify = getattr(self.__preferences, 'spotify_metadata', False)
-                if use_spotify:
-                    enhanced_metadata = add_spotify_enhanced_metadata(self.__song_metadata, self.__track_obj)
-                    process_and_tag_track(
-                        track=self.__c_track,
-                        metadata_dict=enhanced_metadata,
-                        source_type='spotify',
-                        save_cover=getattr(self.__preferences, 'save_cover', False)
-                    )
-                else:
-                    enhanced_metadata = add_deezer_enhanced_metadata(
-                        self.__song_metadata,
-                        self.__infos_dw,
-                        self.__ids,
-                        API_GW
-                    )
-                    
-                    # Apply tags using unified utility
-                    process_and_tag_track(
-                        track=self.__c_track,
-                        metadata_dict=enhanced_metadata,
-                        source_type='deezer',
-                        save_cover=getattr(self.__preferences, 'save_cover', False)
-                    )
-
                 if self.__convert_to:
                     format_name, bitrate = self._parse_format_string(self.__convert_to)
                     if format_name:
@@ -874,28 +958,8 @@ class EASY_DW:
                             logger.error(f"Audio conversion error: {str(conv_error)}. Proceeding with original format.")
                             register_active_download(path_before_conversion)
 
-                # Apply tags using unified utility with Deezer or Spotify enhancements
-                from deezspot.deezloader.deegw_api import API_GW
-                use_spotify = getattr(self.__preferences, 'spotify_metadata', False)
-                if use_spotify:
-                    enhanced_metadata = add_spotify_enhanced_metadata(self.__song_metadata, self.__track_obj)
-                    process_and_tag_track(
-                        track=self.__c_track,
-                        metadata_dict=enhanced_metadata,
-                        source_type='spotify'
-                    )
-                else:
-                    enhanced_metadata = add_deezer_enhanced_metadata(
-                        self.__song_metadata,
-                        self.__infos_dw,
-                        self.__ids,
-                        API_GW
-                    )
-                    process_and_tag_track(
-                        track=self.__c_track,
-                        metadata_dict=enhanced_metadata,
-                        source_type='deezer'
-                    )
+                # Tags are written once, to the final (possibly converted) file
+                self.__tag_track(save_cover=getattr(self.__preferences, 'save_cover', False))
                 self.__c_track.success = True
                 unregister_active_download(self.__song_path)
 
@@ -996,19 +1060,7 @@ class EASY_DW:
                 
                 self.__c_track.success = True
                 self.__write_episode()
-                # Apply tags using unified utility with Deezer enhancements
-                from deezspot.deezloader.deegw_api import API_GW
-                enhanced_metadata = add_deezer_enhanced_metadata(
-                    self.__song_metadata,
-                    self.__infos_dw,
-                    self.__ids,
-                    API_GW
-                )
-                process_and_tag_track(
-                    track=self.__c_track,
-                    metadata_dict=enhanced_metadata,
-                    source_type='deezer'
-                )
+                self.__tag_track()
             
                 return self.__c_track
 
@@ -1086,7 +1138,8 @@ class DW_TRACK:
         infos_dw = API_GW.get_song_data(self.__ids)
 
         media = Download_JOB.check_sources(
-            [infos_dw], self.__quality_download
+            [infos_dw], self.__quality_download,
+            negotiate=bool(getattr(self.__preferences, 'recursive_quality', False))
         )
 
         infos_dw['media_url'] = media[0]
@@ -1148,6 +1201,10 @@ class DW_ALBUM:
         # New: Spotify metadata context for album-level tagging
         self.__use_spotify = getattr(self.__preferences, 'spotify_metadata', False)
         self.__spotify_album_obj = getattr(self.__preferences, 'spotify_album_obj', None)
+        self.__max_workers = getattr(self.__preferences, 'max_workers', 1) or 1
+        self.__prefetch_lookahead = max(getattr(self.__preferences, 'prefetch_lookahead', 0) or 0, 0)
+        # Recursive quality search negotiates each track's quality in the batched get_url requests
+        self.__negotiate_quality = bool(getattr(self.__preferences, 'recursive_quality', False))
 
     def dw(self) -> Album:
         from deezspot.deezloader.deegw_api import API_GW
@@ -1158,7 +1215,7 @@ class DW_ALBUM:
         
         infos_dw = API_GW.get_album_data(self.__ids)['data']
         md5_image = infos_dw[0]['ALB_PICTURE']
-        image_bytes = API.choose_img(md5_image, size="1400x1400")
+        image_bytes = API.choose_img(md5_image)
         
         # Choose album_dict source: Spotify if requested and available, else Deezer
         artist_separator = getattr(self.__preferences, 'artist_separator', '; ')
@@ -1184,9 +1241,9 @@ class DW_ALBUM:
         else:
             try:
                 from deezspot.libutils.taggers import fetch_and_process_image
-                album.image = fetch_and_process_image(album_dict['image']) or API.choose_img(md5_image, size="1400x1400")
+                album.image = fetch_and_process_image(album_dict['image']) or API.choose_img(md5_image)
             except Exception:
-                album.image = API.choose_img(md5_image, size="1400x1400")
+                album.image = API.choose_img(md5_image)
         album.md5_image = md5_image
         album.nb_tracks = album_obj.total_tracks
         album.album_name = album_obj.title
@@ -1194,8 +1251,6 @@ class DW_ALBUM:
         album.tags = album_dict
         tracks = album.tracks
         
-        medias = Download_JOB.check_sources(infos_dw, self.__quality_download)
-        
         album_base_directory = get_album_directory(
             album.tags,
             self.__output_dir,
@@ -1222,7 +1277,12 @@ class DW_ALBUM:
                 except Exception:
                     pass
         
-        for a, album_track_obj in enumerate(album_obj.tracks):
+        def prepare_album_track(a: int):
+            """
+            Build the track's downloader. Returns (preferences, EASY_DW), or
+            (preferences, Track) if the track is already present or failed.
+            """
+            album_track_obj = album_obj.tracks[a]
             c_infos_dw_item = infos_dw[a] 
             
             # Update track object with proper track position and disc number from API
@@ -1237,7 +1297,6 @@ class DW_ALBUM:
             if album_track_obj.disc_number is None:
                 album_track_obj.disc_number = 1
                 
-            c_infos_dw_item['media_url'] = medias[a]
             c_preferences = deepcopy(self.__preferences)
             
             try:
@@ -1280,17 +1339,61 @@ class DW_ALBUM:
                         c_preferences.spotify_metadata = True
                         c_preferences.spotify_track_obj = spo_track_for_tag
                 
-                current_track_object = EASY_DW(c_infos_dw_item, c_preferences, parent='album').easy_dw()
+                track_dw = EASY_DW(c_infos_dw_item, c_preferences, parent='album')
+                return c_preferences, track_dw.skip_if_exists() or track_dw
             except Exception as e:
-                logger.error(f"Track '{album_track_obj.title}' in album '{album_obj.title}' failed: {e}")
-                # Create a simple track metadata dict manually since we don't have EASY_DW to process it
-                track_metadata = self._track_object_to_dict(album_track_obj, album_obj)
-                current_track_object = Track(track_metadata, None, None, None, c_preferences.link, c_preferences.ids)
-                current_track_object.success = False
-                current_track_object.error_message = str(e)
-            
-            if current_track_object:
-                tracks.append(current_track_object)
+                return c_preferences, failed_album_track(a, c_preferences, e)
+
+        def failed_album_track(a: int, c_preferences: Preferences, e: Exception) -> Track:
+            album_track_obj = album_obj.tracks[a]
+            logger.error(f"Track '{album_track_obj.title}' in album '{album_obj.title}' failed: {e}")
+            # Create a simple track metadata dict manually since we don't have EASY_DW to process it
+            track_metadata = self._track_object_to_dict(album_track_obj, album_obj)
+            current_track_object = Track(track_metadata, None, None, None, c_preferences.link, c_preferences.ids)
+            current_track_object.success = False
+            current_track_object.error_message = str(e)
+            return current_track_object
+
+        # Pre-flight: resolve every target path and skip tracks already in the
+        # library before any media URL or cover lookup is made for them
+        prepared = [prepare_album_track(a) for a in range(len(album_obj.tracks))]
+        pending = [a for a, (_, item) in enumerate(prepared) if isinstance(item, EASY_DW)]
+        if len(pending) < len(prepared):
+            logger.info(f"Album '{album_obj.title}': {len(prepared) - len(pending)} of {len(prepared)} tracks need no download")
+
+        # Media URLs of every pending track are resolved up front in batched
+        # requests; a failure leaves each track to resolve its own
+        try:
+            Download_JOB.resolve_media([infos_dw[a] for a in pending], self.__quality_download, self.__negotiate_quality)
+        except Exception as e:
+            logger.warning(f"Batched media URL lookup for album failed, resolving tracks one by one: {e}")
+
+        # Covers and lyrics of the next tracks are fetched in the background
+        # while the current ones stream
+        prefetcher = Prefetcher(
+            [(infos_dw[a], prepared[a][0]) for a in pending],
+            Download_JOB.prefetch,
+            lookahead=self.__prefetch_lookahead + self.__max_workers - 1
+        )
+        pending_pos = {a: pos for pos, a in enumerate(pending)}
+
+        def download_album_track(a: int) -> Track:
+            c_preferences, item = prepared[a]
+            if isinstance(item, Track):
+                return item
+            try:
+                prefetcher.wait(pending_pos[a], block=False)
+                if 'media_url' not in infos_dw[a]:
+                    infos_dw[a]['media_url'] = Download_JOB.check_sources([infos_dw[a]], self.__quality_download, self.__negotiate_quality)[0]
+                return item.easy_dw()
+            except Exception as e:
+                return failed_album_track(a, c_preferences, e)
+
+        # Tracks run through a bounded worker pool; results come back in album order
+        with prefetcher:
+            for current_track_object in run_in_order(download_album_track, range(len(album_obj.tracks)), self.__max_workers):
+                if current_track_object:
+                    tracks.append(current_track_object)
 
         if self.__make_zip:
             song_quality = tracks[0].quality if tracks else 'Unknown'
@@ -1346,6 +1449,10 @@ class DW_PLAYLIST:
         self.__output_dir = self.__preferences.output_dir
         self.__song_metadata = self.__preferences.song_metadata
         self.__quality_download = self.__preferences.quality_download
+        self.__max_workers = getattr(self.__preferences, 'max_workers', 1) or 1
+        self.__prefetch_lookahead = max(getattr(self.__preferences, 'prefetch_lookahead', 0) or 0, 0)
+        # Recursive quality search negotiates each track's quality in the batched get_url requests
+        self.__negotiate_quality = bool(getattr(self.__preferences, 'recursive_quality', False))
 
     def _track_object_to_dict(self, track_obj: any) -> dict:
         # Use the unified metadata converter
@@ -1371,38 +1478,35 @@ class DW_PLAYLIST:
 
         m3u_path = create_m3u_file(self.__output_dir, playlist_obj.title)
 
-        medias = Download_JOB.check_sources(infos_dw, self.__quality_download)
-
         successful_tracks_cb = []
         failed_tracks_cb = []
         skipped_tracks_cb = []
         
         total_tracks = len(infos_dw)
 
-        for idx in range(total_tracks):
+        def prepare_playlist_track(idx: int) -> tuple:
+            """
+            Build one playlist item's downloader. Returns (track_cb, preferences,
+            EASY_DW or Track, error); a Track means the item is already present
+            or failed.
+            """
             c_infos_dw_item = infos_dw[idx]
-            c_media = medias[idx]
             c_track_obj = playlist_obj.tracks[idx] if idx < len(playlist_obj.tracks) else None
 
-
             if not c_track_obj or not c_track_obj.ids or not c_track_obj.ids.deezer:
                 logger.warning(f"Skipping item {idx + 1} in playlist '{playlist_obj.title}' as it's not a valid track object.")
                 from deezspot.models.callback.track import trackObject as trackCbObject
                 unknown_track = trackCbObject(title="Unknown Skipped Item")
                 reason = "Playlist item was not a valid track object."
-                
-                failed_tracks_cb.append(failedTrackObject(track=unknown_track, reason=reason))
-                
+
                 failed_track_model = Track(
                     tags={'music': 'Unknown Skipped Item', 'artist': 'Unknown'},
                     song_path=None, file_format=None, quality=None, link=None, ids=None
                 )
                 failed_track_model.success = False
                 failed_track_model.error_message = reason
-                tracks.append(failed_track_model)
-                continue
+                return unknown_track, None, failed_track_model, reason
 
-            c_infos_dw_item['media_url'] = c_media
             c_preferences = deepcopy(self.__preferences)
             c_preferences.ids = c_track_obj.ids.deezer
             c_preferences.song_metadata = c_track_obj
@@ -1411,11 +1515,63 @@ class DW_PLAYLIST:
             c_preferences.json_data = self.__preferences.json_data
             c_preferences.link = f"https://deezer.com/track/{c_preferences.ids}"
 
-            current_track_object = None
             try:
-                current_track_object = EASY_DW(c_infos_dw_item, c_preferences, parent='playlist').easy_dw()
-                
-                if getattr(current_track_object, 'was_skipped', False):
+                track_dw = EASY_DW(c_infos_dw_item, c_preferences, parent='playlist')
+                return c_track_obj, c_preferences, track_dw.skip_if_exists() or track_dw, None
+            except Exception as e:
+                return c_track_obj, c_preferences, failed_playlist_track(c_track_obj, c_preferences, e), str(e)
+
+        def failed_playlist_track(c_track_obj, c_preferences: Preferences, e: Exception) -> Track:
+            logger.error(f"Track '{c_track_obj.title}' in playlist '{playlist_obj.title}' failed: {e}")
+            current_track_object = Track(self._track_object_to_dict(c_track_obj), None, None, None, c_preferences.link, c_preferences.ids)
+            current_track_object.success = False
+            current_track_object.error_message = str(e)
+            return current_track_object
+
+        # Pre-flight: resolve every target path and skip tracks already in the
+        # library before any media URL or cover lookup is made for them
+        prepared = [prepare_playlist_track(idx) for idx in range(total_tracks)]
+        pending = [idx for idx, (_, _, item, _) in enumerate(prepared) if isinstance(item, EASY_DW)]
+        if len(pending) < total_tracks:
+            logger.info(f"Playlist '{playlist_obj.title}': {total_tracks - len(pending)} of {total_tracks} items need no download")
+
+        # Media URLs of every pending track are resolved up front in batched
+        # requests; a failure leaves each track to resolve its own
+        try:
+            Download_JOB.resolve_media([infos_dw[idx] for idx in pending], self.__quality_download, self.__negotiate_quality)
+        except Exception as e:
+            logger.warning(f"Batched media URL lookup for playlist failed, resolving tracks one by one: {e}")
+
+        # Covers and lyrics of the next tracks are fetched in the background
+        # while the current ones stream
+        prefetcher = Prefetcher(
+            [(infos_dw[idx], prepared[idx][1]) for idx in pending],
+            Download_JOB.prefetch,
+            lookahead=self.__prefetch_lookahead + self.__max_workers - 1
+        )
+        pending_pos = {idx: pos for pos, idx in enumerate(pending)}
+
+        def download_playlist_track(idx: int) -> tuple:
+            """Download one playlist item; returns (track_cb, track, error)."""
+            c_track_obj, c_preferences, item, error = prepared[idx]
+            if not isinstance(item, EASY_DW):
+                return c_track_obj, item, error
+            try:
+                prefetcher.wait(pending_pos[idx], block=False)
+                if 'media_url' not in infos_dw[idx]:
+                    infos_dw[idx]['media_url'] = Download_JOB.check_sources([infos_dw[idx]], self.__quality_download, self.__negotiate_quality)[0]
+                return c_track_obj, item.easy_dw(), None
+            except Exception as e:
+                return c_track_obj, failed_playlist_track(c_track_obj, c_preferences, e), str(e)
+
+        # Tracks run through a bounded worker pool; summary lists and the m3u
+        # are filled here, in playlist order, as results come back
+        with prefetcher:
+            results = run_in_order(download_playlist_track, range(total_tracks), self.__max_workers)
+            for c_track_obj, current_track_object, error in results:
+                if error:
+                    failed_tracks_cb.append(failedTrackObject(track=c_track_obj, reason=error))
+                elif getattr(current_track_object, 'was_skipped', False):
                     skipped_tracks_cb.append(c_track_obj)
                 elif current_track_object.success:
                     successful_tracks_cb.append(c_track_obj)
@@ -1424,17 +1580,11 @@ class DW_PLAYLIST:
                         track=c_track_obj,
                         reason=getattr(current_track_object, 'error_message', 'Unknown reason')
                     ))
-            except Exception as e:
-                logger.error(f"Track '{c_track_obj.title}' in playlist '{playlist_obj.title}' failed: {e}")
-                failed_tracks_cb.append(failedTrackObject(track=c_track_obj, reason=str(e)))
-                current_track_object = Track(self._track_object_to_dict(c_track_obj), None, None, None, c_preferences.link, c_preferences.ids)
-                current_track_object.success = False
-                current_track_object.error_message = str(e)
 
-            if current_track_object:
-                tracks.append(current_track_object)
-                if current_track_object.success and hasattr(current_track_object, 'song_path') and current_track_object.song_path:
-                    append_track_to_m3u(m3u_path, current_track_object)
+                if current_track_object:
+                    tracks.append(current_track_object)
+                    if current_track_object.success and hasattr(current_track_object, 'song_path') and current_track_object.song_path:
+                        append_track_to_m3u(m3u_path, current_track_object)
 
         if self.__make_zip:
             zip_name = f"{self.__output_dir}/{playlist_obj.title} [playlist {self.__ids}]"
@@ -1560,7 +1710,7 @@ class DW_EPISODE:
                 episode_image_md5 = infos_dw.get('EPISODE_IMAGE_MD5', '')
                 episode_image_data = None
                 if episode_image_md5:
-                    episode_image_data = API.choose_img(episode_image_md5, size="1200x1200")
+                    episode_image_data = API.choose_img(episode_image_md5)
                 
                 if episode_image_data:
                     episode_directory = os.path.dirname(output_path)
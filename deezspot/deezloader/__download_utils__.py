@@ -9,18 +9,38 @@ from binascii import (
 
 from Crypto.Cipher.Blowfish import (
 	new as __newBlowfish,
-	MODE_CBC as __MODE_CBC
+	MODE_CBC as __MODE_CBC,
+	MODE_ECB as __MODE_ECB
 )
 
 from Crypto.Cipher import AES
 from Crypto.Util import Counter
+from Crypto.Util.strxor import strxor
 import os
+import json
+import random
+import requests
+from urllib3 import exceptions as urllib3_exceptions
+from deezspot.deezloader.deezer_settings import stock_flac_validation_rate
+from deezspot.exceptions import TrackNotFound
+from deezspot.libutils.library_index import get_library_index
 from deezspot.libutils.logging_utils import logger
 
 __secret_key = "g4el58wc0zvf9na1"
 __secret_key2 = b"jo6aey6haid2Teih"
 __idk = __a2b_hex("0001020304050607")
 
+# BF_CBC_STRIPE layout: the stream is cut in 2048-byte stripes and only
+# every third stripe (0, 3, 6, ...) is Blowfish-CBC encrypted.
+__stripe_size = 2048
+__stripe_period = __stripe_size * 3
+# Decrypt window: a whole number of stripe periods (~1.5 MB)
+__window_size = __stripe_period * 256
+
+# Failures a later attempt can resume from; anything else discards the .part
+_NETWORK_ERRORS = (OSError, requests.RequestException, urllib3_exceptions.HTTPError)
+_RESUMABLE_ERRORS = _NETWORK_ERRORS + (TrackNotFound,)
+
 def md5hex(data: str):
 	hashed = __md5(
 		data.encode()
@@ -117,81 +137,498 @@ def __blowfishDecrypt(data, key):
 		logger.error(f"Error in Blowfish decryption: {str(e)}")
 		raise
 
-def decrypt_blowfish_track(crypted_audio, song_id, md5_origin, song_path):
+def __decrypt_stripes(ecb_cipher, view, length, chain):
     """
-    Decrypt the audio file using Blowfish encryption.
-    
+    Decrypt in place every encrypted stripe of a window.
+
+    CBC decryption of a stripe is D(C[i]) xor C[i-1], with the IV as C[-1].
+    The single ECB cipher keeps one key schedule for the whole file; the
+    chain buffer holds IV + ciphertext shifted by one block for the xor.
+
     Args:
-        crypted_audio: The encrypted audio data
-        song_id: The song ID for generating the key
-        md5_origin: The MD5 hash of the track
-        song_path: Path where to save the decrypted file
+        ecb_cipher: Blowfish cipher in ECB mode for the track key
+        view: memoryview over the window, aligned on a stripe period
+        length: Number of valid bytes in the window
+        chain: Preallocated 2048-byte bytearray starting with the IV
+    """
+    for offset in range(0, length - __stripe_size + 1, __stripe_period):
+        stripe = view[offset:offset + __stripe_size]
+        chain[8:] = stripe[:-8]
+        ecb_cipher.decrypt(stripe, output=stripe)
+        strxor(stripe, chain, output=stripe)
+
+def align_window(window_size=None):
+    """
+    Round a window size down to a whole number of stripe periods, so every
+    window starts on an encrypted stripe and can be decrypted on its own.
+
+    Args:
+        window_size: Requested size in bytes (defaults to ~1.5 MB)
+
+    Returns:
+        int: The aligned window size
+    """
+    return max(__stripe_period, (window_size or __window_size) // __stripe_period * __stripe_period)
+
+def decrypt_window(view, length, bf_key):
+    """
+    Decrypt in place the stripes of one period-aligned window.
+
+    Args:
+        view: Writable buffer (bytearray, memoryview, shared memory) holding the window
+        length: Number of valid bytes in the window
+        bf_key: The Blowfish key as returned by __calcbfkey
+    """
+    if isinstance(bf_key, str):
+        bf_key = bf_key.encode()
+    chain = bytearray(__stripe_size)
+    chain[:8] = __idk
+    __decrypt_stripes(__newBlowfish(bf_key, __MODE_ECB), memoryview(view), length, chain)
+
+def iter_blowfish_stripes(crypted_audio, bf_key, window_size=None):
     """
+    Stream-decrypt BF_CBC_STRIPE audio window by window.
+
+    Data is gathered into one preallocated, period-aligned window and
+    decrypted in place through a memoryview, so stripe boundaries never
+    need re-slicing and windows are handed out without extra copies.
+    Partial stripes at the end of the stream are not encrypted.
+
+    Args:
+        crypted_audio: Iterable of encrypted chunks, or a file-like object with readinto()
+        bf_key: The Blowfish key as returned by __calcbfkey
+        window_size: Window size in bytes, rounded down to a stripe period
+
+    Yields:
+        memoryview: Decrypted data, only valid until the next window is requested
+    """
+    window_size = align_window(window_size)
+    if isinstance(bf_key, str):
+        bf_key = bf_key.encode()
+
+    ecb_cipher = __newBlowfish(bf_key, __MODE_ECB)
+    window = bytearray(window_size)
+    view = memoryview(window)
+    chain = bytearray(__stripe_size)
+    chain[:8] = __idk
+    filled = 0
+
+    if hasattr(crypted_audio, 'readinto'):
+        # File-like source: read straight into the window
+        while True:
+            n = crypted_audio.readinto(view[filled:])
+            if not n:
+                break
+            filled += n
+            if filled == window_size:
+                __decrypt_stripes(ecb_cipher, view, filled, chain)
+                yield view
+                filled = 0
+    else:
+        for chunk in crypted_audio:
+            if not chunk:
+                continue
+            chunk_view = memoryview(chunk)
+            pos = 0
+            chunk_len = len(chunk_view)
+            while pos < chunk_len:
+                n = min(window_size - filled, chunk_len - pos)
+                view[filled:filled + n] = chunk_view[pos:pos + n]
+                filled += n
+                pos += n
+                if filled == window_size:
+                    __decrypt_stripes(ecb_cipher, view, filled, chain)
+                    yield view
+                    filled = 0
+
+    if filled:
+        __decrypt_stripes(ecb_cipher, view, filled, chain)
+        yield view[:filled]
+
+def decrypt_blowfish_stripes(crypted_audio, bf_key, output_file, window_size=None):
+    """
+    Stream-decrypt BF_CBC_STRIPE audio into an open binary file.
+
+    Args:
+        crypted_audio: Iterable of encrypted chunks, or a file-like object with readinto()
+        bf_key: The Blowfish key as returned by __calcbfkey
+        output_file: Binary file object the decrypted data is written to
+        window_size: Window size in bytes, rounded down to a stripe period
+
+    Returns:
+        int: Number of bytes written
+    """
+    written = 0
+    for window in iter_blowfish_stripes(crypted_audio, bf_key, window_size):
+        written += output_file.write(window)
+    return written
+
+class DecryptStage:
+    """
+    A streaming step of the download pipeline: transform() turns an iterable
+    of chunks into another one, so stages can be chained before the writer.
+    The base stage passes data through unchanged.
+
+    Stages can start at a byte offset of the stream (as served by an HTTP
+    Range request) as long as it is a checkpoint boundary (see run_pipeline).
+    """
+
+    name = "plain"
+
+    def transform(self, chunks, offset=0):
+        return chunks
+
+class AESCTRStage(DecryptStage):
+    """AES-CTR decryption, used when the media comes with MEDIA_KEY/MEDIA_NONCE."""
+
+    name = "aes"
+
+    def __init__(self, key, nonce):
+        self.key = bytes.fromhex(key)
+        self.nonce = bytes.fromhex(nonce)
+
+    def counter_at(self, offset):
+        # One counter block per 16 bytes of keystream
+        return (int.from_bytes(self.nonce, byteorder='big') + offset // 16) % (1 << 128)
+
+    def transform(self, chunks, offset=0):
+        counter = Counter.new(128, initial_value=self.counter_at(offset))
+        cipher = AES.new(self.key, AES.MODE_CTR, counter=counter)
+        for chunk in chunks:
+            if chunk:
+                yield cipher.decrypt(chunk)
+
+class BlowfishStripeStage(DecryptStage):
+    """BF_CBC_STRIPE decryption through the windowed in-place engine."""
+
+    name = "blowfish"
+
+    def __init__(self, bf_key, window_size=None):
+        self.bf_key = bf_key
+        self.window_size = window_size
+
+    def transform(self, chunks, offset=0):
+        # Checkpoints sit on stripe periods, so the stripe parity is unchanged
+        return iter_blowfish_stripes(chunks, self.bf_key, self.window_size)
+
+def build_decrypt_stage(ids):
+    """
+    Pick the decrypt stage for a track.
+
+    Args:
+        ids: The track IDs containing encryption info (see check_track_ids)
+
+    Returns:
+        DecryptStage: The stage matching the track's encryption type
+    """
+    encryption_type = ids.get('encryption_type', 'aes')
+
+    if encryption_type == 'aes':
+        return AESCTRStage(ids['key'], ids['nonce'])
+    if encryption_type == 'blowfish':
+        return BlowfishStripeStage(__calcbfkey(str(ids['track_id'])))
+
+    raise ValueError(f"Unknown encryption type: {encryption_type}")
+
+def checkpoint_floor(offset):
+    """
+    Round an offset down to a resumable position: a whole number of stripe
+    periods, which is also a whole number of AES blocks.
+    """
+    return offset - offset % __stripe_period
+
+def run_pipeline(crypted_audio, stages, output_file, offset=0, on_checkpoint=None):
+    """
+    Push chunks through a chain of stages and write the result.
+
+    Args:
+        crypted_audio: Iterable of encrypted chunks
+        stages: DecryptStage instances, applied in order
+        output_file: Binary file object the result is written to, positioned at offset
+        offset: Stream offset of the first chunk (must be a checkpoint boundary)
+        on_checkpoint: Called with each new checkpoint offset once the data
+            before it has been flushed
+
+    Returns:
+        tuple: (bytes written, first 4 bytes of the output)
+    """
+    chunks = crypted_audio
+    for stage in stages:
+        chunks = stage.transform(chunks, offset)
+
+    written = 0
+    head = b""
+    checkpoint = offset
+    for chunk in chunks:
+        if len(head) < 4:
+            head += bytes(chunk[:4 - len(head)])
+        written += output_file.write(chunk)
+
+        if on_checkpoint is not None:
+            position = checkpoint_floor(offset + written)
+            # Checkpoint about once per decrypt window
+            if position - checkpoint >= __window_size:
+                output_file.flush()
+                checkpoint = position
+                on_checkpoint(checkpoint)
+    return written, head
+
+class TagHeaderWriter:
+    """
+    Output file wrapper splicing a prepared TagHeader into the start of the
+    decrypted stream, so the tags are written with the audio and not by a
+    second pass over the finished file.
+
+    write() takes stream bytes and reports them as written; once the header
+    is in, the file holds every later byte header_size bytes further.
+    """
+
+    def __init__(self, output_file, tag_header, header_size=None):
+        self.__file = output_file
+        self.__tag_header = tag_header
+        self.__pending = b""
+        # Known when resuming: the header was decided on the first attempt
+        self.__decided = header_size is not None
+        self.header_size = header_size or 0
+
+    def __decide(self):
+        head, self.__pending = self.__pending, b""
+        spliced = self.__tag_header.splice(head)
+        self.__decided = True
+        if spliced is None:
+            self.__file.write(head)
+            return
+        self.__file.write(spliced)
+        self.header_size = len(spliced) - len(head)
+
+    def write(self, chunk):
+        if self.__decided:
+            return self.__file.write(chunk)
+        self.__pending += bytes(chunk)
+        if len(self.__pending) >= self.__tag_header.probe_size:
+            self.__decide()
+        return len(chunk)
+
+    def flush(self):
+        self.__file.flush()
+
+    def finish(self):
+        """Write out a stream shorter than the probe."""
+        if not self.__decided:
+            self.__decide()
+
+def __sidecar_path(part_path):
+    return f"{part_path}.json"
+
+def __load_checkpoint(part_path, ids, quality=None, header_sizes=(0,)):
+    """
+    Stream offset to resume from, the size of the tag header in front of it
+    and the size of the file being downloaded, if a .part file and a sidecar
+    for the same track, encryption and quality exist.
+    """
+    sidecar = __sidecar_path(part_path)
+    if not (os.path.isfile(part_path) and os.path.isfile(sidecar)):
+        return 0, 0, None
     try:
-        # Calculate the Blowfish key
-        bf_key = __calcbfkey(song_id)
-        
-        # For debugging - log the key being used
-        logger.debug(f"Using Blowfish key for decryption: {bf_key.encode().hex()}")
-        
-        # Prepare to process the file
-        block_size = 2048  # Size of each block to process
-        
-        # We need to reconstruct the data from potentially variable-sized chunks into
-        # fixed-size blocks for proper decryption
-        buffer = bytearray()
-        block_count = 0  # Count of completed blocks
-        
-        # Open the output file
-        with open(song_path, 'wb') as output_file:
-            # Process each incoming chunk of data
-            for chunk in crypted_audio:
-                if not chunk:
-                    continue
-                
-                # Add current chunk to our buffer
-                buffer.extend(chunk)
-                
-                # Process as many complete blocks as we can
-                while len(buffer) >= block_size:
-                    # Extract a block from buffer
-                    block = buffer[:block_size]
-                    buffer = buffer[block_size:]
-                    
-                    # Only decrypt every third block
-                    is_encrypted = (block_count % 3 == 0)
-                    
-                    if is_encrypted:
-                        # Ensure the block is a multiple of 8 bytes (Blowfish block size)
-                        if len(block) == block_size and len(block) % 8 == 0:
-                            try:
-                                # Create a fresh cipher with the initialization vector for each block
-                                # This is crucial - we need to reset the IV for each encrypted block
-                                cipher = __newBlowfish(bf_key.encode(), __MODE_CBC, __idk)
-                                
-                                # Decrypt the block
-                                block = cipher.decrypt(block)
-                                logger.debug(f"Decrypted block {block_count} (size: {len(block)})")
-                            except Exception as e:
-                                logger.error(f"Failed to decrypt block {block_count}: {str(e)}")
-                                # Continue with the encrypted block rather than failing completely
-                    
-                    # Write the block (decrypted or not) to the output file
-                    output_file.write(block)
-                    block_count += 1
-            
-            # Write any remaining data in the buffer (this won't be decrypted as it's a partial block)
-            if buffer:
-                logger.debug(f"Writing final partial block of size {len(buffer)}")
-                output_file.write(buffer)
-            
-        logger.debug(f"Successfully decrypted and saved Blowfish-encrypted file to {song_path}")
-        
+        with open(sidecar, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        offset = int(state.get('offset', 0))
+        header_size = int(state.get('header_size', 0))
+        file_size = state.get('file_size')
+        if (
+            str(state.get('track_id')) != str(ids.get('track_id'))
+            or state.get('encryption_type') != ids.get('encryption_type', 'aes')
+            # MP3_320 and MP3_128 share the same .part path
+            or state.get('quality') != quality
+            or not isinstance(file_size, int)
+            or offset % __stripe_period
+            or header_size not in header_sizes
+            or os.path.getsize(part_path) < offset + header_size
+        ):
+            return 0, 0, None
+        return offset, header_size, file_size
     except Exception as e:
-        logger.error(f"Failed to decrypt Blowfish file: {str(e)}")
+        logger.debug(f"Ignoring unreadable resume sidecar {sidecar}: {e}")
+        return 0, 0, None
+
+def __save_checkpoint(part_path, ids, quality, file_size, offset, header_size=0):
+    if file_size is None:
+        # Without the stream's size a later resume could not be checked
+        return
+    sidecar = __sidecar_path(part_path)
+    state = {
+        "track_id": str(ids.get('track_id')),
+        "encryption_type": ids.get('encryption_type', 'aes'),
+        "quality": quality,
+        "file_size": file_size,
+        "offset": offset,
+        "header_size": header_size,
+    }
+    tmp_path = f"{sidecar}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, sidecar)
+
+def __discard_checkpoint(part_path):
+    for path in (part_path, __sidecar_path(part_path)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove {path}: {e}")
+
+def __decrypt_to_part(
+    open_stream, ids, song_path, part_path, stage, decrypt_pool, max_resumes,
+    tag_header, quality, offset, header_size, file_size, header_sizes
+):
+    """
+    The download loop of decryptfile_resumable: fill part_path, reopening
+    the stream at the last checkpoint when it breaks.
+
+    Returns:
+        tuple: (stream bytes in the file, first 4 bytes, tag header size)
+    """
+    resumes = 0
+    while True:
+        stream = open_stream(offset)
+        offset = getattr(stream, 'start', 0) or 0
+        stream_size = getattr(stream, 'total_size', None)
+        if offset and stream_size != file_size:
+            # Not the file the .part was cut from: splicing would corrupt it
+            logger.warning(
+                f"Source of {os.path.basename(song_path)} changed size "
+                f"({file_size} -> {stream_size}); restarting the download"
+            )
+            stream.close()
+            stream = open_stream(0)
+            offset = 0
+            stream_size = getattr(stream, 'total_size', None)
+        if not offset:
+            header_size = 0
+            file_size = stream_size
+        try:
+            if decrypt_pool is not None:
+                # Worker processes decrypt and write the windows; the same
+                # checkpoints and tag header apply
+                written, head, header_size = decrypt_pool.decrypt_to_file(
+                    stream.iter_content(2048),
+                    stage,
+                    part_path,
+                    offset=offset,
+                    tag_header=tag_header,
+                    header_size=header_size if offset else None,
+                    on_checkpoint=lambda checkpoint, c_header_size: __save_checkpoint(
+                        part_path, ids, quality, file_size, checkpoint, c_header_size
+                    )
+                )
+                written += offset
+                break
+            with open(part_path, 'r+b' if os.path.isfile(part_path) else 'wb') as f:
+                f.truncate(offset + header_size)
+                f.seek(offset + header_size)
+                sink = f
+                if tag_header is not None:
+                    sink = TagHeaderWriter(f, tag_header, header_size if offset else None)
+                written, head = run_pipeline(
+                    stream.iter_content(2048),
+                    [stage],
+                    sink,
+                    offset=offset,
+                    on_checkpoint=lambda checkpoint: __save_checkpoint(
+                        part_path, ids, quality, file_size, checkpoint, getattr(sink, 'header_size', 0)
+                    )
+                )
+                if tag_header is not None:
+                    sink.finish()
+                    header_size = sink.header_size
+            written += offset
+            break
+        except _NETWORK_ERRORS as e:
+            resumes += 1
+            saved, saved_header_size, _ = __load_checkpoint(part_path, ids, quality, header_sizes)
+            if resumes > max_resumes:
+                logger.error(f"Giving up on {os.path.basename(song_path)} after {max_resumes} resumes: {e}")
+                raise
+            logger.warning(f"Stream broke at checkpoint {saved} of {os.path.basename(song_path)} ({e}); resuming")
+            offset, header_size = saved, saved_header_size
+        finally:
+            stream.close()
+
+    if offset:
+        with open(part_path, 'rb') as f:
+            head = f.read(4)
+
+    return written, head, header_size
+
+def decryptfile_resumable(open_stream, ids, song_path, max_resumes=3, flac_validation_rate=None, tag_header=None, quality=None):
+    """
+    Decrypt a track into song_path, resuming from the last checkpoint when
+    the stream breaks instead of starting over.
+
+    Data goes to song_path + ".part"; a JSON sidecar next to it records the
+    last flushed checkpoint offset along with the track, encryption,
+    quality and size of the stream. A broken transfer reopens the stream at
+    that offset, and a later run finds the checkpoint and continues too, as
+    long as it downloads the same quality and the source reports the same
+    file size; anything else starts over.
+
+    Args:
+        open_stream: Callable(offset) returning a stream whose iter_content()
+            starts at its `start` attribute (offset if the Range was honoured, else 0)
+        ids: The track IDs containing encryption info
+        song_path: Path where to save the decrypted file
+        max_resumes: Broken transfers tolerated before giving up
+        flac_validation_rate: See decryptfile
+        tag_header: Optional TagHeader (see write_tags.build_tag_header) written
+            in front of the audio; tag_header.applied tells whether it was
+        quality: Quality key of the stream (e.g. "MP3_320"), checked on resume
+    """
+    from deezspot.deezloader.decrypt_pool import get_decrypt_pool
+
+    stage = build_decrypt_stage(ids)
+    decrypt_pool = get_decrypt_pool()
+    if decrypt_pool is not None and not decrypt_pool.supports(stage):
+        decrypt_pool = None
+
+    part_path = f"{song_path}.part"
+    header_sizes = (0, tag_header.size) if tag_header is not None else (0,)
+    offset, header_size, file_size = __load_checkpoint(part_path, ids, quality, header_sizes)
+    if offset:
+        logger.info(f"Resuming {os.path.basename(song_path)} from byte {offset}")
+
+    try:
+        written, head, header_size = __decrypt_to_part(
+            open_stream, ids, song_path, part_path, stage, decrypt_pool, max_resumes,
+            tag_header, quality, offset, header_size, file_size, header_sizes
+        )
+    except _RESUMABLE_ERRORS:
+        # Network, disk or source trouble: a later run resumes from the checkpoint
+        raise
+    except Exception:
+        # Anything else would fail the same way again: drop the .part
+        __discard_checkpoint(part_path)
         raise
 
-def decryptfile(crypted_audio, ids, song_path):
+    os.replace(part_path, song_path)
+    if os.path.isfile(__sidecar_path(part_path)):
+        os.remove(__sidecar_path(part_path))
+    get_library_index().invalidate_directory(os.path.dirname(song_path))
+
+    logger.debug(f"Successfully decrypted and saved {stage.name}-encrypted file to {song_path} ({written} bytes)")
+
+    if tag_header is not None and header_size:
+        try:
+            tag_header.commit(song_path)
+            tag_header.applied = True
+        except OSError as e:
+            # The regular tag writer will rewrite the header instead
+            logger.warning(f"Could not finish the streamed tags of {song_path}: {e}")
+
+    if song_path.lower().endswith('.flac'):
+        validate_flac_output(song_path, head, written, flac_validation_rate)
+
+def decryptfile(crypted_audio, ids, song_path, flac_validation_rate=None):
     """
     Decrypt the audio file using either AES or Blowfish encryption.
     
@@ -199,155 +636,61 @@ def decryptfile(crypted_audio, ids, song_path):
         crypted_audio: The encrypted audio data
         ids: The track IDs containing encryption info
         song_path: Path where to save the decrypted file
+        flac_validation_rate: Fraction (0-1) of FLAC files re-read for a
+            structural check after decryption; defaults to stock_flac_validation_rate
     """
     try:
-        # Check encryption type
-        encryption_type = ids.get('encryption_type', 'aes')
-        # Check if this is a FLAC file based on file extension
-        is_flac = song_path.lower().endswith('.flac')
-        
-        if encryption_type == 'aes':
-            # Get the AES encryption key and nonce
-            key = bytes.fromhex(ids['key'])
-            nonce = bytes.fromhex(ids['nonce'])
-            
-            # For AES-CTR, we can decrypt chunk by chunk
-            counter = Counter.new(128, initial_value=int.from_bytes(nonce, byteorder='big'))
-            cipher = AES.new(key, AES.MODE_CTR, counter=counter)
-            
-            # Open the output file
-            with open(song_path, 'wb') as f:
-                # Process the data in chunks
-                for chunk in crypted_audio:
-                    if chunk:
-                        # Decrypt the chunk and write to file
-                        decrypted_chunk = cipher.decrypt(chunk)
-                        f.write(decrypted_chunk)
-                
-            logger.debug(f"Successfully decrypted and saved AES-encrypted file to {song_path}")
-            
-        elif encryption_type == 'blowfish':
-            # Customize Blowfish decryption based on file type
-            if is_flac:
-                logger.debug("Detected FLAC file - using special FLAC decryption handling")
-                decrypt_blowfish_flac(
-                    crypted_audio, 
-                    str(ids['track_id']), 
-                    ids['md5_origin'], 
-                    song_path
-                )
-            else:
-                # Use standard Blowfish decryption for MP3
-                decrypt_blowfish_track(
-                    crypted_audio, 
-                    str(ids['track_id']), 
-                    ids['md5_origin'], 
-                    song_path
-                )
+        stage = build_decrypt_stage(ids)
+
+        # Opt-in: hand the windows to worker processes instead of this thread
+        from deezspot.deezloader.decrypt_pool import get_decrypt_pool
+        decrypt_pool = get_decrypt_pool()
+
+        if decrypt_pool is not None and decrypt_pool.supports(stage):
+            written, head, _ = decrypt_pool.decrypt_to_file(crypted_audio, stage, song_path)
         else:
-            raise ValueError(f"Unknown encryption type: {encryption_type}")
+            with open(song_path, 'wb') as f:
+                written, head = run_pipeline(crypted_audio, [stage], f)
+
+        logger.debug(f"Successfully decrypted and saved {stage.name}-encrypted file to {song_path} ({written} bytes)")
+
+        if song_path.lower().endswith('.flac'):
+            validate_flac_output(song_path, head, written, flac_validation_rate)
             
     except Exception as e:
         logger.error(f"Failed to decrypt file: {str(e)}")
         raise
 
-def decrypt_blowfish_flac(crypted_audio, song_id, md5_origin, song_path):
+def validate_flac_output(song_path, head, size, validation_rate=None):
     """
-    Special decryption function for FLAC files using Blowfish encryption.
-    This implementation follows Deezer's encryption scheme exactly.
-    
-    In Deezer's encryption scheme:
-    - Data is processed in 2048-byte blocks
-    - Only every third block is encrypted (blocks 0, 3, 6, etc.)
-    - Partial blocks at the end of the file are not encrypted
-    - FLAC file structure must be preserved exactly
-    - The initialization vector is reset for each encrypted block
-    
+    Check a freshly decrypted FLAC file.
+
+    The signature check uses the bytes already seen by the pipeline; the
+    full structural analysis re-reads the file and only runs for a sampled
+    fraction of downloads.
+
     Args:
-        crypted_audio: Iterator of the encrypted audio data chunks
-        song_id: The song ID for generating the key
-        md5_origin: The MD5 hash of the track
-        song_path: Path where to save the decrypted file
+        song_path: Path of the decrypted file
+        head: First bytes written by the pipeline
+        size: Number of bytes written
+        validation_rate: Fraction (0-1) of files to analyze
     """
-    try:
-        # Calculate the Blowfish key
-        bf_key = __calcbfkey(song_id)
-        
-        # For debugging - log the key being used
-        logger.debug(f"Using Blowfish key for decryption: {bf_key.encode().hex()}")
-        
-        # Prepare to process the file
-        block_size = 2048  # Size of each block to process
-        
-        # We need to reconstruct the data from potentially variable-sized chunks into
-        # fixed-size blocks for proper decryption
-        buffer = bytearray()
-        block_count = 0  # Count of completed blocks
-        
-        # Open the output file
-        with open(song_path, 'wb') as output_file:
-            # Process each incoming chunk of data
-            for chunk in crypted_audio:
-                if not chunk:
-                    continue
-                
-                # Add current chunk to our buffer
-                buffer.extend(chunk)
-                
-                # Process as many complete blocks as we can
-                while len(buffer) >= block_size:
-                    # Extract a block from buffer
-                    block = buffer[:block_size]
-                    buffer = buffer[block_size:]
-                    
-                    # Determine if this block should be decrypted (every third block)
-                    if block_count % 3 == 0:
-                        # Ensure we have a complete block for decryption and it's a multiple of 8 bytes
-                        if len(block) == block_size and len(block) % 8 == 0:
-                            try:
-                                # Create a fresh cipher with the initialization vector for each block
-                                # This is crucial - we need to reset the IV for each encrypted block
-                                cipher = __newBlowfish(bf_key.encode(), __MODE_CBC, __idk)
-                                
-                                # Decrypt the block
-                                block = cipher.decrypt(block)
-                                logger.debug(f"Decrypted block {block_count} (size: {len(block)})")
-                            except Exception as e:
-                                logger.error(f"Failed to decrypt block {block_count}: {str(e)}")
-                                # Continue with the encrypted block rather than failing completely
-                    
-                    # Write the block (decrypted or not) to the output file
-                    output_file.write(block)
-                    block_count += 1
-            
-            # Write any remaining data in the buffer (this won't be decrypted as it's a partial block)
-            if buffer:
-                logger.debug(f"Writing final partial block of size {len(buffer)}")
-                output_file.write(buffer)
-        
-        # Final validation
-        if os.path.getsize(song_path) > 0:
-            with open(song_path, 'rb') as f:
-                if f.read(4) == b'fLaC':
-                    logger.info(f"FLAC file header verification passed")
-                else:
-                    logger.warning("FLAC file doesn't begin with proper 'fLaC' signature")
-            
-            logger.info(f"Successfully decrypted FLAC file to {song_path} ({os.path.getsize(song_path)} bytes)")
-            
-            # Run the detailed analysis
-            analysis = analyze_flac_file(song_path)
-            if analysis.get("potential_issues"):
-                logger.warning(f"Decryption completed but analysis found issues: {analysis['potential_issues']}")
-            else:
-                logger.info("FLAC analysis indicates the file structure is valid")
-                
+    if size == 0:
+        logger.error("Decrypted file is empty - decryption likely failed")
+        return
+
+    if head != b'fLaC':
+        logger.warning("FLAC file doesn't begin with proper 'fLaC' signature")
+
+    if validation_rate is None:
+        validation_rate = stock_flac_validation_rate
+
+    if validation_rate > 0 and random.random() < validation_rate:
+        analysis = analyze_flac_file(song_path)
+        if analysis.get("potential_issues"):
+            logger.warning(f"Decryption completed but analysis found issues: {analysis['potential_issues']}")
         else:
-            logger.error("Decrypted file is empty - decryption likely failed")
-            
-    except Exception as e:
-        logger.error(f"Failed to decrypt Blowfish FLAC file: {str(e)}")
-        raise
+            logger.debug("FLAC analysis indicates the file structure is valid")
 
 def analyze_flac_file(file_path, limit=100):
     """
@@ -445,4 +788,4 @@ def analyze_flac_file(file_path, limit=100):
         
     except Exception as e:
         logger.error(f"Error analyzing FLAC file: {str(e)}")
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
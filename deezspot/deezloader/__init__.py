@@ -3,6 +3,8 @@ import os
 import json
 import logging
 import re
+import threading
+import time
 from deezspot.deezloader.dee_api import API
 from deezspot.easy_spoty import Spo
 from deezspot.deezloader.deegw_api import API_GW
@@ -28,6 +30,7 @@ from deezspot.exceptions import (
     NoDataApi,
     AlbumNotFound,
     MarketAvailabilityError,
+    QuotaExceeded,
 )
 from deezspot.libutils.utils import (
     create_zip,
@@ -43,8 +46,13 @@ from deezspot.libutils.others_settings import (
     stock_not_interface,
     stock_zip,
     stock_save_cover,
-    stock_market
+    stock_market,
+    stock_max_workers,
+    stock_prefetch_lookahead,
+    stock_conversion_workers
 )
+from deezspot.libutils.id_map import get_id_map
+from deezspot.libutils.concurrency import run_in_order
 from deezspot.libutils.logging_utils import ProgressReporter, logger, report_progress
 import requests
 from difflib import SequenceMatcher
@@ -73,6 +81,52 @@ def _sim(a: str, b: str) -> float:
         return 0.0
     return SequenceMatcher(None, a, b).ratio()
 
+# Deezer's public API answers error code 4 past about 50 requests per 5 seconds
+_QUOTA_BACKOFF = 5
+_QUOTA_RETRIES = 3
+# The quota is shared by every lookup: the first one to hit it opens a
+# backoff window and the others wait for that window instead of their own
+_QUOTA_LOCK = threading.Lock()
+_quota_resume_at = 0.0
+
+def _quota_exceeded(data) -> bool:
+    return isinstance(data, dict) and ((data.get('error') or {}).get('code') == 4)
+
+def _quota_hold_off():
+    with _QUOTA_LOCK:
+        delay = _quota_resume_at - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+
+def _quota_back_off(attempt):
+    global _quota_resume_at
+    backoff = _QUOTA_BACKOFF * (attempt + 1)
+    with _QUOTA_LOCK:
+        now = time.monotonic()
+        if _quota_resume_at > now:
+            return
+        _quota_resume_at = now + backoff
+    logger.debug(f"Deezer API quota exceeded, retrying in {backoff}s")
+
+def _deezer_call(func, *args, **kwargs):
+    # Wait out quota errors instead of letting them end a lookup
+    for attempt in range(_QUOTA_RETRIES + 1):
+        _quota_hold_off()
+        try:
+            data = func(*args, **kwargs)
+        except QuotaExceeded:
+            if attempt == _QUOTA_RETRIES:
+                raise
+        else:
+            if not _quota_exceeded(data) or attempt == _QUOTA_RETRIES:
+                return data
+        _quota_back_off(attempt)
+
+def _api_failed(data) -> bool:
+    # Deezer answers errors with a JSON body: only "no data" (800) means not found
+    error = (data or {}).get('error')
+    return bool(error) and error.get('code') != 800
+
 # Clean for searching on Deezer
 def _remove_parentheses(string: str) -> str:
     # remove () and [] and {}, as well as anything inside
@@ -253,7 +307,9 @@ class DeeLogin:
         playlist_context=None,
         artist_separator: str = "; ",
         spotify_metadata: bool = False,
-        spotify_album_obj=None
+        spotify_album_obj=None,
+        max_workers: int = stock_max_workers,
+        prefetch_lookahead: int = stock_prefetch_lookahead
     ) -> Album:
 
         link_is_valid(link_album)
@@ -303,6 +359,8 @@ class DeeLogin:
         preferences.artist_separator = artist_separator
         preferences.spotify_metadata = bool(spotify_metadata)
         preferences.spotify_album_obj = spotify_album_obj
+        preferences.max_workers = max_workers
+        preferences.prefetch_lookahead = prefetch_lookahead
 
         if playlist_context:
             preferences.json_data = playlist_context['json_data']
@@ -336,7 +394,9 @@ class DeeLogin:
         bitrate=None,
         save_cover=stock_save_cover,
         market=stock_market,
-        artist_separator: str = "; "
+        artist_separator: str = "; ",
+        max_workers: int = stock_max_workers,
+        prefetch_lookahead: int = stock_prefetch_lookahead
     ) -> Playlist:
 
         link_is_valid(link_playlist)
@@ -371,6 +431,8 @@ class DeeLogin:
         preferences.save_cover = save_cover
         preferences.market = market
         preferences.artist_separator = artist_separator
+        preferences.max_workers = max_workers
+        preferences.prefetch_lookahead = prefetch_lookahead
 
         playlist = DW_PLAYLIST(preferences).dw()
 
@@ -416,14 +478,21 @@ class DeeLogin:
 
         return names
 
-    def convert_spoty_to_dee_link_track(self, link_track):
-        link_is_valid(link_track)
-        ids = get_ids(link_track)
-        
-        # Attempt via ISRC first
-        track_json = Spo.get_track(ids)
-        if not track_json:
-            raise TrackNotFound(url=link_track, message="Spotify track metadata fetch failed.")
+    @staticmethod
+    def __match_spotify_track(track_json):
+        """
+        Find the Deezer track matching a Spotify track JSON: by ISRC first,
+        then through a title/artist/album search, both validated on ISRC,
+        title and track number.
+
+        Args:
+            track_json: Spotify track JSON (as returned by Spo.get_track or
+                        found in playlist and album items)
+
+        Returns:
+            tuple: (Deezer track id or None, conclusive). conclusive is False
+                   when a Deezer API call failed, so a miss is not final.
+        """
         external_ids = track_json.get('external_ids') or {}
         spo_isrc = (external_ids.get('isrc') or '').upper()
         spo_title = track_json.get('name', '')
@@ -431,42 +500,50 @@ class DeeLogin:
         spo_tracknum = int(track_json.get('track_number') or 0)
         spo_artists = track_json.get('artists') or []
         spo_main_artist = (spo_artists[0].get('name') if spo_artists else '') or ''
+        conclusive = True
+
+        if spo_isrc:
+            try:
+                dz_json = _deezer_call(API.get_track_json, f"isrc:{spo_isrc}")
+                if _api_failed(dz_json):
+                    conclusive = False
+                elif dz_json and dz_json.get('id'):
+                    tn = (dz_json.get('track_position') or dz_json.get('track_number') or 0)
+                    title_match = max(
+                        _sim(spo_title, dz_json.get('title', '')),
+                        _sim(spo_title, dz_json.get('title_short', '')),
+                    )
+                    album_match = _sim(spo_album_title, (dz_json.get('album') or {}).get('title', ''))
+                    t_isrc = (dz_json.get('isrc') or '').upper()
+                    # Enforce ISRC match strictly in ISRC lookup path
+                    if (
+                        t_isrc == spo_isrc and
+                        title_match >= 0.90 and album_match >= 0.90 and tn == spo_tracknum
+                    ):
+                        return str(dz_json.get('id')), True
+            except Exception:
+                conclusive = False
 
-        try:
-            dz = API.get_track_json(f"isrc:{spo_isrc}")
-            if dz and dz.get('id'):
-                dz_json = dz
-                tn = (dz_json.get('track_position') or dz_json.get('track_number') or 0)
-                title_match = max(
-                    _sim(spo_title, dz_json.get('title', '')),
-                    _sim(spo_title, dz_json.get('title_short', '')),
-                )
-                album_match = _sim(spo_album_title, (dz_json.get('album') or {}).get('title', ''))
-                t_isrc = (dz_json.get('isrc') or '').upper()
-                # Enforce ISRC match strictly in ISRC lookup path
-                if (
-                    t_isrc and spo_isrc and t_isrc == spo_isrc and
-                    title_match >= 0.90 and album_match >= 0.90 and tn == spo_tracknum
-                ):
-                    return f"https://www.deezer.com/track/{dz_json.get('id')}"
-        except Exception:
-            pass
-        
         # Fallback: search by title + artist + album
         query = f'"track:\'{spo_title}\' artist:\'{spo_main_artist}\' album:\'{spo_album_title}\'"'
         try:
-            candidates = API.search_tracks_raw(query, limit=5)
+            candidates = _deezer_call(API.search_tracks_raw, query, limit=5)
+        except NoDataApi:
+            # A genuine empty result
+            candidates = []
         except Exception:
+            # Quota or service errors: the search did not happen
             candidates = []
-        
+            conclusive = False
+
         for cand in candidates:
             title_match_1 = max(
-                _sim(spo_title, dz_json.get('title', '')),
-                _sim(spo_title, dz_json.get('title_short', ''))
+                _sim(spo_title, cand.get('title', '')),
+                _sim(spo_title, cand.get('title_short', ''))
             )
             title_match_2 = max(
-                _sim(_remove_parentheses(spo_title), _remove_parentheses(dz_json.get('title', ''))),
-                _sim(_remove_parentheses(spo_title), _remove_parentheses(dz_json.get('title_short', '')))
+                _sim(_remove_parentheses(spo_title), _remove_parentheses(cand.get('title', ''))),
+                _sim(_remove_parentheses(spo_title), _remove_parentheses(cand.get('title_short', '')))
             )
             if max(title_match_1, title_match_2) < 0.90:
                 continue
@@ -474,8 +551,12 @@ class DeeLogin:
             if not c_id:
                 continue
             try:
-                dzc = API.get_track_json(str(c_id))
+                dzc = _deezer_call(API.get_track_json, str(c_id))
             except Exception:
+                conclusive = False
+                continue
+            if _api_failed(dzc):
+                conclusive = False
                 continue
             # Validate using track number and ISRC to be safe
             tn = (dzc.get('track_position') or dzc.get('track_number') or 0)
@@ -485,10 +566,106 @@ class DeeLogin:
             # Enforce ISRC strictly in fallback path as well: require present and equal
             if not spo_isrc or not t_isrc or t_isrc != spo_isrc:
                 continue
-            return f"https://www.deezer.com/track/{c_id}"
-        
+            return str(c_id), True
+
+        return None, conclusive
+
+    def convert_spoty_to_dee_link_track(self, link_track, spotify_objects=None):
+        link_is_valid(link_track)
+        ids = get_ids(link_track)
+
+        id_map = get_id_map()
+        known, dee_id = id_map.get("track", ids)
+        if known:
+            if dee_id:
+                return f"https://www.deezer.com/track/{dee_id}"
+            raise TrackNotFound(url=link_track, message=f"No Deezer equivalent was found for Spotify track {link_track} (cached miss)")
+
+        track_json = spotify_objects.track(ids) if spotify_objects else Spo.get_track(ids)
+        if not track_json:
+            raise TrackNotFound(url=link_track, message="Spotify track metadata fetch failed.")
+        spo_isrc = ((track_json.get('external_ids') or {}).get('isrc') or '').upper()
+
+        dee_id, conclusive = self.__match_spotify_track(track_json)
+        if dee_id or conclusive:
+            id_map.put("track", ids, dee_id, spo_isrc)
+        if dee_id:
+            return f"https://www.deezer.com/track/{dee_id}"
+
         raise TrackNotFound(url=link_track, message=f"Failed to find Deezer equivalent for ISRC {spo_isrc} from Spotify track {link_track}")
 
+    def convert_spoty_tracks_to_dee(self, tracks, max_workers=stock_conversion_workers) -> dict:
+        """
+        Convert many Spotify tracks to Deezer links at once.
+
+        Tracks already in the persistent id mapping are answered from it;
+        the others are matched on Deezer concurrently and stored. Track JSON
+        objects (e.g. the items of an already fetched playlist) carry the
+        ISRC needed for matching; tracks given by id or link are fetched
+        from Spotify in batches.
+
+        Args:
+            tracks: Spotify track JSON objects, ids or links
+            max_workers: Tracks matched on Deezer at the same time
+
+        Returns:
+            dict: {Spotify id: Deezer track link, or None if there is none}
+        """
+        track_jsons = {}
+        for track in tracks:
+            if isinstance(track, dict):
+                if track.get('id'):
+                    track_jsons[track['id']] = track
+            else:
+                track_jsons.setdefault(get_ids(track) if '/' in track else track, None)
+
+        id_map = get_id_map()
+        known = id_map.get_many("track", track_jsons)
+        pending = [spo_id for spo_id in track_jsons if spo_id not in known]
+
+        # Metadata is only fetched for ids without JSON, in batches
+        to_fetch = [spo_id for spo_id in pending if track_jsons[spo_id] is None]
+        if to_fetch:
+            try:
+                fetched = (Spo.get_tracks(to_fetch) or {}).get('tracks') or []
+            except Exception as e:
+                logger.warning(f"Could not fetch {len(to_fetch)} Spotify track(s) for conversion: {e}")
+                fetched = []
+            for track_json in fetched:
+                if track_json and track_json.get('id') in track_jsons:
+                    track_jsons[track_json['id']] = track_json
+
+        def match(spo_id):
+            track_json = track_jsons[spo_id]
+            if not track_json:
+                return spo_id, None, False, None
+            isrc = ((track_json.get('external_ids') or {}).get('isrc') or '').upper()
+            try:
+                dee_id, conclusive = self.__match_spotify_track(track_json)
+            except Exception as e:
+                logger.warning(f"Matching Spotify track {spo_id} on Deezer failed: {e}")
+                dee_id, conclusive = None, False
+            return spo_id, dee_id, conclusive, isrc
+
+        results = list(run_in_order(match, pending, max_workers, thread_name_prefix="deezspot-convert"))
+        id_map.put_many("track", [
+            (spo_id, dee_id, isrc)
+            for spo_id, dee_id, conclusive, isrc in results
+            if dee_id or conclusive
+        ])
+        if pending:
+            logger.debug(
+                f"Converted {len(pending)} Spotify track(s) to Deezer "
+                f"({len(track_jsons) - len(pending)} from the id mapping)"
+            )
+
+        resolved = {spo_id: dee_id for spo_id, dee_id, _, _ in results}
+        resolved.update(known)
+        return {
+            spo_id: f"https://www.deezer.com/track/{resolved[spo_id]}" if resolved.get(spo_id) else None
+            for spo_id in track_jsons
+        }
+
     def convert_isrc_to_dee_link_track(self, isrc_code: str) -> str:
         if not isinstance(isrc_code, str) or not isrc_code:
             raise ValueError("ISRC code must be a non-empty string.")
@@ -512,11 +689,20 @@ class DeeLogin:
         logger.info(f"Successfully converted ISRC {isrc_code} to Deezer link: {track_link_dee}")
         return track_link_dee
 
-    def convert_spoty_to_dee_link_album(self, link_album):
+    def convert_spoty_to_dee_link_album(self, link_album, spotify_objects=None):
         link_is_valid(link_album)
         ids = get_ids(link_album)
+
+        # Only matches are remembered: albums are converted one at a time
+        id_map = get_id_map()
+        _, dee_id = id_map.get("album", ids)
+        if dee_id:
+            return f"https://www.deezer.com/album/{dee_id}"
         
-        spotify_album_data = Spo.get_album(ids)
+        if spotify_objects is None:
+            from deezspot.spotloader.__spo_api__ import SpotifyObjectCache
+            spotify_objects = SpotifyObjectCache()
+        spotify_album_data = spotify_objects.album(ids)
         if not spotify_album_data:
             raise AlbumNotFound(f"Failed to fetch Spotify album metadata for {link_album}")
         
@@ -531,6 +717,7 @@ class DeeLogin:
             try:
                 dz_album = API.get_album_json(f"upc:{spo_upc}")
                 if dz_album.get('id') and _sim(spo_album_title, dz_album.get('title', '')) >= 0.90:
+                    id_map.put("album", ids, dz_album.get('id'), spo_upc)
                     return f"https://www.deezer.com/album/{dz_album.get('id')}"
             except Exception:
                 pass
@@ -555,6 +742,7 @@ class DeeLogin:
             upc = str(dzc.get('upc') or '').strip()
             if spo_upc and upc and spo_upc != upc:
                 continue
+            id_map.put("album", ids, c_id, spo_upc)
             link_dee = f"https://www.deezer.com/album/{c_id}"
             return link_dee
 
@@ -579,17 +767,18 @@ class DeeLogin:
         market=stock_market,
         playlist_context=None,
         artist_separator: str = "; ",
-        spotify_metadata: bool = False
+        spotify_metadata: bool = False,
+        spotify_objects=None
     ) -> Track:
 
-        link_dee = self.convert_spoty_to_dee_link_track(link_track)
+        link_dee = self.convert_spoty_to_dee_link_track(link_track, spotify_objects=spotify_objects)
 
         # If requested, prepare Spotify track object for tagging in preferences via playlist_context
         if spotify_metadata:
             try:
                 from deezspot.spotloader.__spo_api__ import tracking as spo_tracking
                 spo_ids = get_ids(link_track)
-                spo_track_obj = spo_tracking(spo_ids)
+                spo_track_obj = spo_tracking(spo_ids, objects=spotify_objects)
                 if spo_track_obj:
                     if playlist_context is None:
                         playlist_context = {}
@@ -642,20 +831,21 @@ class DeeLogin:
         market=stock_market,
         playlist_context=None,
         artist_separator: str = "; ",
-        spotify_metadata: bool = False
+        spotify_metadata: bool = False,
+        max_workers: int = stock_max_workers,
+        prefetch_lookahead: int = stock_prefetch_lookahead
     ) -> Album:
 
-        link_dee = self.convert_spoty_to_dee_link_album(link_album)
+        from deezspot.spotloader.__spo_api__ import SpotifyObjectCache
+        # The album JSON fetched for conversion is reused for tagging
+        spotify_objects = SpotifyObjectCache()
+        link_dee = self.convert_spoty_to_dee_link_album(link_album, spotify_objects=spotify_objects)
 
         spotify_album_obj = None
         if spotify_metadata:
             try:
-                # Fetch full Spotify album with tracks once and convert to albumObject
-                from deezspot.spotloader.__spo_api__ import tracking_album as spo_tracking_album
-                spo_ids = get_ids(link_album)
-                spotify_album_json = Spo.get_album(spo_ids)
-                if spotify_album_json:
-                    spotify_album_obj = spo_tracking_album(spotify_album_json)
+                # Built from the album JSON the conversion already fetched
+                spotify_album_obj = spotify_objects.album_object(get_ids(link_album))
             except Exception:
                 spotify_album_obj = None
 
@@ -677,7 +867,9 @@ class DeeLogin:
             playlist_context=playlist_context,
             artist_separator=artist_separator,
             spotify_metadata=spotify_metadata,
-            spotify_album_obj=spotify_album_obj
+            spotify_album_obj=spotify_album_obj,
+            max_workers=max_workers,
+            prefetch_lookahead=prefetch_lookahead
         )
 
         return album
@@ -801,6 +993,20 @@ class DeeLogin:
         failed_tracks_cb = []
         skipped_tracks_cb = []
 
+        # The playlist already holds every track's JSON: conversion and tagging
+        # read it from this run's cache instead of fetching each track again
+        from deezspot.spotloader.__spo_api__ import SpotifyObjectCache
+        # Podcast episodes have no Deezer track to match
+        track_jsons = [
+            item['track'] for item in playlist_tracks
+            if item.get('track') and item['track'].get('type', 'track') == 'track'
+        ]
+        spotify_objects = SpotifyObjectCache(track_jsons)
+
+        # Match every track on Deezer up front (ISRCs included);
+        # download_trackspo then finds them in the id mapping
+        self.convert_spoty_tracks_to_dee(track_jsons)
+
         for index, item in enumerate(playlist_tracks, 1):
             is_track = item.get('track')
             if not is_track:
@@ -852,7 +1058,8 @@ class DeeLogin:
                     initial_retry_delay=initial_retry_delay, retry_delay_increase=retry_delay_increase,
                     max_retries=max_retries, convert_to=convert_to, bitrate=bitrate,
                     save_cover=save_cover, market=market, playlist_context=playlist_ctx,
-                    artist_separator=artist_separator, spotify_metadata=spotify_metadata
+                    artist_separator=artist_separator, spotify_metadata=spotify_metadata,
+                    spotify_objects=spotify_objects
                 )
                 tracks.append(downloaded_track)
                 
@@ -0,0 +1,191 @@
+#!/usr/bin/python3
+
+import re
+import time
+from threading import Lock
+from urllib.parse import urlparse, urlunparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from deezspot.exceptions import TrackNotFound, MediaUrlExpired
+from deezspot.libutils.logging_utils import logger
+
+__mirror_host = re.compile(r"e-cdns-proxy-(\d+)\.dzcdn\.net")
+__mirror_count = 8
+
+# Hosts never seen before rank as if they answered in this many seconds
+UNKNOWN_HOST_LATENCY = 1.0
+# Weight of the newest latency sample in the moving average
+LATENCY_SMOOTHING = 0.3
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="deezspot-cdn")
+
+
+class HostScores:
+    """
+    Per-host time-to-first-byte and failure history, shared by every track
+    so later downloads start on the mirror that has been answering best.
+    """
+
+    def __init__(self):
+        self.__lock = Lock()
+        self.__hosts = {}
+
+    def record_success(self, host, latency):
+        with self.__lock:
+            entry = self.__hosts.setdefault(host, {"latency": latency, "failures": 0.0, "successes": 0})
+            entry["latency"] = (1 - LATENCY_SMOOTHING) * entry["latency"] + LATENCY_SMOOTHING * latency
+            entry["successes"] += 1
+            # Old failures fade once the host answers again
+            entry["failures"] /= 2
+
+    def record_failure(self, host):
+        with self.__lock:
+            entry = self.__hosts.setdefault(host, {"latency": UNKNOWN_HOST_LATENCY, "failures": 0.0, "successes": 0})
+            entry["failures"] += 1
+
+    def score(self, host):
+        """Lower is better: expected latency, doubled for every recent failure."""
+        with self.__lock:
+            entry = self.__hosts.get(host)
+            if entry is None:
+                return UNKNOWN_HOST_LATENCY
+            return entry["latency"] * (2 ** min(entry["failures"], 8))
+
+    def rank(self, urls):
+        # sorted() is stable: equally scored urls keep the API's order
+        return sorted(urls, key=lambda url: self.score(urlparse(url).netloc))
+
+    def snapshot(self):
+        with self.__lock:
+            return {host: dict(entry) for host, entry in self.__hosts.items()}
+
+    def reset(self):
+        with self.__lock:
+            self.__hosts.clear()
+
+
+host_scores = HostScores()
+
+
+def expand_mirrors(song_links):
+    """
+    Add the other e-cdns-proxy-N mirrors of every dzcdn source, after the
+    sources returned by the media API.
+
+    Args:
+        song_links: Source urls in API order
+
+    Returns:
+        list: Unique candidate urls
+    """
+    candidates = list(dict.fromkeys(link for link in song_links if link))
+
+    for link in list(candidates):
+        parsed = urlparse(link)
+        if not __mirror_host.search(parsed.netloc):
+            continue
+        for i in range(__mirror_count):
+            new_host = __mirror_host.sub(f"e-cdns-proxy-{i}.dzcdn.net", parsed.netloc)
+            mirror = urlunparse(parsed._replace(netloc=new_host))
+            if mirror not in candidates:
+                candidates.append(mirror)
+
+    return candidates
+
+
+def _timed_open(opener, url):
+    host = urlparse(url).netloc
+    start = time.monotonic()
+    try:
+        stream = opener(url)
+    except MediaUrlExpired:
+        # A stale signature says nothing about the host
+        raise
+    except Exception:
+        host_scores.record_failure(host)
+        raise
+    host_scores.record_success(host, time.monotonic() - start)
+    return stream
+
+
+def _close_loser(future):
+    if not future.cancelled() and future.exception() is None:
+        try:
+            future.result().close()
+        except Exception:
+            pass
+
+
+def _abandon(futures):
+    """Cancel the attempts still running and close any stream they open."""
+    for future in futures:
+        future.cancel()
+        future.add_done_callback(_close_loser)
+
+
+def race_sources(song_links, opener, max_parallel=3, stagger=0.25):
+    """
+    Open the fastest answering source among the media sources and their
+    CDN mirrors.
+
+    Candidates are tried best score first. A new one joins the race when a
+    running attempt fails or has not produced its first bytes within
+    `stagger` seconds, with at most `max_parallel` attempts in flight. The
+    first successful stream wins; late winners are closed.
+
+    Args:
+        song_links: Source urls in API order
+        opener: Callable opening and probing one url (e.g. returning an AudioStream)
+        max_parallel: Maximum concurrent attempts
+        stagger: Seconds to wait on the running attempts before starting another
+
+    Returns:
+        The stream returned by opener for the winning url
+
+    Raises:
+        MediaUrlExpired: As soon as a candidate refuses the url (401/403/410);
+            its mirrors are not tried
+        TrackNotFound: If every candidate failed
+    """
+    candidates = iter(host_scores.rank(expand_mirrors(song_links)))
+    pending = {}
+    last_error = None
+    attempts = 0
+
+    def launch():
+        nonlocal attempts
+        url = next(candidates, None)
+        if url is None:
+            return False
+        pending[_EXECUTOR.submit(_timed_open, opener, url)] = url
+        attempts += 1
+        return True
+
+    launch()
+    while pending:
+        done, _ = wait(pending, timeout=stagger, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            url = pending.pop(future)
+            try:
+                stream = future.result()
+            except MediaUrlExpired:
+                # The mirrors share the signature: new urls are needed, not another host
+                _abandon(pending)
+                raise
+            except Exception as e:
+                last_error = e
+                logger.debug(f"CDN source {urlparse(url).netloc} failed: {e}")
+                continue
+
+            _abandon(pending)
+            logger.debug(f"CDN source {urlparse(url).netloc} won after {attempts} attempt(s)")
+            return stream
+
+        # Nothing answered yet, or an attempt failed: widen the race
+        while len(pending) < max_parallel:
+            if not launch():
+                break
+            if not done:
+                break
+
+    raise TrackNotFound(message=f"All {attempts} CDN sources failed. Last error: {last_error}")
@@ -0,0 +1,285 @@
+#!/usr/bin/python3
+
+import os
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from threading import Lock
+from Crypto.Cipher import AES
+from Crypto.Util import Counter
+from deezspot.deezloader.__download_utils__ import (
+    AESCTRStage,
+    BlowfishStripeStage,
+    TagHeaderWriter,
+    align_window,
+    checkpoint_floor,
+    decrypt_window,
+)
+from deezspot.libutils.logging_utils import logger
+
+# --- Opt-in process pool shared by every download ---
+_POOL = None
+_POOL_LOCK = Lock()
+
+
+def _decrypt_job(shm_name, length, song_path, offset, cipher_spec, file_offset=None):
+    """
+    Worker side: decrypt one window in shared memory and write it at its
+    offset in the output file.
+
+    Args:
+        offset: Stream offset of the window (keystream / stripe position)
+        song_path: Output file, or None to only decrypt the window in place
+        file_offset: Position of the window in the file (defaults to offset)
+
+    Returns:
+        bytes: The first 4 decrypted bytes for the window at offset 0, else b""
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        view = shm.buf[:length]
+        try:
+            if cipher_spec[0] == 'blowfish':
+                decrypt_window(view, length, cipher_spec[1])
+            else:
+                _, key, nonce = cipher_spec
+                # CTR keystream position of this window: one counter block per 16 bytes
+                initial_value = (int.from_bytes(nonce, byteorder='big') + offset // 16) % (1 << 128)
+                cipher = AES.new(key, AES.MODE_CTR, counter=Counter.new(128, initial_value=initial_value))
+                cipher.decrypt(view, output=view)
+
+            if song_path is not None:
+                with open(song_path, 'r+b') as f:
+                    f.seek(offset if file_offset is None else file_offset)
+                    f.write(view)
+
+            return bytes(view[:4]) if offset == 0 else b""
+        finally:
+            view.release()
+    finally:
+        shm.close()
+
+
+def _cipher_spec(stage):
+    if isinstance(stage, BlowfishStripeStage):
+        return ('blowfish', stage.bf_key)
+    if isinstance(stage, AESCTRStage):
+        return ('aes', stage.key, stage.nonce)
+    return None
+
+
+class DecryptProcessPool:
+    """
+    Decrypts audio in worker processes so concurrent downloads are not
+    bound to one core by the GIL.
+
+    The network reader fills a small ring of shared memory windows per
+    download; each full window is handed to a worker that decrypts it in
+    place and writes it at its offset in the output file, while the reader
+    keeps filling the next free window.
+    """
+
+    def __init__(self, processes=None, window_size=None, slots=None):
+        self.processes = processes or os.cpu_count() or 1
+        self.window_size = align_window(window_size)
+        # Enough windows in flight per download to keep every worker busy
+        self.slots = slots or self.processes * 2
+        # spawn: forking a process that runs download threads is not safe
+        self.__executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+
+    def supports(self, stage):
+        return _cipher_spec(stage) is not None
+
+    def decrypt_to_file(
+        self,
+        crypted_audio,
+        stage,
+        song_path,
+        offset=0,
+        tag_header=None,
+        header_size=0,
+        on_checkpoint=None
+    ):
+        """
+        Decrypt a stream into song_path with the worker processes.
+
+        Args:
+            crypted_audio: Iterable of encrypted chunks, or a file-like object with readinto()
+            stage: AESCTRStage or BlowfishStripeStage holding the track key
+            song_path: Path where to save the decrypted file; an existing
+                file is cut to the data before offset and written on from there
+            offset: Stream offset of the first chunk (a checkpoint boundary)
+            tag_header: Optional TagHeader spliced in front of the audio
+                (see TagHeaderWriter) when header_size is None
+            header_size: Bytes of tag header already in front of the stream
+                data, or None to decide it from the first window
+            on_checkpoint: Called with (checkpoint offset, header size) each
+                time every window before the checkpoint is on disk
+
+        Returns:
+            tuple: (bytes written, first 4 bytes of the output, header size)
+        """
+        cipher_spec = _cipher_spec(stage)
+        if cipher_spec is None:
+            raise ValueError(f"Stage {stage.name} cannot run in the process pool")
+        if tag_header is None or offset:
+            header_size = header_size or 0
+
+        window_size = self.window_size
+        windows = [shared_memory.SharedMemory(create=True, size=window_size) for _ in range(self.slots)]
+        free = deque(range(self.slots))
+        pending = deque()
+        head = b""
+        start = done = offset
+        base = header_size or 0
+
+        def finished(future, end):
+            nonlocal head, done
+            head = future.result() or head
+            done = end
+            # Windows complete in submission order: everything before end is on disk
+            if on_checkpoint is not None and end == checkpoint_floor(end):
+                on_checkpoint(end, base)
+
+        def submit(slot, length):
+            nonlocal offset, head, base, header_size, done
+            if header_size is None:
+                # Decrypt the first window only, then let TagHeaderWriter
+                # decide where the audio goes behind the tags
+                _decrypt_job(windows[slot].name, length, None, offset, cipher_spec)
+                view = windows[slot].buf[:length]
+                try:
+                    head = bytes(view[:4])
+                    with open(song_path, 'r+b') as f:
+                        writer = TagHeaderWriter(f, tag_header)
+                        writer.write(view)
+                        writer.finish()
+                finally:
+                    view.release()
+                base = header_size = writer.header_size
+                free.append(slot)
+                offset += length
+                done = offset
+                if on_checkpoint is not None and offset == checkpoint_floor(offset):
+                    on_checkpoint(offset, base)
+                return
+            future = self.__executor.submit(
+                _decrypt_job, windows[slot].name, length, song_path, offset, cipher_spec, base + offset
+            )
+            pending.append((future, slot, offset, offset + length))
+            offset += length
+
+        def next_slot():
+            if not free:
+                future, slot, _, end = pending.popleft()
+                finished(future, end)
+                free.append(slot)
+            return free.popleft()
+
+        try:
+            # Workers write at offsets into the file prepared here
+            with open(song_path, 'r+b' if os.path.isfile(song_path) else 'wb') as f:
+                f.truncate(base + offset)
+
+            slot, filled = None, 0
+            if hasattr(crypted_audio, 'readinto'):
+                while True:
+                    if slot is None:
+                        slot, filled = next_slot(), 0
+                    n = crypted_audio.readinto(windows[slot].buf[filled:window_size])
+                    if not n:
+                        break
+                    filled += n
+                    if filled == window_size:
+                        submit(slot, filled)
+                        slot = None
+            else:
+                for chunk in crypted_audio:
+                    if not chunk:
+                        continue
+                    chunk_view = memoryview(chunk)
+                    pos, chunk_len = 0, len(chunk_view)
+                    while pos < chunk_len:
+                        if slot is None:
+                            slot, filled = next_slot(), 0
+                        n = min(window_size - filled, chunk_len - pos)
+                        windows[slot].buf[filled:filled + n] = chunk_view[pos:pos + n]
+                        filled += n
+                        pos += n
+                        if filled == window_size:
+                            submit(slot, filled)
+                            slot = None
+
+            if slot is not None and filled:
+                submit(slot, filled)
+
+            while pending:
+                future, _, _, end = pending.popleft()
+                finished(future, end)
+
+            return offset - start, head, base
+        finally:
+            # Never unlink a window a worker may still be reading. Windows
+            # already running still land on disk: checkpoint the ones that
+            # follow on without a gap, so a broken stream resumes after them
+            for future, _, _, _ in pending:
+                future.cancel()
+            for future, _, window_start, end in pending:
+                if future.cancelled():
+                    continue
+                try:
+                    future.result()
+                except Exception:
+                    continue
+                if window_start == done:
+                    done = end
+                    if on_checkpoint is not None and end == checkpoint_floor(end):
+                        try:
+                            on_checkpoint(end, base)
+                        except Exception:
+                            pass
+            for window in windows:
+                window.close()
+                window.unlink()
+
+    def shutdown(self):
+        self.__executor.shutdown(wait=True)
+
+
+def enable_process_decryption(processes=None, window_size=None):
+    """
+    Opt in to decrypting downloads in a pool of worker processes.
+
+    Args:
+        processes: Number of worker processes (defaults to the CPU count)
+        window_size: Bytes handed to a worker at a time (aligned to the stripe layout)
+
+    Returns:
+        DecryptProcessPool: The active pool
+    """
+    global _POOL
+    with _POOL_LOCK:
+        old_pool, _POOL = _POOL, DecryptProcessPool(processes, window_size)
+    if old_pool is not None:
+        old_pool.shutdown()
+    logger.info(f"Process decryption enabled with {_POOL.processes} workers")
+    return _POOL
+
+
+def disable_process_decryption():
+    """Go back to decrypting in the downloading thread and stop the workers."""
+    global _POOL
+    with _POOL_LOCK:
+        old_pool, _POOL = _POOL, None
+    if old_pool is not None:
+        old_pool.shutdown()
+
+
+def get_decrypt_pool():
+    """Return the active DecryptProcessPool, or None if process decryption is off."""
+    return _POOL
+
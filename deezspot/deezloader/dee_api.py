@@ -1,11 +1,16 @@
 #!/usr/bin/python3
 
 import requests
-from requests import get as req_get
-from deezspot.exceptions import NoDataApi
+from deezspot.libutils.http_client import get as req_get
+from deezspot.libutils.cover_cache import cached_cover
+from deezspot.exceptions import NoDataApi, QuotaExceeded
 from deezspot.libutils.logging_utils import logger
 from .__dee_api__ import tracking, tracking_album, tracking_playlist
 
+# The one cover size fetched for albums, tracks and episodes: the album art
+# size, so every caller shares the same cover cache entry
+COVER_SIZE = "1400x1400"
+
 class API:
 	__api_link = "https://api.deezer.com/"
 	__cover = "https://e-cdns-images.dzcdn.net/images/cover/%s/{}-000000-80-0-0.jpg"
@@ -69,14 +74,24 @@ class API:
 		url = f"{cls.__api_link}track/{track_id_or_isrc}"
 		return cls.__get_api(url)
 
+	@staticmethod
+	def __check_search(infos, query):
+		# Only an answer without error (or "no data", 800) tells the query has no result
+		error = infos.get('error')
+		if error and error.get('code') == 4:
+			raise QuotaExceeded(f"Deezer API quota exceeded while searching {query}")
+		if error and error.get('code') != 800:
+			raise requests.exceptions.RequestException(f"Deezer API error while searching {query}: {error}")
+		if infos.get('total', 0) == 0:
+			raise NoDataApi(query)
+
 	@classmethod
 	def search_tracks_raw(cls, query: str, limit: int = 25) -> list[dict]:
 		"""Return raw track objects from search for more complete fields (readable, rank, etc.)."""
 		url = f"{cls.__api_link}search/track"
 		params = {"q": query, "limit": limit}
 		infos = cls.__get_api(url, params=params)
-		if infos.get('total', 0) == 0:
-			raise NoDataApi(query)
+		cls.__check_search(infos, query)
 		return infos.get('data', [])
 
 	@classmethod
@@ -85,8 +100,7 @@ class API:
 		url = f"{cls.__api_link}search/album"
 		params = {"q": query, "limit": limit}
 		infos = cls.__get_api(url, params=params)
-		if infos.get('total', 0) == 0:
-			raise NoDataApi(query)
+		cls.__check_search(infos, query)
 		return infos.get('data', [])
 
 	@classmethod
@@ -222,16 +236,20 @@ class API:
 		return infos.get('data', [])
 
 	@classmethod
-	def get_img_url(cls, md5_image, size = "1200x1200"):
+	def get_img_url(cls, md5_image, size = COVER_SIZE):
 		cover = cls.__cover.format(size)
 		image_url = cover % md5_image
 		return image_url
 
 	@classmethod
-	def choose_img(cls, md5_image, size = "1200x1200"):
-		image_url = cls.get_img_url(md5_image, size)
-		image = req_get(image_url).content
-		if len(image) == 13:
-			image_url = cls.get_img_url("", size)
+	def choose_img(cls, md5_image, size = COVER_SIZE):
+		def fetch():
+			image_url = cls.get_img_url(md5_image, size)
 			image = req_get(image_url).content
-		return image
+			if len(image) == 13:
+				image_url = cls.get_img_url("", size)
+				image = req_get(image_url).content
+			return image
+
+		# Every track of an album shares its cover: fetch it once
+		return cached_cover(f"deezer:{md5_image}:{size}", fetch)
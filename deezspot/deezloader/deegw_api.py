@@ -7,14 +7,62 @@ from deezspot.exceptions import (
     BadCredentials,
     TrackNotFound,
     NoRightOnMedia,
+    MediaUrlExpired,
 )
-from requests import (
+from deezspot.libutils.http_client import (
     get as req_get,
     post as req_post,
+    mount_adapter,
+    send_idempotent,
 )
 from deezspot.libutils.logging_utils import logger
-import re
-from urllib.parse import urlparse, urlunparse
+from deezspot.deezloader.cdn_selector import race_sources
+from deezspot.libutils.concurrency import MemoCache
+
+# Lyrics are requested by the prefetcher and again by every tagging pass
+_LYRICS_CACHE = MemoCache(maxsize=512)
+# CDN answers to a signed url that expired or was revoked
+EXPIRED_URL_STATUSES = (401, 403, 410)
+
+class AudioStream:
+    """
+    A CDN audio response whose first chunk has already been read to prove
+    the file is there. The rest of the body is still on the socket and is
+    pulled chunk by chunk by iter_content(), so memory stays bounded.
+    """
+
+    def __init__(self, response, probe_size = 2048, start = 0):
+        self.response = response
+        self.url = response.url
+        self.status_code = response.status_code
+        self.headers = response.headers
+        # Byte offset of the first chunk in the file (non-zero for honoured Range requests)
+        self.start = start
+        self.__first_chunk = next(response.iter_content(probe_size), b"")
+
+    def __bool__(self):
+        return bool(self.__first_chunk)
+
+    @property
+    def total_size(self):
+        """Size of the whole file (not just this range), or None if the headers do not tell."""
+        content_range = self.headers.get('Content-Range') or ''
+        total = content_range.rsplit('/', 1)[-1] if '/' in content_range else ''
+        if total.isdigit():
+            return int(total)
+        length = self.headers.get('Content-Length') or ''
+        if length.isdigit():
+            return self.start + int(length)
+        return None
+
+    def iter_content(self, chunk_size = 2048):
+        first_chunk, self.__first_chunk = self.__first_chunk, b""
+        if first_chunk:
+            yield first_chunk
+        yield from self.response.iter_content(chunk_size)
+
+    def close(self):
+        self.response.close()
 
 class API_GW:
 
@@ -25,7 +73,7 @@ class API_GW:
         email = None,
         password = None
     ):
-        cls.__req = Session()
+        cls.__req = mount_adapter(Session())
         cls.__arl = arl
         cls.__email = email
         cls.__password = password
@@ -43,6 +91,15 @@ class API_GW:
         cls.__get_album_data = "song.getListByAlbum"
         cls.__get_playlist_data = "playlist.getSongs"
         cls.__get_episode_data = "episode.getData"
+        cls.__read_only_methods = frozenset([
+            cls.__get_lyric,
+            cls.__get_song_data,
+            cls.__get_page_track,
+            cls.__get_user_data,
+            cls.__get_album_data,
+            cls.__get_playlist_data,
+            cls.__get_episode_data,
+        ])
 
         cls.__get_media_url = "https://media.deezer.com/v1/get_url"
         cls.__get_auth_token_url = "https://api.deezer.com/auth/token"
@@ -137,11 +194,20 @@ class API_GW:
             "method": method
         }
 
-        results = cls.__req.post(
-            cls.__private_api_link,
-            params = params,
-            json = json_data
-        ).json()['results']
+        def send():
+            return cls.__req.post(
+                cls.__private_api_link,
+                params = params,
+                json = json_data
+            )
+
+        # The session adapter only retries GETs: lookups are retried here
+        if method in cls.__read_only_methods:
+            response = send_idempotent(send)
+        else:
+            response = send()
+
+        results = response.json()['results']
 
         if not results and repeats != 0:
             cls.__refresh_token()
@@ -221,7 +287,9 @@ class API_GW:
             "sng_id": ids
         }
 
-        infos = cls.__get_api(cls.__get_lyric, json_data)
+        infos = _LYRICS_CACHE.get(
+            str(ids), lambda: cls.__get_api(cls.__get_lyric, json_data)
+        )
 
         return infos
 
@@ -268,44 +336,71 @@ class API_GW:
 
         return song_url
 
+    @classmethod
+    def __open_stream(cls, song_link, offset = 0):
+        """
+        Open a streaming GET on a CDN url and probe it without buffering the body.
+
+        Args:
+            song_link: The CDN url
+            offset: Byte offset to resume from, requested with a Range header
+
+        Returns:
+            AudioStream: The probed stream, positioned after its first chunk
+
+        Raises:
+            MediaUrlExpired: If the CDN refused the signed url
+            TrackNotFound: If the status, headers or first chunk show no audio
+        """
+        headers = {"Range": f"bytes={offset}-"} if offset else None
+        crypted_audio = req_get(song_link, stream=True, timeout=15, headers=headers)
+        try:
+            if crypted_audio.status_code in EXPIRED_URL_STATUSES:
+                raise MediaUrlExpired(song_link, f"CDN returned HTTP {crypted_audio.status_code} for {song_link}")
+            if crypted_audio.status_code not in (200, 206):
+                raise TrackNotFound(song_link, f"CDN returned HTTP {crypted_audio.status_code} for {song_link}")
+            if crypted_audio.headers.get('Content-Length') == '0':
+                raise TrackNotFound(song_link, f"CDN returned an empty body for {song_link}")
+            start = offset if crypted_audio.status_code == 206 else 0
+            stream = AudioStream(crypted_audio, start=start)
+            if not stream:
+                raise TrackNotFound(song_link, f"CDN returned an empty body for {song_link}")
+            return stream
+        except Exception:
+            crypted_audio.close()
+            raise
+
     @classmethod 
     def song_exist(cls, song_link):
         if song_link and 'spreaker.com' in song_link:
             return req_get(song_link, stream=True)
-        
-        try:
-            crypted_audio = req_get(song_link, stream=True, timeout=15)
-            if len(crypted_audio.content) == 0:
-                raise TrackNotFound
-            return crypted_audio
-        except Exception as e:
-            # DNS fallback across dzcdn proxy hosts (e-cdns-proxy-0..7)
-            try:
-                parsed = urlparse(song_link)
-                host = parsed.netloc
-                if re.search(r"e-cdns-proxy-\d+\.dzcdn\.net", host):
-                    m = re.search(r"e-cdns-proxy-(\d+)\.dzcdn\.net", host)
-                    original_idx = int(m.group(1)) if m else -1
-                    for i in range(0, 8):
-                        if i == original_idx:
-                            continue
-                        new_host = re.sub(r"e-cdns-proxy-\d+\.dzcdn\.net", f"e-cdns-proxy-{i}.dzcdn.net", host)
-                        new_url = urlunparse((parsed.scheme, new_host, parsed.path, parsed.params, parsed.query, parsed.fragment))
-                        try:
-                            alt_resp = req_get(new_url, stream=True, timeout=15)
-                            if len(alt_resp.content) == 0:
-                                continue
-                            return alt_resp
-                        except Exception:
-                            continue
-            except Exception:
-                pass
-            # If all fallbacks failed, re-raise as TrackNotFound/Connection error
-            raise
+
+        # The link races its e-cdns-proxy-0..7 mirrors, best known host first
+        return cls.open_best_source([song_link])
+
+    @classmethod
+    def open_best_source(cls, song_links, offset = 0):
+        """
+        Open the fastest answering source among media sources and their CDN mirrors.
+
+        Args:
+            song_links: Source urls from the media API, in API order
+            offset: Byte offset to resume from (see AudioStream.start)
+
+        Returns:
+            AudioStream: The probed stream of the winning source
+
+        Raises:
+            TrackNotFound: If no source answered with audio
+        """
+        return race_sources(song_links, lambda url: cls.__open_stream(url, offset))
 
     @classmethod
     def get_medias_url(cls, tracks_token, quality):
-        # Only request the specific desired quality to avoid unexpected fallbacks
+        # A single quality is requested on its own to avoid unexpected
+        # fallbacks; a list of qualities asks for the best available one,
+        # in list order (each media entry reports its "format")
+        formats = [quality] if isinstance(quality, str) else list(quality)
         json_data = {
             "license_token": cls.__license_token,
             "media": [
@@ -314,8 +409,9 @@ class API_GW:
                     "formats": [
                         {
                             "cipher": "BF_CBC_STRIPE",
-                            "format": quality
+                            "format": c_format
                         }
+                        for c_format in formats
                     ]
                 }
             ],
@@ -324,6 +420,7 @@ class API_GW:
 
         infos = req_post(
             cls.__get_media_url,
+            idempotent = True,
             json = json_data
         ).json()
 
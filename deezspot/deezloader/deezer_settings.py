@@ -20,4 +20,6 @@ qualities = {
 		"f_format": ".mp3",
 		"s_quality": "128"
 	}
-}
\ No newline at end of file
+}
+# Fraction of FLAC downloads re-read for a structural check after decryption
+stock_flac_validation_rate = 0.0
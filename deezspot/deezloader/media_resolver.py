@@ -0,0 +1,256 @@
+#!/usr/bin/python3
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+from deezspot.exceptions import NoRightOnMedia
+from deezspot.deezloader.__utils__ import check_track_token
+from deezspot.deezloader.deezer_settings import qualities
+from deezspot.libutils.logging_utils import logger
+
+# Tracks per get_url request
+CHUNK_SIZE = 25
+# Lifetime of an answer with media but no expiry
+DEFAULT_TTL = 600
+# Lifetime of a "not available" answer: short, rights and rate limits change
+NEGATIVE_TTL = 60
+# Entries this close to their expiry are resolved again
+EXPIRY_MARGIN = 60
+MAX_ENTRIES = 4096
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="deezspot-media")
+
+
+def _normalize_media(media):
+    """Mark errors and empty answers as unavailable, like check_sources always did."""
+    if not media or "errors" in media or not media.get('media'):
+        return {"media": []}
+    return media
+
+
+def _expiry(media, now):
+    expiries = [entry.get('exp') for entry in media.get('media', []) if entry.get('exp')]
+    if expiries:
+        return min(expiries) - EXPIRY_MARGIN
+    if not media.get('media'):
+        return now + NEGATIVE_TTL
+    return now + DEFAULT_TTL
+
+
+def media_format(media):
+    """Quality key of a get_url answer, or None if it has no media."""
+    entries = (media or {}).get('media') or []
+    return entries[0].get('format') if entries else None
+
+
+def quality_ladder(quality, track=None):
+    """
+    Qualities to negotiate for a track: the requested one, then the others
+    in deezer_settings order (the order recursive quality search has always
+    used). Qualities whose FILESIZE_* field in song.getData is 0 are known
+    to be missing and left out.
+
+    Args:
+        quality: Requested quality key
+        track: Optional infos_dw dict of the track
+
+    Returns:
+        list: Quality keys, best first
+    """
+    ladder = [quality] + [c_quality for c_quality in qualities if c_quality != quality]
+    if track is not None:
+        available = [c_quality for c_quality in ladder if str(track.get(f"FILESIZE_{c_quality}")) != "0"]
+        # Nothing known to exist: let the API have the final word on the requested quality
+        ladder = available or [quality]
+    return ladder
+
+
+class MediaResolver:
+    """
+    Resolves track tokens to CDN media urls through the get_url API.
+
+    Tokens are sent in chunks of CHUNK_SIZE; the chunks of every requested
+    quality are fetched concurrently. Answers are kept per (token, quality)
+    until the urls expire, so quality fallbacks and retries of the same
+    track do not call the API again.
+    """
+
+    def __init__(self, chunk_size=CHUNK_SIZE, max_entries=MAX_ENTRIES):
+        self.chunk_size = chunk_size
+        self.max_entries = max_entries
+        self.__lock = Lock()
+        self.__entries = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "requests": 0, "fallbacks": 0}
+
+    def __lookup(self, token, quality, now):
+        with self.__lock:
+            entry = self.__entries.get((token, quality))
+            if entry is None:
+                return None
+            expires_at, media = entry
+            if expires_at <= now:
+                del self.__entries[(token, quality)]
+                return None
+            self.__entries.move_to_end((token, quality))
+            return media
+
+    def __store(self, token, quality, media, now):
+        with self.__lock:
+            self.__entries[(token, quality)] = (_expiry(media, now), media)
+            self.__entries.move_to_end((token, quality))
+            while len(self.__entries) > self.max_entries:
+                self.__entries.popitem(last=False)
+
+    def __fetch_chunk(self, chunk, formats, fallback):
+        """formats: one quality key, or a ladder of them (the first one is used by fallback)."""
+        from deezspot.deezloader.deegw_api import API_GW
+        tokens = [token for token, _ in chunk]
+        with self.__lock:
+            self.stats["requests"] += 1
+        try:
+            medias = API_GW.get_medias_url(tokens, formats)
+        except NoRightOnMedia:
+            if fallback is None:
+                raise
+            quality = formats if isinstance(formats, str) else formats[0]
+            # No right on the batch: resolve each track the legacy way
+            logger.debug(f"get_url refused {len(chunk)} {quality} token(s); resolving them one by one")
+            with self.__lock:
+                self.stats["fallbacks"] += len(chunk)
+            return [fallback(track, quality) for _, track in chunk]
+        return [_normalize_media(media) for media in medias]
+
+    def resolve(self, tracks, qualities, fallback=None):
+        """
+        Resolve the media urls of tracks for one or more qualities.
+
+        Args:
+            tracks: infos_dw dicts of non-episode tracks (with TRACK_TOKEN)
+            qualities: Quality keys to resolve, all in the same round
+            fallback: Callable(track, quality) returning the media of one
+                      track when the API refuses the batch (NoRightOnMedia)
+
+        Returns:
+            dict: {quality: [media for each track, in order]}
+        """
+        now = time.time()
+        tokens = [check_track_token(track) for track in tracks]
+        results = {quality: [None] * len(tracks) for quality in qualities}
+        futures = []
+
+        for quality in qualities:
+            missing = []
+            for i, token in enumerate(tokens):
+                media = self.__lookup(token, quality, now)
+                if media is None:
+                    missing.append(i)
+                else:
+                    results[quality][i] = media
+            with self.__lock:
+                self.stats["hits"] += len(tokens) - len(missing)
+                self.stats["misses"] += len(missing)
+
+            # The same token may appear twice (e.g. a playlist repeating a song)
+            unique = list(dict.fromkeys(tokens[i] for i in missing))
+            track_by_token = {tokens[i]: tracks[i] for i in missing}
+            for start in range(0, len(unique), self.chunk_size):
+                chunk = [(token, track_by_token[token]) for token in unique[start:start + self.chunk_size]]
+                futures.append((quality, chunk, _EXECUTOR.submit(self.__fetch_chunk, chunk, quality, fallback)))
+
+        for quality, chunk, future in futures:
+            resolved = {}
+            for (token, _), media in zip(chunk, future.result()):
+                self.__store(token, quality, media, now)
+                resolved[token] = media
+            for i, token in enumerate(tokens):
+                if results[quality][i] is None and token in resolved:
+                    results[quality][i] = resolved[token]
+
+        return results
+
+    def resolve_ladder(self, tracks, quality, fallback=None):
+        """
+        Negotiate the best available quality of every track in one get_url
+        round: each track's quality_ladder is sent as a single ordered
+        format list and the API answers with the best format it has.
+
+        The answer is cached under the quality it reports, and the rungs
+        above it are cached as unavailable, so later single-quality
+        lookups for the track need no request either. An answer without
+        media caches nothing.
+
+        Args:
+            tracks: infos_dw dicts of non-episode tracks (with TRACK_TOKEN)
+            quality: Requested (best) quality key
+            fallback: See resolve
+
+        Returns:
+            list: The media of each track, in order; media_format() tells
+                  which quality it is
+        """
+        now = time.time()
+        tokens = [check_track_token(track) for track in tracks]
+        results = [None] * len(tracks)
+        groups = {}
+
+        for i, (token, track) in enumerate(zip(tokens, tracks)):
+            ladder = quality_ladder(quality, track)
+            for c_quality in ladder:
+                media = self.__lookup(token, c_quality, now)
+                if media is None:
+                    # Not known yet: negotiate the remaining rungs
+                    groups.setdefault(tuple(ladder[ladder.index(c_quality):]), {})[token] = track
+                    break
+                if media.get('media'):
+                    results[i] = media
+                    break
+            else:
+                # Every rung is known to be unavailable
+                results[i] = {"media": []}
+
+        with self.__lock:
+            hits = sum(1 for media in results if media is not None)
+            self.stats["hits"] += hits
+            self.stats["misses"] += len(tracks) - hits
+
+        futures = []
+        for ladder, group in groups.items():
+            unique = list(group.items())
+            for start in range(0, len(unique), self.chunk_size):
+                chunk = unique[start:start + self.chunk_size]
+                futures.append((ladder, chunk, _EXECUTOR.submit(self.__fetch_chunk, chunk, list(ladder), fallback)))
+
+        resolved = {}
+        for ladder, chunk, future in futures:
+            for (token, _), media in zip(chunk, future.result()):
+                # Legacy fallback answers carry no format: they are for ladder[0]
+                c_format = media_format(media) or (ladder[0] if media.get('media') else None)
+                # An empty answer may be a refusal or a glitch rather than
+                # proof that no rung exists: nothing is cached for it
+                if c_format in ladder:
+                    for c_quality in ladder[:ladder.index(c_format)]:
+                        self.__store(token, c_quality, {"media": []}, now)
+                    self.__store(token, c_format, media, now)
+                resolved[token] = media
+
+        for i, token in enumerate(tokens):
+            if results[i] is None:
+                results[i] = resolved.get(token, {"media": []})
+        return results
+
+    def get(self, tracks, quality, fallback=None):
+        """Shortcut for resolve(tracks, [quality], fallback)[quality]."""
+        return self.resolve(tracks, [quality], fallback)[quality]
+
+    def invalidate(self, token=None):
+        """Forget the urls of one track token, or of every track."""
+        with self.__lock:
+            if token is None:
+                self.__entries.clear()
+                return
+            for key in [key for key in self.__entries if key[0] == token]:
+                del self.__entries[key]
+
+
+media_resolver = MediaResolver()
@@ -4,7 +4,80 @@ from spotipy import Spotify
 from deezspot.exceptions import InvalidLink
 from spotipy.exceptions import SpotifyException
 from spotipy.oauth2 import SpotifyClientCredentials
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from deezspot.libutils.others_settings import stock_spotify_batch_workers
+from deezspot.libutils.logging_utils import logger
 import os
+import time
+
+# IDs per request accepted by the several-tracks / several-albums endpoints
+TRACKS_CHUNK_SIZE = 50
+ALBUMS_CHUNK_SIZE = 20
+
+
+class BatchScheduler:
+    """
+    Runs the chunks of a batched Spotify request on a small shared pool and
+    returns their results in order.
+
+    Spotify's client already retries rate-limited (429) requests on its
+    own; when one still fails with 429, every chunk of every batch holds
+    off for the advertised Retry-After before it is retried, so parallel
+    chunks do not keep hitting the limit.
+    """
+
+    def __init__(self, max_workers=stock_spotify_batch_workers, max_retries=3, default_retry_after=5):
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.default_retry_after = default_retry_after
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="deezspot-spotify")
+        self.__lock = Lock()
+        self.__resume_at = 0.0
+
+    def __retry_after(self, error):
+        headers = getattr(error, 'headers', None) or {}
+        try:
+            return max(float(headers.get('Retry-After')), 0.0)
+        except (TypeError, ValueError):
+            return self.default_retry_after
+
+    def __hold_off(self):
+        with self.__lock:
+            delay = self.__resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def call(self, func, *args):
+        """Call func(*args), waiting out rate limits reported by any request."""
+        for attempt in range(self.max_retries + 1):
+            self.__hold_off()
+            try:
+                return func(*args)
+            except SpotifyException as error:
+                if error.http_status != 429 or attempt == self.max_retries:
+                    raise
+                retry_after = self.__retry_after(error)
+                with self.__lock:
+                    self.__resume_at = max(self.__resume_at, time.monotonic() + retry_after)
+                logger.warning(f"Spotify rate limit hit, retrying in {retry_after:g}s (attempt {attempt + 1}/{self.max_retries})")
+
+    def map(self, func, chunks):
+        """Apply func to every chunk concurrently; results keep the chunks' order."""
+        chunks = list(chunks)
+        if len(chunks) <= 1:
+            return [self.call(func, chunk) for chunk in chunks]
+        futures = [self.__executor.submit(self.call, func, chunk) for chunk in chunks]
+        return [future.result() for future in futures]
+
+
+batch_scheduler = BatchScheduler()
+
+
+def _chunks(ids, size):
+    ids = list(ids)
+    return [ids[start:start + size] for start in range(0, len(ids), size)]
+
 
 class Spo:
     __error_codes = [404, 400]
@@ -109,6 +182,9 @@ class Spo:
         """
         Get information for multiple tracks by a list of IDs.
         
+        The IDs are requested TRACKS_CHUNK_SIZE at a time, concurrently,
+        and the results are merged in the order of ids.
+        
         Args:
             ids (list): A list of Spotify track IDs.
             market (str, optional): An ISO 3166-1 alpha-2 country code.
@@ -120,14 +196,55 @@ class Spo:
         """
         api = cls.__get_api(client_id, client_secret)
         try:
-            tracks_json = api.tracks(ids, market=market)
+            results = batch_scheduler.map(
+                lambda chunk: api.tracks(chunk, market=market),
+                _chunks(ids, TRACKS_CHUNK_SIZE)
+            )
         except SpotifyException as error:
             if error.http_status in cls.__error_codes:
                 # Create a string of the first few IDs for the error message
                 ids_preview = ', '.join(ids[:3]) + ('...' if len(ids) > 3 else '')
                 raise InvalidLink(f"one or more IDs in the list: [{ids_preview}]")
+            raise
+        
+        return {"tracks": [track for result in results for track in (result or {}).get('tracks') or []]}
+
+    @classmethod
+    def get_albums(cls, ids: list, market: str = None, client_id=None, client_secret=None):
+        """
+        Get information for multiple albums by a list of IDs.
+        
+        The IDs are requested ALBUMS_CHUNK_SIZE at a time, concurrently,
+        and the results are merged in the order of ids.
         
-        return tracks_json
+        Args:
+            ids (list): A list of Spotify album IDs.
+            market (str, optional): An ISO 3166-1 alpha-2 country code.
+            client_id (str, optional): Optional custom Spotify client ID.
+            client_secret (str, optional): Optional custom Spotify client secret.
+            
+        Returns:
+            dict: A dictionary containing a list of album information, each with its complete track list.
+        """
+        api = cls.__get_api(client_id, client_secret)
+
+        def fetch(chunk):
+            albums_json = api.albums(chunk, market=market)
+            # Track lists longer than one page are completed in the same worker
+            for album_json in (albums_json or {}).get('albums') or []:
+                if album_json and album_json.get('tracks'):
+                    cls.__lazy(album_json['tracks'], api)
+            return albums_json
+
+        try:
+            results = batch_scheduler.map(fetch, _chunks(ids, ALBUMS_CHUNK_SIZE))
+        except SpotifyException as error:
+            if error.http_status in cls.__error_codes:
+                ids_preview = ', '.join(ids[:3]) + ('...' if len(ids) > 3 else '')
+                raise InvalidLink(f"one or more IDs in the list: [{ids_preview}]")
+            raise
+
+        return {"albums": [album for result in results for album in (result or {}).get('albums') or []]}
 
     @classmethod
     def get_album(cls, ids, client_id=None, client_secret=None):
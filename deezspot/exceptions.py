@@ -11,6 +11,13 @@ class TrackNotFound(Exception):
 
 		super().__init__(self.message)
 
+class MediaUrlExpired(TrackNotFound):
+	def __init__(self, url = None, message = None):
+		super().__init__(
+			url,
+			message or f"Media url {url} expired or was refused by the CDN"
+		)
+
 class AlbumNotFound(Exception):
 	def __init__(self, url = None):
 		self.url = url
@@ -28,6 +35,8 @@ class QuotaExceeded(Exception):
 
 		if not message:
 			self.message = "TOO MUCH REQUESTS LIMIT YOURSELF !!! :)"
+		else:
+			self.message = message
 
 		super().__init__(self.message)
 
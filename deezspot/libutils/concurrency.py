@@ -0,0 +1,247 @@
+#!/usr/bin/python3
+
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+from deezspot.libutils.logging_utils import logger
+
+
+def run_in_order(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int = 1,
+    thread_name_prefix: str = "deezspot-track"
+) -> Iterator[Any]:
+    """
+    Apply func to every item using a bounded thread pool, yielding the
+    results in the same order as the input items.
+
+    With max_workers <= 1 the items are processed serially in the calling
+    thread, which keeps the original single-download behaviour.
+
+    Args:
+        func: Callable taking a single item. It should handle its own
+              errors; an exception raised by func is re-raised here.
+        items: Work items to process
+        max_workers: Maximum number of items processed at the same time
+        thread_name_prefix: Prefix for the worker thread names
+
+    Yields:
+        The result of func for each item, in input order
+    """
+    work_items: List[Any] = list(items)
+
+    if not max_workers or max_workers <= 1 or len(work_items) <= 1:
+        for item in work_items:
+            yield func(item)
+        return
+
+    pool_size = min(int(max_workers), len(work_items))
+    with ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix=thread_name_prefix) as executor:
+        # executor.map returns results in submission order, so callers can
+        # append to their result lists and m3u files progressively.
+        for result in executor.map(func, work_items):
+            yield result
+
+
+class KeyLocks:
+    """
+    One lock per key, created on demand and dropped when its holder is done,
+    so callers working on the same key run one at a time.
+    """
+
+    def __init__(self):
+        self.__lock = Lock()
+        self.__locks: Dict[Hashable, Lock] = {}
+
+    @contextmanager
+    def hold(self, key: Hashable) -> Iterator[None]:
+        """Hold the lock of key for the duration of the with block."""
+        with self.__lock:
+            key_lock = self.__locks.setdefault(key, Lock())
+        with key_lock:
+            try:
+                yield
+            finally:
+                with self.__lock:
+                    # A waiter handed this lock after it was dropped must not
+                    # drop the one a newer caller has created for the key since
+                    if self.__locks.get(key) is key_lock:
+                        del self.__locks[key]
+
+
+class MemoCache:
+    """
+    Bounded LRU of computed values. Concurrent get() calls for the same key
+    wait for a single computation; exceptions are not cached.
+
+    With a ttl, values are computed again once they are older than ttl
+    seconds. With cache_none=False, a None result is returned but not kept,
+    so a failed lookup is retried on the next call.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None, cache_none: bool = True):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.cache_none = cache_none
+        self.__lock = Lock()
+        # key -> (value, expiry on the monotonic clock or None)
+        self.__values: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self.__key_locks = KeyLocks()
+        self.__hits = 0
+        self.__misses = 0
+
+    def __lookup(self, key: Hashable):
+        with self.__lock:
+            if key in self.__values:
+                value, expires_at = self.__values[key]
+                if expires_at is None or expires_at > time.monotonic():
+                    self.__values.move_to_end(key)
+                    return True, value
+                del self.__values[key]
+            return False, None
+
+    def __store(self, key: Hashable, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self.__lock:
+            self.__values[key] = (value, expires_at)
+            self.__values.move_to_end(key)
+            while len(self.__values) > self.maxsize:
+                self.__values.popitem(last=False)
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the value stored under key, calling compute() only on a miss."""
+        found, value = self.__lookup(key)
+        if found:
+            with self.__lock:
+                self.__hits += 1
+            return value
+
+        with self.__key_locks.hold(key):
+            found, value = self.__lookup(key)
+            if found:
+                with self.__lock:
+                    self.__hits += 1
+                return value
+            with self.__lock:
+                self.__misses += 1
+            value = compute()
+            if value is not None or self.cache_none:
+                self.__store(key, value)
+            return value
+
+    def peek(self, key: Hashable) -> Any:
+        """Return the value stored under key, or None, without computing it."""
+        found, value = self.__lookup(key)
+        with self.__lock:
+            if found:
+                self.__hits += 1
+            else:
+                self.__misses += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value that is already known, e.g. to seed the cache."""
+        self.__store(key, value)
+
+    def stats(self, reset: bool = False) -> Dict[str, int]:
+        """Hit/miss counters and the number of entries held."""
+        with self.__lock:
+            counters = {"hits": self.__hits, "misses": self.__misses, "size": len(self.__values)}
+            if reset:
+                self.__hits = self.__misses = 0
+        return counters
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__values.clear()
+
+
+class Prefetcher:
+    """
+    Runs a warm-up callable over the items ahead of the download cursor.
+
+    Items are grouped in batches of batch_size positions; wait(pos) makes
+    sure every batch overlapping [pos, pos + lookahead) has been submitted
+    to a small background pool, then blocks until the batch holding pos is
+    done. Errors raised by warm are logged and swallowed: the download
+    falls back to resolving whatever is missing inline.
+    """
+
+    def __init__(
+        self,
+        items: Sequence[Any],
+        warm: Callable[[List[Any]], None],
+        lookahead: int = 8,
+        batch_size: int = 4,
+        max_workers: int = 2,
+        thread_name_prefix: str = "deezspot-prefetch"
+    ):
+        self.__items = list(items)
+        self.__warm = warm
+        self.__lookahead = max(int(lookahead or 0), 0)
+        self.__batch_size = max(int(batch_size or 1), 1)
+        self.__lock = Lock()
+        self.__futures: Dict[int, Any] = {}
+        self.__executor = None
+        if self.__lookahead and self.__items:
+            self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+
+    def __run(self, batch: List[Any]) -> None:
+        try:
+            self.__warm(batch)
+        except Exception as e:
+            logger.debug(f"Prefetch of {len(batch)} item(s) failed: {e}")
+
+    def __submit(self, batch_no: int):
+        # Called with self.__lock held
+        future = self.__futures.get(batch_no)
+        if future is None:
+            start = batch_no * self.__batch_size
+            batch = self.__items[start:start + self.__batch_size]
+            if self.__executor is None:
+                return None
+            future = self.__executor.submit(self.__run, batch)
+            self.__futures[batch_no] = future
+        return future
+
+    def wait(self, pos: int, block: bool = True) -> None:
+        """
+        Ensure the item at position pos is warm and queue the ones after it.
+
+        Args:
+            pos: Index into the items given to the constructor
+            block: False only queues the batches and returns at once, for
+                   items the caller can also resolve inline when needed
+        """
+        if not 0 <= pos < len(self.__items):
+            return
+        if self.__executor is None:
+            if block:
+                self.__run([self.__items[pos]])
+            return
+
+        last = min(pos + self.__lookahead, len(self.__items) - 1)
+        with self.__lock:
+            current = self.__submit(pos // self.__batch_size)
+            for batch_no in range(pos // self.__batch_size + 1, last // self.__batch_size + 1):
+                self.__submit(batch_no)
+        if block and current is not None:
+            current.result()
+
+    def close(self) -> None:
+        if self.__executor is not None:
+            with self.__lock:
+                for future in self.__futures.values():
+                    future.cancel()
+            self.__executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
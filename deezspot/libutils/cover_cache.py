@@ -0,0 +1,225 @@
+#!/usr/bin/python3
+
+import os
+from collections import OrderedDict
+from hashlib import sha1, sha256
+from threading import Lock
+from deezspot.libutils.others_settings import (
+    stock_cover_cache_dir,
+    stock_cover_cache_memory,
+    stock_cover_cache_disk,
+)
+from deezspot.libutils.concurrency import KeyLocks
+from deezspot.libutils.utils import get_cache_dir
+from deezspot.libutils.logging_utils import logger
+
+# --- Shared cover cache used by every track, album and run ---
+_CACHE = None
+_CACHE_LOCK = Lock()
+
+# Writes between two checks of the on-disk store size
+_PRUNE_INTERVAL = 64
+
+_IMAGE_SIGNATURES = (b"\xff\xd8\xff", b"\x89PNG", b"RIFF", b"GIF8")
+
+
+def looks_like_image(data):
+    """True for JPEG/PNG/WebP/GIF bytes, so error pages are never cached."""
+    return bool(data) and data.startswith(_IMAGE_SIGNATURES)
+
+
+class CoverCache:
+    """
+    Two-level cache for cover art.
+
+    Images are keyed by what identifies them upstream (the Deezer md5_image
+    and size, or the image URL). Recently used images stay in an in-memory
+    LRU bounded in bytes; every image is also kept on disk in a
+    content-addressed store (blobs named by the sha256 of their bytes, with
+    one small reference file per key), so the same picture reached through
+    different keys is stored once and later runs do not download it again.
+    Concurrent requests for the same key wait for a single fetch.
+    """
+
+    def __init__(self, directory=None, memory_bytes=None, disk_bytes=None):
+        self.directory = directory or get_cache_dir("covers")
+        self.memory_bytes = stock_cover_cache_memory if memory_bytes is None else memory_bytes
+        self.disk_bytes = stock_cover_cache_disk if disk_bytes is None else disk_bytes
+        self.__lock = Lock()
+        self.__memory = OrderedDict()
+        self.__memory_size = 0
+        self.__fetch_locks = KeyLocks()
+        self.__writes = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "fetches": 0}
+
+        try:
+            os.makedirs(os.path.join(self.directory, "blobs"), exist_ok=True)
+            os.makedirs(os.path.join(self.directory, "keys"), exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Cover cache directory {self.directory} unavailable ({e}), caching in memory only")
+            self.directory = None
+
+    def __key_path(self, key):
+        return os.path.join(self.directory, "keys", sha1(key.encode("utf-8")).hexdigest())
+
+    def __blob_path(self, digest):
+        return os.path.join(self.directory, "blobs", digest)
+
+    def __remember(self, key, data):
+        with self.__lock:
+            old = self.__memory.pop(key, None)
+            if old is not None:
+                self.__memory_size -= len(old)
+            if len(data) > self.memory_bytes:
+                return
+            self.__memory[key] = data
+            self.__memory_size += len(data)
+            while self.__memory_size > self.memory_bytes:
+                _, evicted = self.__memory.popitem(last=False)
+                self.__memory_size -= len(evicted)
+
+    def __from_memory(self, key):
+        with self.__lock:
+            data = self.__memory.get(key)
+            if data is not None:
+                self.__memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+            return data
+
+    def __from_disk(self, key):
+        if self.directory is None:
+            return None
+        try:
+            with open(self.__key_path(key), "r") as f:
+                digest = f.read().strip()
+            with open(self.__blob_path(digest), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if sha256(data).hexdigest() != digest:
+            return None
+        with self.__lock:
+            self.stats["disk_hits"] += 1
+        return data
+
+    def __to_disk(self, key, data):
+        if self.directory is None:
+            return
+        digest = sha256(data).hexdigest()
+        try:
+            blob_path = self.__blob_path(digest)
+            if not os.path.isfile(blob_path):
+                tmp_path = f"{blob_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, blob_path)
+            key_path = self.__key_path(key)
+            tmp_path = f"{key_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(digest)
+            os.replace(tmp_path, key_path)
+        except OSError as e:
+            logger.debug(f"Could not store cover {key} on disk: {e}")
+            return
+
+        with self.__lock:
+            self.__writes += 1
+            prune = self.__writes % _PRUNE_INTERVAL == 0
+        if prune:
+            self.prune()
+
+    def get(self, key, fetch):
+        """
+        Return the cover stored under key, calling fetch() only on a miss.
+
+        Args:
+            key: Identifier of the image (e.g. "deezer:<md5>:1400x1400" or its URL)
+            fetch: Callable returning the image bytes, or None/b"" on failure
+
+        Returns:
+            bytes | None: The image, or whatever fetch() returned if it is
+                          not an image (such responses are not cached)
+        """
+        data = self.__from_memory(key)
+        if data is not None:
+            return data
+
+        with self.__fetch_locks.hold(key):
+            # Another thread may have fetched it while we waited
+            data = self.__from_memory(key)
+            if data is not None:
+                return data
+
+            data = self.__from_disk(key)
+            if data is not None:
+                self.__remember(key, data)
+                return data
+
+            data = fetch()
+            with self.__lock:
+                self.stats["fetches"] += 1
+            if looks_like_image(data):
+                self.__remember(key, data)
+                self.__to_disk(key, data)
+            return data
+
+    def prune(self):
+        """Drop the least recently written blobs until the disk store fits its size limit."""
+        if self.directory is None:
+            return
+        blobs_dir = os.path.join(self.directory, "blobs")
+        try:
+            entries = [entry for entry in os.scandir(blobs_dir) if entry.is_file()]
+        except OSError:
+            return
+        total = sum(entry.stat().st_size for entry in entries)
+        if total <= self.disk_bytes:
+            return
+        # Key files pointing at removed blobs are ignored on read
+        for entry in sorted(entries, key=lambda e: e.stat().st_mtime):
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.disk_bytes:
+                break
+
+    def clear_memory(self):
+        with self.__lock:
+            self.__memory.clear()
+            self.__memory_size = 0
+
+
+def get_cover_cache():
+    """Return the shared CoverCache, creating it on first use."""
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = CoverCache(stock_cover_cache_dir)
+    return _CACHE
+
+
+def configure_cover_cache(directory=None, memory_bytes=None, disk_bytes=None):
+    """
+    Replace the shared cover cache.
+
+    Args:
+        directory: On-disk store location (defaults to the user's cache directory)
+        memory_bytes: Size limit of the in-memory LRU
+        disk_bytes: Size limit of the on-disk store
+
+    Returns:
+        CoverCache: The new shared cache
+    """
+    global _CACHE
+    with _CACHE_LOCK:
+        _CACHE = CoverCache(directory, memory_bytes, disk_bytes)
+    return _CACHE
+
+
+def cached_cover(key, fetch):
+    """Shortcut for get_cover_cache().get(key, fetch)."""
+    return get_cover_cache().get(key, fetch)
@@ -0,0 +1,256 @@
+#!/usr/bin/python3
+
+import threading
+import time
+import weakref
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from deezspot.libutils.others_settings import (
+    stock_http_pool_size,
+    stock_http_max_retries,
+    stock_http_backoff_factor,
+    stock_http_timeout,
+)
+from deezspot.libutils.logging_utils import logger
+
+# --- Shared HTTP client ---
+# One keep-alive session for the public Deezer API, the media/CDN endpoints
+# and cover downloads, so repeated calls reuse pooled TCP+TLS connections.
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+_CONFIG = {
+    "pool_size": stock_http_pool_size,
+    "max_retries": stock_http_max_retries,
+    "backoff_factor": stock_http_backoff_factor,
+    "timeout": stock_http_timeout,
+}
+_STATS = {
+    "requests": 0,
+    "errors": 0,
+}
+_STATS_LOCK = threading.Lock()
+# Sessions that need their own cookies (the gateway API) get the same
+# adapter through mount_adapter(); they are tracked for pool_stats()
+_MOUNTED_SESSIONS = weakref.WeakSet()
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# Methods the adapters retry on their own; a POST is retried only when the
+# caller says it is read-only (see post(idempotent=True))
+RETRY_METHODS = frozenset(["HEAD", "GET", "OPTIONS"])
+
+
+def create_adapter(pool_size=None, max_retries=None, backoff_factor=None):
+    """
+    Build an HTTPAdapter with the configured pool size and retry policy.
+
+    Args:
+        pool_size: Connections kept alive per host (defaults to the configured value)
+        max_retries: Retries on connection errors and 429/5xx responses
+        backoff_factor: Exponential backoff factor between retries
+
+    Returns:
+        HTTPAdapter: The adapter, ready to be mounted on a requests Session
+    """
+    pool_size = pool_size or _CONFIG["pool_size"]
+    retries = Retry(
+        total=_CONFIG["max_retries"] if max_retries is None else max_retries,
+        backoff_factor=_CONFIG["backoff_factor"] if backoff_factor is None else backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=RETRY_METHODS,
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+    return HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=retries,
+        pool_block=False,
+    )
+
+
+def mount_adapter(session, **kwargs):
+    """
+    Mount a pooled, retrying adapter on an existing requests Session.
+
+    Args:
+        session: The session to configure
+        **kwargs: Forwarded to create_adapter()
+
+    Returns:
+        The same session
+    """
+    adapter = create_adapter(**kwargs)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if _count_response not in session.hooks["response"]:
+        session.hooks["response"].append(_count_response)
+    with _STATS_LOCK:
+        _MOUNTED_SESSIONS.add(session)
+    return session
+
+
+def _retry_delay(response, attempt):
+    retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+    if retry_after.isdigit():
+        return int(retry_after)
+    return _CONFIG["backoff_factor"] * (2 ** attempt)
+
+
+def send_idempotent(send):
+    """
+    Retry a read-only request the adapters leave alone (a POST lookup) the
+    way they retry a GET: on connection errors and 429/5xx responses, with
+    exponential backoff or the server's Retry-After.
+
+    Args:
+        send: Callable sending the request and returning its Response
+
+    Returns:
+        requests.Response: The last response
+    """
+    retries = _CONFIG["max_retries"]
+    for attempt in range(retries + 1):
+        response = None
+        try:
+            response = send()
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or attempt == retries:
+                return response
+        delay = _retry_delay(response, attempt)
+        if response is not None:
+            response.close()
+        logger.debug(f"Retrying read-only request in {delay}s (attempt {attempt + 1} of {retries})")
+        time.sleep(delay)
+
+
+def _count_response(response, *args, **kwargs):
+    with _STATS_LOCK:
+        _STATS["requests"] += 1
+        if response.status_code >= 400:
+            _STATS["errors"] += 1
+
+
+def _build_session():
+    return mount_adapter(requests.Session())
+
+
+def get_session():
+    """Return the shared requests Session, creating it on first use."""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = _build_session()
+    return _SESSION
+
+
+def configure(pool_size=None, max_retries=None, backoff_factor=None, timeout=None):
+    """
+    Change the shared client settings. The current session is closed and
+    a new one is built lazily with the new settings.
+
+    Args:
+        pool_size: Connections kept alive per host
+        max_retries: Retries on connection errors and 429/5xx responses
+        backoff_factor: Exponential backoff factor between retries
+        timeout: Default request timeout in seconds
+    """
+    global _SESSION
+    with _SESSION_LOCK:
+        if pool_size is not None:
+            _CONFIG["pool_size"] = pool_size
+        if max_retries is not None:
+            _CONFIG["max_retries"] = max_retries
+        if backoff_factor is not None:
+            _CONFIG["backoff_factor"] = backoff_factor
+        if timeout is not None:
+            _CONFIG["timeout"] = timeout
+        old_session, _SESSION = _SESSION, None
+
+    if old_session is not None:
+        old_session.close()
+    logger.debug(f"HTTP client configured: {_CONFIG}")
+
+
+def request(method, url, **kwargs):
+    """
+    Send a request through the shared session, applying the default timeout.
+
+    Args:
+        method: HTTP method
+        url: Target URL
+        **kwargs: Forwarded to requests.Session.request
+
+    Returns:
+        requests.Response: The response
+    """
+    kwargs.setdefault("timeout", _CONFIG["timeout"])
+    try:
+        return get_session().request(method, url, **kwargs)
+    except requests.RequestException:
+        with _STATS_LOCK:
+            _STATS["errors"] += 1
+        raise
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, idempotent=False, **kwargs):
+    """
+    Args:
+        idempotent: The POST only reads (e.g. a lookup); retry it like a GET
+    """
+    if idempotent:
+        return send_idempotent(lambda: request("POST", url, **kwargs))
+    return request("POST", url, **kwargs)
+
+
+def pool_stats():
+    """
+    Snapshot of the client's connection pools for monitoring: the shared
+    session and every other session set up with mount_adapter().
+
+    Returns:
+        dict: Request/error counters, the active configuration and, per
+              host, the connections opened, requests served and idle
+              keep-alive connections
+    """
+    with _STATS_LOCK:
+        stats = dict(_STATS)
+        sessions = list(_MOUNTED_SESSIONS)
+    stats["config"] = dict(_CONFIG)
+    stats["pools"] = {}
+
+    seen = set()
+    for session in sessions:
+        for adapter in list(session.adapters.values()):
+            # The same adapter is mounted for both http:// and https://
+            if id(adapter) in seen:
+                continue
+            seen.add(id(adapter))
+            pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+            if pools is None:
+                continue
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                idle = pool.pool.qsize() if getattr(pool, "pool", None) is not None else 0
+                host = stats["pools"].setdefault(f"{pool.scheme}://{pool.host}:{pool.port}", {
+                    "connections_opened": 0,
+                    "requests": 0,
+                    "idle_connections": 0,
+                    "max_size": 0,
+                })
+                # A host reached from several sessions has one pool in each
+                host["connections_opened"] += pool.num_connections
+                host["requests"] += pool.num_requests
+                host["idle_connections"] += idle
+                host["max_size"] += pool.pool.maxsize if getattr(pool, "pool", None) is not None else 0
+    return stats
@@ -0,0 +1,188 @@
+#!/usr/bin/python3
+
+import os
+import sqlite3
+import time
+from threading import Lock, RLock
+from deezspot.libutils.others_settings import stock_id_map_path, stock_id_map_miss_ttl
+from deezspot.libutils.utils import get_cache_dir
+from deezspot.libutils.logging_utils import logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mappings (
+    kind TEXT NOT NULL,
+    spotify_id TEXT NOT NULL,
+    deezer_id TEXT,
+    code TEXT,
+    resolved_at REAL NOT NULL,
+    PRIMARY KEY (kind, spotify_id)
+);
+"""
+_SCHEMA_VERSION = 1
+
+# Ids per SELECT ... IN (...), well below SQLite's variable limit
+_QUERY_CHUNK = 500
+
+# --- Shared mapping used by the Spotify to Deezer converters ---
+_MAP = None
+_MAP_LOCK = Lock()
+
+
+def default_map_path():
+    """Location of the persistent mapping in the user's cache directory."""
+    return get_cache_dir("id_map.sqlite3")
+
+
+class IdMap:
+    """
+    Persistent Spotify -> Deezer id mapping.
+
+    Each row maps a Spotify track or album id ("track"/"album" kind) to the
+    Deezer id it was matched to, along with the ISRC/UPC the match was made
+    on. Tracks found to have no Deezer equivalent are stored without a
+    Deezer id and are looked up again once miss_ttl seconds have passed, so
+    repeated syncs of a playlist convert nothing but its new tracks.
+    """
+
+    def __init__(self, db_path=None, miss_ttl=None):
+        self.db_path = db_path or default_map_path()
+        self.miss_ttl = stock_id_map_miss_ttl if miss_ttl is None else miss_ttl
+        self.__lock = RLock()
+        self.__conn = self.__connect()
+        self.stats = {"hits": 0, "misses": 0, "stored": 0}
+
+    def __connect(self):
+        if self.db_path != ":memory:":
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+                return self.__open(self.db_path)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Id mapping unavailable at {self.db_path} ({e}), keeping it in memory")
+                self.db_path = ":memory:"
+        return self.__open(":memory:")
+
+    @staticmethod
+    def __open(db_path):
+        conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        if db_path != ":memory:":
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+            conn.execute("DROP TABLE IF EXISTS mappings")
+            conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        conn.executescript(_SCHEMA)
+        conn.commit()
+        return conn
+
+    def get_many(self, kind, spotify_ids):
+        """
+        Look several Spotify ids up at once.
+
+        Args:
+            kind: "track" or "album"
+            spotify_ids: Spotify ids
+
+        Returns:
+            dict: {spotify id: Deezer id, or None for a recent miss} for the
+                  ids that are known; unknown and expired ids are left out
+        """
+        spotify_ids = list(dict.fromkeys(spotify_ids))
+        oldest_miss = time.time() - self.miss_ttl
+        known = {}
+        with self.__lock:
+            for start in range(0, len(spotify_ids), _QUERY_CHUNK):
+                chunk = spotify_ids[start:start + _QUERY_CHUNK]
+                rows = self.__conn.execute(
+                    "SELECT spotify_id, deezer_id, resolved_at FROM mappings "
+                    f"WHERE kind = ? AND spotify_id IN ({', '.join('?' * len(chunk))})",
+                    (kind, *chunk)
+                ).fetchall()
+                for spotify_id, deezer_id, resolved_at in rows:
+                    if deezer_id or resolved_at >= oldest_miss:
+                        known[spotify_id] = deezer_id
+            self.stats["hits"] += len(known)
+            self.stats["misses"] += len(spotify_ids) - len(known)
+        return known
+
+    def get(self, kind, spotify_id):
+        """
+        Returns:
+            tuple: (known, Deezer id or None)
+        """
+        known = self.get_many(kind, [spotify_id])
+        return spotify_id in known, known.get(spotify_id)
+
+    def put_many(self, kind, mappings):
+        """
+        Store conversion results.
+
+        Args:
+            kind: "track" or "album"
+            mappings: (spotify id, Deezer id or None, ISRC/UPC or None) tuples
+        """
+        now = time.time()
+        rows = [
+            (kind, str(spotify_id), str(deezer_id) if deezer_id else None, code or None, now)
+            for spotify_id, deezer_id, code in mappings
+        ]
+        if not rows:
+            return
+        with self.__lock:
+            try:
+                self.__conn.executemany(
+                    "INSERT OR REPLACE INTO mappings (kind, spotify_id, deezer_id, code, resolved_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                self.__conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not store {len(rows)} id mapping(s): {e}")
+                return
+            self.stats["stored"] += len(rows)
+
+    def put(self, kind, spotify_id, deezer_id, code=None):
+        self.put_many(kind, [(spotify_id, deezer_id, code)])
+
+    def forget(self, kind, spotify_id=None):
+        """Drop the mapping of one Spotify id, or every mapping of a kind."""
+        with self.__lock:
+            if spotify_id is None:
+                self.__conn.execute("DELETE FROM mappings WHERE kind = ?", (kind,))
+            else:
+                self.__conn.execute("DELETE FROM mappings WHERE kind = ? AND spotify_id = ?", (kind, spotify_id))
+            self.__conn.commit()
+
+    def close(self):
+        with self.__lock:
+            self.__conn.close()
+
+
+def get_id_map():
+    """Return the shared IdMap, opening it on first use."""
+    global _MAP
+    if _MAP is None:
+        with _MAP_LOCK:
+            if _MAP is None:
+                _MAP = IdMap(stock_id_map_path)
+    return _MAP
+
+
+def configure_id_map(db_path=None, miss_ttl=None):
+    """
+    Point the shared mapping at another database file.
+
+    Args:
+        db_path: SQLite file path, ":memory:" to keep the mapping for this
+                 process only, or None for the default cache location
+        miss_ttl: Seconds before a track without Deezer equivalent is
+                  looked up again
+
+    Returns:
+        IdMap: The new shared mapping
+    """
+    global _MAP
+    with _MAP_LOCK:
+        old_map, _MAP = _MAP, IdMap(db_path, miss_ttl)
+    if old_map is not None:
+        old_map.close()
+    return _MAP
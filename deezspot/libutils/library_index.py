@@ -0,0 +1,498 @@
+#!/usr/bin/python3
+
+import os
+import sqlite3
+import unicodedata
+from functools import lru_cache
+from threading import Lock, RLock, Thread
+from mutagen.id3 import ID3, ID3NoHeaderError
+from mutagen.flac import FLAC
+from mutagen.mp4 import MP4
+from mutagen.oggvorbis import OggVorbis
+from mutagen.oggopus import OggOpus
+from deezspot.libutils.audio_converter import AUDIO_FORMATS
+from deezspot.libutils.others_settings import stock_library_index_path, stock_tag_cache_size
+from deezspot.libutils.utils import get_cache_dir
+from deezspot.libutils.logging_utils import logger
+
+AUDIO_EXTENSIONS = tuple(sorted({fmt["extension"].lower() for fmt in AUDIO_FORMATS.values()}))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    title TEXT,
+    album TEXT,
+    title_key TEXT,
+    album_key TEXT,
+    isrc TEXT,
+    platform_id TEXT,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tracks_by_title ON tracks (dir, title_key, album_key);
+CREATE INDEX IF NOT EXISTS tracks_by_isrc ON tracks (dir, isrc);
+CREATE INDEX IF NOT EXISTS tracks_by_platform_id ON tracks (dir, platform_id);
+"""
+# Bumped whenever the table layout or what is read from files changes:
+# the index is only a cache, so older tables are dropped and rebuilt
+_SCHEMA_VERSION = 2
+
+# Tag holding "<source>:<track id>" (e.g. "deezer:3135556"), written by write_tags
+DEEZSPOT_ID_TAG = "DEEZSPOT_ID"
+
+# --- Shared index used by skip detection and tag writers ---
+_INDEX = None
+_INDEX_LOCK = Lock()
+
+_NO_TAGS = {"title": None, "album": None, "isrc": None, "platform_id": None}
+
+
+def default_index_path():
+    """Location of the persistent index in the user's cache directory."""
+    return get_cache_dir("library.sqlite3")
+
+
+def normalize_key(value):
+    """Case and Unicode form insensitive key for a title or album."""
+    if value is None:
+        return None
+    return unicodedata.normalize("NFKC", str(value)).casefold().strip()
+
+
+def normalize_isrc(value):
+    """ISRCs compare without case, spaces or dashes."""
+    if not value:
+        return None
+    return str(value).replace("-", "").replace(" ", "").upper() or None
+
+
+def _first(values):
+    if not values:
+        return None
+    value = values[0]
+    if isinstance(value, bytes):
+        value = value.decode("utf-8", errors="replace")
+    return value
+
+
+def read_file_tags(file_path, log=logger):
+    """
+    Read the tags the library index cares about from an audio file.
+
+    Only the tag blocks are parsed: MP3 files are read through their ID3
+    header and the other formats through their own tag readers, without
+    probing the file type or the audio stream.
+
+    Args:
+        file_path: Path of the audio file
+        log: Logger instance
+
+    Returns:
+        dict: title, album, isrc and platform_id (None when missing), or
+              None if the file cannot be read
+    """
+    try:
+        if not os.path.isfile(file_path):
+            log.debug(f"File not found for metadata reading: {file_path}")
+            return None
+
+        ext = os.path.splitext(file_path)[1].lower()
+        tags = dict(_NO_TAGS)
+
+        if ext == '.mp3':
+            try:
+                id3 = ID3(file_path)
+            except ID3NoHeaderError:
+                log.debug(f"No tags found in MP3 file: {file_path}")
+                return tags
+            for key, frame in (("title", "TIT2"), ("album", "TALB"), ("isrc", "TSRC"), ("platform_id", f"TXXX:{DEEZSPOT_ID_TAG}")):
+                tag_frame = id3.get(frame)
+                if tag_frame:
+                    tags[key] = _first(tag_frame.text)
+        elif ext in ('.flac', '.ogg', '.opus'):
+            audio = {'.flac': FLAC, '.ogg': OggVorbis, '.opus': OggOpus}[ext](file_path)
+            # Vorbis comments are case-insensitive but typically uppercase
+            tags["title"] = audio.get('TITLE', [None])[0]
+            tags["album"] = audio.get('ALBUM', [None])[0]
+            tags["isrc"] = audio.get('ISRC', [None])[0]
+            tags["platform_id"] = audio.get(DEEZSPOT_ID_TAG, [None])[0]
+        elif ext == '.m4a': # M4A (AAC/ALAC)
+            audio = MP4(file_path)
+            tags["title"] = _first(audio.get('\xa9nam'))
+            tags["album"] = _first(audio.get('\xa9alb'))
+            tags["isrc"] = _first(audio.get('----:com.apple.iTunes:ISRC'))
+            tags["platform_id"] = _first(audio.get(f'----:com.apple.iTunes:{DEEZSPOT_ID_TAG}'))
+        else:
+            log.warning(f"Unsupported file type for metadata extraction: {file_path}")
+            return None
+
+        return tags
+
+    except Exception as e:
+        log.error(f"Error reading metadata from {file_path}: {str(e)}")
+        return None
+
+
+@lru_cache(maxsize=stock_tag_cache_size)
+def _read_tags_for_version(file_path, mtime_ns, size):
+    # mtime_ns and size are only part of the cache key: a rewritten file is read again
+    return read_file_tags(file_path)
+
+
+def cached_file_tags(file_path, stat=None):
+    """
+    read_file_tags() through a process-wide LRU cache keyed by path, mtime
+    and size, so each version of a file is opened once per run.
+
+    Args:
+        file_path: Path of the audio file
+        stat: os.stat_result of the file if the caller already has it
+
+    Returns:
+        dict: A copy of the cached tags, or None if the file cannot be read
+    """
+    if stat is None:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+    tags = _read_tags_for_version(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    return dict(tags) if tags is not None else None
+
+
+def tag_cache_info():
+    """Hits, misses and size of the tag cache."""
+    return _read_tags_for_version.cache_info()
+
+
+class LibraryIndex:
+    """
+    Persistent SQLite index of the audio files already in the library.
+
+    Rows are keyed by path and carry the file's title, album and ISRC
+    along with its mtime and size. A directory is synced once per process
+    (and again whenever its mtime changes): only files that are new or
+    whose mtime/size changed are opened with mutagen, so skip checks are
+    index lookups instead of a directory scan per track. Candidates are
+    re-validated with a stat before they are returned.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or default_index_path()
+        self.__lock = RLock()
+        self.__dir_locks = {}
+        self.__synced = {}
+        self.__warmed = set()
+        self.__conn = self.__connect()
+
+    def __connect(self):
+        if self.db_path != ":memory:":
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+                return self.__open(self.db_path)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Library index unavailable at {self.db_path} ({e}), keeping it in memory")
+                self.db_path = ":memory:"
+        return self.__open(":memory:")
+
+    @staticmethod
+    def __open(db_path):
+        conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        if db_path != ":memory:":
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+            conn.execute("DROP TABLE IF EXISTS tracks")
+            conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        conn.executescript(_SCHEMA)
+        conn.commit()
+        return conn
+
+    def __dir_lock(self, directory):
+        with self.__lock:
+            return self.__dir_locks.setdefault(directory, Lock())
+
+    def __upsert(self, path, stat, tags):
+        self.__conn.execute(
+            "INSERT OR REPLACE INTO tracks "
+            "(path, dir, ext, title, album, title_key, album_key, isrc, platform_id, mtime_ns, size) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                path, os.path.dirname(path), os.path.splitext(path)[1].lower(),
+                tags["title"], tags["album"],
+                normalize_key(tags["title"]), normalize_key(tags["album"]),
+                normalize_isrc(tags["isrc"]), tags["platform_id"] or None,
+                stat.st_mtime_ns, stat.st_size
+            )
+        )
+
+    def __forget(self, paths):
+        self.__conn.executemany("DELETE FROM tracks WHERE path = ?", [(p,) for p in paths])
+
+    def sync_directory(self, directory, force=False):
+        """
+        Bring the rows of one directory up to date with the filesystem.
+
+        Args:
+            directory: Directory to index (not recursive)
+            force: Resync even if the directory looks unchanged
+
+        Returns:
+            int: Number of files whose tags had to be read
+        """
+        directory = os.path.abspath(directory)
+        with self.__dir_lock(directory):
+            try:
+                dir_mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                with self.__lock:
+                    self.__conn.execute("DELETE FROM tracks WHERE dir = ?", (directory,))
+                    self.__conn.commit()
+                    self.__synced.pop(directory, None)
+                return 0
+
+            if not force and self.__synced.get(directory) == dir_mtime:
+                return 0
+
+            with self.__lock:
+                known = {
+                    path: (mtime_ns, size)
+                    for path, mtime_ns, size in self.__conn.execute(
+                        "SELECT path, mtime_ns, size FROM tracks WHERE dir = ?", (directory,)
+                    )
+                }
+
+            changed = []
+            seen = set()
+            for entry in os.scandir(directory):
+                if not entry.name.lower().endswith(AUDIO_EXTENSIONS):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                seen.add(entry.path)
+                if known.get(entry.path) != (stat.st_mtime_ns, stat.st_size):
+                    changed.append((entry.path, stat))
+
+            # Tags are read without holding the database lock. Unreadable
+            # files are kept untagged so they are not reopened every sync.
+            rows = [(path, stat, cached_file_tags(path, stat) or _NO_TAGS) for path, stat in changed]
+
+            with self.__lock:
+                for path, stat, tags in rows:
+                    self.__upsert(path, stat, tags)
+                self.__forget(set(known) - seen)
+                self.__conn.commit()
+                self.__synced[directory] = dir_mtime
+
+            if changed:
+                logger.debug(f"Library index: read tags of {len(changed)} file(s) in {directory}")
+            return len(changed)
+
+    def invalidate_directory(self, directory):
+        """
+        Forget that a directory was synced, so the next lookup lists it
+        again. Writers call this after creating, renaming or removing files,
+        which a coarse directory mtime may not reveal.
+
+        Args:
+            directory: Directory whose listing changed
+        """
+        with self.__lock:
+            self.__synced.pop(os.path.abspath(directory), None)
+
+    def refresh_file(self, path):
+        """
+        Re-index one file after it was written or tagged, or drop it if
+        it no longer exists. Never raises.
+
+        Args:
+            path: Path of the audio file
+        """
+        try:
+            path = os.path.abspath(path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                with self.__lock:
+                    self.__forget([path])
+                    self.__conn.commit()
+                return
+
+            if not path.lower().endswith(AUDIO_EXTENSIONS):
+                return
+            tags = cached_file_tags(path, stat) or _NO_TAGS
+            with self.__lock:
+                self.__upsert(path, stat, tags)
+                self.__conn.commit()
+            # The writer may have created the file: list the directory again on next lookup
+            self.invalidate_directory(os.path.dirname(path))
+        except Exception as e:
+            logger.debug(f"Library index: could not refresh {path}: {e}")
+
+    def __validate(self, row):
+        """Return the row if its file is unchanged, re-reading or dropping it otherwise."""
+        path, title, album, isrc, platform_id, mtime_ns, size = row
+        try:
+            stat = os.stat(path)
+        except OSError:
+            with self.__lock:
+                self.__forget([path])
+                self.__conn.commit()
+            return None
+
+        if (stat.st_mtime_ns, stat.st_size) == (mtime_ns, size):
+            return {"path": path, "title": title, "album": album, "isrc": isrc, "platform_id": platform_id}
+
+        tags = cached_file_tags(path, stat) or _NO_TAGS
+        with self.__lock:
+            self.__upsert(path, stat, tags)
+            self.__conn.commit()
+        return dict(tags, path=path, isrc=normalize_isrc(tags["isrc"]))
+
+    def find(self, directory, title, album, extensions=None, isrc=None, platform_id=None):
+        """
+        Find indexed files of a directory holding a track.
+
+        A file matches on its deezspot platform ID, else on its ISRC, else
+        on its exact title and album tags. Title and album are not trusted
+        when both sides carry ISRCs, or IDs from the same platform, that
+        differ.
+
+        Args:
+            directory: Directory to look in (synced first if needed)
+            title: Exact title tag
+            album: Exact album tag
+            extensions: Optional iterable of lowercase extensions to accept
+            isrc: ISRC of the track, if known
+            platform_id: "<source>:<track id>" of the track, if known
+
+        Returns:
+            list[str]: Paths of the matching files that still exist, best match first
+        """
+        directory = os.path.abspath(directory)
+        self.sync_directory(directory)
+        isrc = normalize_isrc(isrc)
+
+        with self.__lock:
+            rows = self.__conn.execute(
+                "SELECT path, title, album, isrc, platform_id, mtime_ns, size FROM tracks "
+                "WHERE dir = ? AND ((title_key IS ? AND album_key IS ?) OR isrc = ? OR platform_id = ?)",
+                (directory, normalize_key(title), normalize_key(album), isrc, platform_id)
+            ).fetchall()
+
+        if extensions is not None:
+            extensions = tuple(ext.lower() for ext in extensions)
+            rows = [row for row in rows if row[0].lower().endswith(extensions)]
+
+        ranked = []
+        for row in rows:
+            entry = self.__validate(row)
+            if entry is None:
+                continue
+            rank = self.__match_rank(entry, title, album, isrc, platform_id)
+            if rank is not None:
+                ranked.append((rank, entry["path"]))
+        return [path for _, path in sorted(ranked)]
+
+    @staticmethod
+    def __match_rank(entry, title, album, isrc, platform_id):
+        """0 for an ID match, 1 for an ISRC match, 2 for a title/album match, None otherwise."""
+        if platform_id and entry["platform_id"] == platform_id:
+            return 0
+        if isrc and entry["isrc"]:
+            return 1 if entry["isrc"] == isrc else None
+        if platform_id and entry["platform_id"]:
+            same_source = platform_id.split(":", 1)[0] == entry["platform_id"].split(":", 1)[0]
+            if same_source:
+                return None
+        # The keys only narrow the search: tags must still match exactly
+        if entry["title"] == title and entry["album"] == album:
+            return 2
+        return None
+
+    def scan_tree(self, root):
+        """
+        Index every directory below root.
+
+        Args:
+            root: Library root directory
+
+        Returns:
+            int: Number of files whose tags had to be read
+        """
+        read = 0
+        for directory, _, _ in os.walk(root):
+            try:
+                read += self.sync_directory(directory)
+            except OSError as e:
+                logger.debug(f"Library index: skipping {directory}: {e}")
+        return read
+
+    def warm(self, root):
+        """
+        Start indexing a library root in a background thread, once per
+        root and process.
+
+        Args:
+            root: Library root directory
+
+        Returns:
+            Thread | None: The scanning thread, or None if already started
+        """
+        if not root:
+            return None
+        root = os.path.abspath(root)
+        with self.__lock:
+            if root in self.__warmed or not os.path.isdir(root):
+                return None
+            self.__warmed.add(root)
+
+        def scan():
+            try:
+                read = self.scan_tree(root)
+                logger.debug(f"Library index: initial scan of {root} done, {read} file(s) read")
+            except Exception as e:
+                logger.warning(f"Library index: initial scan of {root} failed: {e}")
+
+        thread = Thread(target=scan, name="deezspot-library-scan", daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        with self.__lock:
+            self.__conn.close()
+
+
+def get_library_index():
+    """Return the shared LibraryIndex, opening it on first use."""
+    global _INDEX
+    if _INDEX is None:
+        with _INDEX_LOCK:
+            if _INDEX is None:
+                _INDEX = LibraryIndex(stock_library_index_path)
+    return _INDEX
+
+
+def configure_library_index(db_path=None):
+    """
+    Point the shared index at another database file.
+
+    Args:
+        db_path: SQLite file path, ":memory:" to keep the index for this
+                 process only, or None for the default cache location
+
+    Returns:
+        LibraryIndex: The new shared index
+    """
+    global _INDEX
+    with _INDEX_LOCK:
+        old_index, _INDEX = _INDEX, LibraryIndex(db_path)
+    if old_index is not None:
+        old_index.close()
+    return _INDEX
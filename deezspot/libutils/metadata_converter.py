@@ -140,6 +140,9 @@ def track_object_to_dict(track_obj: Any, source_type: Optional[str] = None, arti
     if hasattr(track_obj, 'ids') and track_obj.ids:
         tags['ids'] = _get_platform_id(track_obj.ids, source_type)
         tags['isrc'] = getattr(track_obj.ids, 'isrc', None)
+        if tags['ids']:
+            # Source-qualified ID written to files so skip detection can match them exactly
+            tags['deezspot_id'] = f"{source_type}:{tags['ids']}"
     
     # Artist information
     if hasattr(track_obj, 'artists') and track_obj.artists:
@@ -24,3 +24,21 @@ stock_zip = False
 stock_real_time_dl = False
 stock_save_cover = False # Default for saving cover image
 stock_market = None
+stock_max_workers = 1 # Tracks downloaded concurrently per album/playlist
+stock_prefetch_lookahead = 0 # Extra tracks ahead of the download cursor whose covers and lyrics are fetched in the background (0: only the tracks of the other max_workers workers)
+stock_http_pool_size = 32 # Keep-alive connections per host in the shared HTTP client
+stock_http_max_retries = 3 # Retries on connection errors and 429/5xx responses
+stock_http_backoff_factor = 0.5 # Exponential backoff between HTTP retries
+stock_http_timeout = 30 # Default HTTP request timeout in seconds
+stock_library_index_path = None # SQLite library index for skip detection (None: user cache dir, ":memory:": not persisted)
+stock_stream_tags = True # Write MP3/FLAC tags in front of the audio while it downloads instead of rewriting the finished file
+stock_tag_cache_size = 4096 # Audio file versions whose tags are kept in memory for skip detection
+stock_cover_cache_dir = None # On-disk cover art store (None: user cache dir)
+stock_cover_cache_memory = 64 * 1024 * 1024 # Bytes of cover art kept in memory
+stock_cover_cache_disk = 512 * 1024 * 1024 # Bytes of cover art kept on disk
+stock_id_map_path = None # SQLite Spotify -> Deezer id mapping (None: user cache dir, ":memory:": not persisted)
+stock_id_map_miss_ttl = 24 * 60 * 60 # Seconds before a Spotify track without Deezer equivalent is looked up again
+stock_conversion_workers = 3 # Spotify tracks matched on Deezer concurrently by bulk conversion (Deezer allows ~50 API requests per 5 s)
+stock_spotify_batch_workers = 4 # Chunks of a batched Spotify tracks/albums request fetched concurrently
+stock_album_cache_size = 256 # Spotify albums (JSON and albumObject) kept in memory for track metadata
+stock_album_cache_ttl = 60 * 60 # Seconds a cached Spotify album is reused before it is fetched again
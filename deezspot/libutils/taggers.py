@@ -3,6 +3,7 @@
 import os
 from typing import Dict, Any, Optional, Union
 from deezspot.libutils.utils import request
+from deezspot.libutils.cover_cache import cached_cover
 from deezspot.libutils.logging_utils import logger
 from deezspot.libutils.write_tags import write_tags
 from deezspot.models.download import Track, Episode
@@ -26,8 +27,7 @@ def fetch_and_process_image(image_url_or_bytes: Union[str, bytes, None]) -> Opti
         
     if isinstance(image_url_or_bytes, str):
         try:
-            response = request(image_url_or_bytes)
-            return response.content
+            return cached_cover(image_url_or_bytes, lambda: request(image_url_or_bytes).content)
         except Exception as e:
             logger.warning(f"Failed to fetch image from URL {image_url_or_bytes}: {e}")
             return None
@@ -2,10 +2,10 @@
 
 import re
 from unicodedata import normalize
-from os import makedirs
+from os import makedirs, environ
 from datetime import datetime
 from urllib.parse import urlparse
-from requests import get as req_get
+from deezspot.libutils.http_client import get as req_get
 from zipfile import ZipFile, ZIP_DEFLATED
 from deezspot.models.download.track import Track
 from deezspot.exceptions import InvalidLink
@@ -14,7 +14,8 @@ from deezspot.libutils.logging_utils import ProgressReporter, logger
 
 from os.path import (
     isdir, basename,
-    join, isfile, dirname
+    join, isfile, dirname,
+    expanduser
 )
 
 def link_is_valid(link):
@@ -37,9 +38,15 @@ def request(url):
     thing = req_get(url, headers=header)
     return thing
 
+def get_cache_dir(*parts):
+    """Path below deezspot's directory in the user's cache (XDG_CACHE_HOME or ~/.cache)."""
+    cache_root = environ.get("XDG_CACHE_HOME") or join(expanduser("~"), ".cache")
+    return join(cache_root, "deezspot", *parts)
+
 def __check_dir(directory):
     if not isdir(directory):
-        makedirs(directory)
+        # exist_ok: concurrent track workers may create the same directory
+        makedirs(directory, exist_ok=True)
 
 def sanitize_name(string, max_length=200):
     """Sanitize a string for use as a filename or directory name.
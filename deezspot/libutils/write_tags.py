@@ -2,7 +2,7 @@
 
 from base64 import b64encode
 import mutagen
-from mutagen.flac import FLAC, Picture as FLACPicture
+from mutagen.flac import FLAC, Picture as FLACPicture, VCFLACDict
 from mutagen.oggvorbis import OggVorbis
 from mutagen.oggopus import OggOpus
 from mutagen.mp4 import MP4, MP4Cover
@@ -13,14 +13,62 @@ from mutagen.id3 import (
 )
 from deezspot.models.download import Track, Episode
 import requests
+from deezspot.libutils import http_client
+from deezspot.libutils.library_index import get_library_index, DEEZSPOT_ID_TAG
+from deezspot.libutils.cover_cache import cached_cover
 import logging
 import os
+import struct
 import traceback
+from io import BytesIO
+from collections import Counter
+from threading import Lock
 
 logger = logging.getLogger("deezspot.taggers")
 
+# Tag writes per file, so a download can be checked to rewrite its tags
+# only once. Off by default: every path written would stay in memory
+_WRITE_COUNTS = Counter()
+_WRITE_COUNTS_LOCK = Lock()
+_COUNT_WRITES = False
+
+def count_tag_writes(enabled=True):
+	"""
+	Start or stop counting tag writes per file (see tag_write_stats).
+
+	Args:
+		enabled: Count from now on; False stops and drops the counters
+	"""
+	global _COUNT_WRITES
+	with _WRITE_COUNTS_LOCK:
+		_COUNT_WRITES = bool(enabled)
+		if not _COUNT_WRITES:
+			_WRITE_COUNTS.clear()
+
+def tag_write_stats(reset=False):
+	"""
+	Report how many times tags were written since counting was enabled
+	with count_tag_writes, or since the last reset.
+
+	Args:
+		reset: Clear the counters after reading them
+
+	Returns:
+		dict: {"writes": total tag writes, "files": distinct files,
+		       "rewritten": {path: writes} for files tagged more than once}
+	"""
+	with _WRITE_COUNTS_LOCK:
+		stats = {
+			"writes": sum(_WRITE_COUNTS.values()),
+			"files": len(_WRITE_COUNTS),
+			"rewritten": {path: n for path, n in _WRITE_COUNTS.items() if n > 1},
+		}
+		if reset:
+			_WRITE_COUNTS.clear()
+	return stats
+
 def request(url):
-    response = requests.get(url)
+    response = http_client.get(url)
     response.raise_for_status()
     return response
 
@@ -29,10 +77,13 @@ def _get_image_bytes(image_data_or_url):
 	if isinstance(image_data_or_url, bytes):
 		return image_data_or_url
 	elif isinstance(image_data_or_url, str): # Assuming it's a URL
-		try:
-			response = requests.get(image_data_or_url, timeout=10)
+		def fetch():
+			response = http_client.get(image_data_or_url, timeout=10)
 			response.raise_for_status()
 			return response.content
+
+		try:
+			return cached_cover(image_data_or_url, fetch)
 		except requests.RequestException as e:
 			logger.warning(f"Failed to download image from URL {image_data_or_url}: {e}")
 			return None
@@ -55,13 +106,8 @@ def _format_date_for_mp4(year_obj):
 	return str(year_obj.year) 
 
 # --- MP3 (ID3 Tags) ---
-def __write_mp3(filepath, data):
-	try:
-		tags = ID3(filepath)
-	except ID3NoHeaderError:
-		tags = ID3()
-	tags.delete(filepath, delete_v1=True, delete_v2=True) # Clear existing tags
-	tags = ID3() # Re-initialize
+def __build_id3(data):
+	tags = ID3()
 
 	if data.get('music'): tags.add(TIT2(encoding=3, text=str(data['music'])))
 	if data.get('artist'): tags.add(TPE1(encoding=3, text=str(data['artist'])))
@@ -106,8 +152,19 @@ def __write_mp3(filepath, data):
 		tags.add(TXXX(encoding=3, desc='BPM', text=str(data['bpm'])))
 	if data.get('author'): # Lyricist
 		tags.add(TXXX(encoding=3, desc='LYRICIST', text=str(data['author'])))
+	if data.get('deezspot_id'): # Source track ID used by skip detection
+		tags.add(TXXX(encoding=3, desc=DEEZSPOT_ID_TAG, text=str(data['deezspot_id'])))
 
-	tags.save(filepath, v2_version=3)
+	return tags
+
+def __write_mp3(filepath, data):
+	try:
+		tags = ID3(filepath)
+	except ID3NoHeaderError:
+		tags = ID3()
+	tags.delete(filepath, delete_v1=True, delete_v2=True) # Clear existing tags
+
+	__build_id3(data).save(filepath, v2_version=3)
 
 # --- M4A (AAC/ALAC in MP4 Container) ---
 def __write_m4a(filepath, data):
@@ -175,6 +232,11 @@ def __write_m4a(filepath, data):
 		tags['----:com.apple.iTunes:ISRC'] = bytes(str(data['isrc']), 'utf-8')
 	elif '----:com.apple.iTunes:ISRC' in tags: del tags['----:com.apple.iTunes:ISRC']
 
+	deezspot_id_atom = f'----:com.apple.iTunes:{DEEZSPOT_ID_TAG}'
+	if data.get('deezspot_id'):
+		tags[deezspot_id_atom] = bytes(str(data['deezspot_id']), 'utf-8')
+	elif deezspot_id_atom in tags: del tags[deezspot_id_atom]
+
 	try:
 		mp4.save(filepath) # Use the MP4 object's save method
 	except Exception as e:
@@ -196,11 +258,38 @@ def __write_vorbis(filepath, data, audio_format_class):
 
 	tags.delete() # Clear existing tags before adding new ones
 
+	__fill_vorbis_comment(tags, data)
+
+	img_bytes = _get_image_bytes(data.get('image'))
+	if img_bytes:
+		if audio_format_class == FLAC:
+			tags.clear_pictures()
+			tags.add_picture(__flac_picture(img_bytes))
+		elif audio_format_class in [OggVorbis, OggOpus]:
+			try:
+				# For OGG/Opus, METADATA_BLOCK_PICTURE is a base64 encoded FLAC Picture block
+				tags['METADATA_BLOCK_PICTURE'] = [b64encode(__flac_picture(img_bytes).write()).decode('ascii')]
+			except Exception as e_ogg_pic:
+				logger.warning(f"Could not prepare/embed cover art for OGG/Opus in {filepath}: {e_ogg_pic}")
+	try:
+		tags.save()
+	except Exception as e:
+		logger.error(f"Failed to save Vorbis tags for {filepath} ({audio_format_class.__name__}): {e}")
+
+def __flac_picture(img_bytes):
+	pic = FLACPicture()
+	pic.type = 3
+	pic.mime = 'image/jpeg' if img_bytes.startswith(b'\xff\xd8') else 'image/png'
+	pic.data = img_bytes
+	return pic
+
+def __fill_vorbis_comment(tags, data):
 	VORBIS_MAP = {
 		'music': 'TITLE', 'artist': 'ARTIST', 'album': 'ALBUM', 'ar_album': 'ALBUMARTIST',
 		'genre': 'GENRE', 'composer': 'COMPOSER', 'copyright': 'COPYRIGHT',
 		'label': 'ORGANIZATION', 'isrc': 'ISRC', 'comment': 'COMMENT',
-		'lyric': 'LYRICS', 'author': 'LYRICIST', 'version': 'VERSION'
+		'lyric': 'LYRICS', 'author': 'LYRICIST', 'version': 'VERSION',
+		'deezspot_id': DEEZSPOT_ID_TAG
 	}
 
 	for data_key, vorbis_key in VORBIS_MAP.items():
@@ -221,36 +310,150 @@ def __write_vorbis(filepath, data, audio_format_class):
 	if isinstance(duration_sec, (int, float)) and duration_sec > 0:
 		tags['LENGTH'] = str(duration_sec) # Store as seconds string
 
-	img_bytes = _get_image_bytes(data.get('image'))
-	if img_bytes:
-		if audio_format_class == FLAC:
-			pic = FLACPicture()
-			pic.type = 3
-			pic.mime = 'image/jpeg' if img_bytes.startswith(b'\xff\xd8') else 'image/png'
-			pic.data = img_bytes
-			tags.clear_pictures()
-			tags.add_picture(pic)
-		elif audio_format_class in [OggVorbis, OggOpus]:
-			try:
-				# For OGG/Opus, METADATA_BLOCK_PICTURE is a base64 encoded FLAC Picture block
-				pic_for_ogg = FLACPicture() # Use FLACPicture structure
-				pic_for_ogg.type = 3
-				pic_for_ogg.mime = 'image/jpeg' if img_bytes.startswith(b'\xff\xd8') else 'image/png'
-				pic_for_ogg.data = img_bytes
-				tags['METADATA_BLOCK_PICTURE'] = [b64encode(pic_for_ogg.write()).decode('ascii')]
-			except Exception as e_ogg_pic:
-				logger.warning(f"Could not prepare/embed cover art for OGG/Opus in {filepath}: {e_ogg_pic}")
-	try:
-		tags.save()
-	except Exception as e:
-		logger.error(f"Failed to save Vorbis tags for {filepath} ({audio_format_class.__name__}): {e}")
-
 # --- WAV (ID3 Tags) ---
 def __write_wav(filepath, data):
 	# WAV files can store ID3 tags. This is more versatile than RIFF INFO.
 	__write_mp3(filepath, data) # Reuse MP3/ID3 logic
 
 
+# --- Tag headers written in front of streamed audio ---
+# Room left in the header for later tag edits to be made in place
+_HEADER_PADDING = 8192
+# Largest FLAC metadata block (24 bit length field)
+_FLAC_BLOCK_LIMIT = (1 << 24) - 1
+_FLAC_PADDING, _FLAC_VORBIS_COMMENT, _FLAC_PICTURE = 1, 4, 6
+
+def _record_write(filepath):
+	if _COUNT_WRITES:
+		with _WRITE_COUNTS_LOCK:
+			_WRITE_COUNTS[filepath] += 1
+	# Keep skip detection's index in step with the tags just written
+	get_library_index().refresh_file(filepath)
+
+def _flac_block(block_type, payload, last=False):
+	return struct.pack('>I', len(payload) | ((block_type | (0x80 if last else 0)) << 24)) + payload
+
+class TagHeader:
+	"""
+	Tags rendered in memory before a download, to be written as the file's
+	header while the decrypted audio streams in behind it.
+
+	splice() gets the first probe_size bytes of the audio stream and returns
+	them with the tags in place, or None when the stream does not have the
+	expected layout (the file is then tagged after the download as usual).
+	commit() finishes the file once it is complete.
+	"""
+
+	probe_size = 0
+
+	def __init__(self, size):
+		self.size = size
+		self.applied = False
+
+	def splice(self, head):
+		# No layout known: tag after the download
+		return None
+
+	def commit(self, filepath):
+		_record_write(filepath)
+
+class ID3Header(TagHeader):
+	"""ID3v2.3 tag with padding, placed before the first MPEG frame."""
+
+	probe_size = 3
+
+	def __init__(self, tag_bytes):
+		super().__init__(len(tag_bytes))
+		self.tag_bytes = tag_bytes
+
+	def splice(self, head):
+		# The stream carries its own ID3 tag: leave it to the regular writer
+		if head[:3] == b'ID3':
+			return None
+		return self.tag_bytes + head
+
+class FLACHeader(TagHeader):
+	"""
+	VORBIS_COMMENT, PICTURE and PADDING blocks inserted right after the
+	stream's STREAMINFO block.
+	"""
+
+	probe_size = 42 # "fLaC" + STREAMINFO block header and body
+
+	def __init__(self, blocks):
+		super().__init__(sum(len(payload) + 4 for _, payload in blocks))
+		self.blocks = blocks
+
+	def splice(self, head):
+		if head[:4] != b'fLaC' or head[4] & 0x7f != 0 or head[5:8] != b'\x00\x00\x22':
+			return None
+		streaminfo_last = bool(head[4] & 0x80)
+		inserted = b"".join(
+			_flac_block(block_type, payload, last=streaminfo_last and i == len(self.blocks) - 1)
+			for i, (block_type, payload) in enumerate(self.blocks)
+		)
+		return head[:4] + bytes([head[4] & 0x7f]) + head[5:42] + inserted + head[42:]
+
+	def commit(self, filepath):
+		# Comments or pictures the stream brought along become zeroed
+		# padding, so the file has only the blocks written here and keeps
+		# none of the stale tag data
+		with open(filepath, 'r+b') as f:
+			position = 4
+			own_blocks = len(self.blocks)
+			while True:
+				f.seek(position)
+				block_header = f.read(4)
+				if len(block_header) < 4:
+					break
+				block_type = block_header[0] & 0x7f
+				last = block_header[0] & 0x80
+				length = int.from_bytes(block_header[1:4], 'big')
+				if own_blocks <= 0 and block_type in (_FLAC_VORBIS_COMMENT, _FLAC_PICTURE):
+					f.seek(position)
+					f.write(bytes([_FLAC_PADDING | last]))
+					f.seek(position + 4)
+					for offset in range(0, length, _HEADER_PADDING):
+						f.write(bytes(min(_HEADER_PADDING, length - offset)))
+				if block_type != 0:
+					own_blocks -= 1
+				if last:
+					break
+				position += 4 + length
+		super().commit(filepath)
+
+def build_tag_header(data, file_ext):
+	"""
+	Render the tags of a track ahead of its download.
+
+	Args:
+		data: Metadata dictionary, as given to write_tags through Track.tags
+		file_ext: Extension of the file about to be written
+
+	Returns:
+		TagHeader | None: None for formats whose tags cannot be written up front
+	"""
+	try:
+		file_ext = (file_ext or '').lower()
+		if file_ext == ".mp3":
+			buffer = BytesIO()
+			__build_id3(data).save(buffer, v2_version=3, padding=lambda info: _HEADER_PADDING)
+			return ID3Header(buffer.getvalue())
+		if file_ext == ".flac":
+			comment = VCFLACDict()
+			__fill_vorbis_comment(comment, data)
+			blocks = [(_FLAC_VORBIS_COMMENT, comment.write(framing=False))]
+			img_bytes = _get_image_bytes(data.get('image'))
+			if img_bytes:
+				blocks.append((_FLAC_PICTURE, __flac_picture(img_bytes).write()))
+			blocks.append((_FLAC_PADDING, bytes(_HEADER_PADDING)))
+			if any(len(payload) > _FLAC_BLOCK_LIMIT for _, payload in blocks):
+				return None
+			return FLACHeader(blocks)
+	except Exception as e:
+		logger.warning(f"Could not prepare tags ahead of the download ({file_ext}): {e}")
+	return None
+
 # --- Main Dispatcher ---
 def write_tags(media):
 	if isinstance(media, Track):
@@ -296,6 +499,8 @@ def write_tags(media):
 			__write_wav(filepath, song_metadata)
 		else:
 			logger.warning(f"Unsupported file format for tagging: {file_ext} for file {filepath}")
+			return
+		_record_write(filepath)
 	except Exception as e:
 		logger.error(f"General error during tagging for {filepath}: {e}")
 		logger.debug(traceback.format_exc())
@@ -1,5 +1,7 @@
 #!/usr/bin/python3
 
+from deezspot.libutils.others_settings import stock_prefetch_lookahead
+
 class Preferences:
     def __init__(self) -> None:
         self.link = None
@@ -28,4 +30,8 @@ class Preferences:
         # New: optional Spotify trackObject to use when spotify_metadata is True
         self.spotify_track_obj = None
         # New: optional Spotify albumObject (from spotloader tracking_album) for album-level spotify_metadata
-        self.spotify_album_obj = None
\ No newline at end of file
+        self.spotify_album_obj = None
+        # New: number of tracks of an album/playlist downloaded concurrently (1 = serial)
+        self.max_workers: int = 1
+        # New: album/playlist tracks ahead of the download cursor prefetched in the background (0 = off)
+        self.prefetch_lookahead: int = stock_prefetch_lookahead
\ No newline at end of file
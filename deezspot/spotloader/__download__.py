@@ -2,9 +2,12 @@ import traceback
 import json
 import os
 import time
+import threading
+from contextlib import contextmanager
 from copy import deepcopy
 from os.path import isfile, dirname
 from librespot.core import Session
+from deezspot.spotloader.session_pool import SessionPool
 from deezspot.exceptions import TrackNotFound
 from librespot.metadata import TrackId, EpisodeId
 from deezspot.spotloader.spotify_settings import qualities
@@ -40,7 +43,7 @@ from deezspot.libutils.progress_reporter import (
     report_album_initializing, report_album_done, report_playlist_initializing, report_playlist_done
 )
 from deezspot.libutils.taggers import (
-    enhance_metadata_with_image, process_and_tag_track, process_and_tag_episode,
+    enhance_metadata_with_image, fetch_and_process_image, process_and_tag_track, process_and_tag_episode,
     save_cover_image_for_track
 )
 from deezspot.libutils.logging_utils import logger, report_progress
@@ -49,6 +52,7 @@ from deezspot.libutils.cleanup_utils import (
     unregister_active_download,
 )
 from deezspot.libutils.skip_detection import check_track_exists
+from deezspot.libutils.concurrency import run_in_order
 from deezspot.models.callback import (
     trackObject, albumTrackObject, playlistTrackObject, artistTrackObject,
     trackCallbackObject, albumCallbackObject, playlistCallbackObject,
@@ -80,16 +84,66 @@ def _album_object_to_dict(album_obj: albumObject) -> dict:
 
 class Download_JOB:
     session = None
+    session_pool = None
     progress_reporter = None
+    __local = threading.local()
 
     @classmethod
-    def __init__(cls, session: Session) -> None:
+    def __init__(cls, session: Session, session_pool: SessionPool = None) -> None:
         cls.session = session
+        cls.session_pool = session_pool
 
     @classmethod
     def set_progress_reporter(cls, reporter):
         cls.progress_reporter = reporter
 
+    @classmethod
+    def get_session(cls) -> Session:
+        """Return the session leased to the current worker thread, or the main session."""
+        session = getattr(cls.__local, 'session', None)
+        if session is not None:
+            return session
+        if cls.session_pool is not None:
+            return cls.session_pool.primary
+        return cls.session
+
+    @classmethod
+    @contextmanager
+    def pooled_session(cls):
+        """Lease a session from the pool to the current thread for the duration of the block."""
+        # Serial downloads run on the primary session
+        if cls.session_pool is None or cls.session_pool.size <= 1:
+            yield cls.get_session()
+            return
+
+        cls.__local.session = cls.session_pool.acquire()
+        try:
+            yield cls.__local.session
+        finally:
+            cls.session_pool.release(cls.__local.session)
+            cls.__local.session = None
+
+    @classmethod
+    def refresh_session(cls) -> None:
+        """Rebuild the current thread's leased session if it has died."""
+        session = getattr(cls.__local, 'session', None)
+        if cls.session_pool is None or session is None:
+            return
+        try:
+            cls.__local.session = cls.session_pool.ensure_healthy(session)
+        except Exception as e:
+            logger.error(f"Failed to rebuild Spotify session: {str(e)}")
+
+    @classmethod
+    def worker_count(cls, preferences: Preferences) -> int:
+        """Number of concurrent track workers to use for an album or playlist."""
+        # Real-time downloads are paced to the track duration; keep them serial
+        if getattr(preferences, 'real_time_dl', False) or cls.session_pool is None:
+            return 1
+        max_workers = getattr(preferences, 'max_workers', 1) or 1
+        cls.session_pool.ensure_size(max_workers)
+        return max_workers
+
 class EASY_DW:
     def __init__(
         self,
@@ -321,68 +375,14 @@ class EASY_DW:
     def get_no_dw_track(self) -> Track:
         return self.__c_track
 
-    def easy_dw(self) -> Track:
-        # Process image data using unified utility
-        self.__song_metadata_dict = enhance_metadata_with_image(self.__song_metadata_dict)
-
-        try:
-            # Initialize success to False, it will be set to True if download_try is successful
-            if hasattr(self, '_EASY_DW__c_track') and self.__c_track:
-                self.__c_track.success = False
-            elif hasattr(self, '_EASY_DW__c_episode') and self.__c_episode: # For episodes
-                self.__c_episode.success = False
-            
-            self.download_try() # This should set self.__c_track.success = True if successful
-
-        except Exception as e:
-            song_title = self.__song_metadata.title
-            artist_name = getattr(self.__preferences, 'artist_separator', '; ').join([a.name for a in self.__song_metadata.artists])
-            error_message = f"Download failed for '{song_title}' by '{artist_name}' (URL: {self.__link}). Original error: {str(e)}"
-            logger.error(error_message)
-            traceback.print_exc()
-            # Store the error message on the track object if it exists
-            if hasattr(self, '_EASY_DW__c_track') and self.__c_track:
-                self.__c_track.success = False
-                self.__c_track.error_message = error_message # Store the more detailed error message
-            # Removed problematic elif for __c_episode here as easy_dw in spotloader is focused on tracks.
-            # Episode-specific error handling should be within download_eps or its callers.
-            raise TrackNotFound(message=error_message, url=self.__link) from e
-        
-        # If the track was skipped (e.g. file already exists), return it immediately.
-        # download_try sets success=False and was_skipped=True in this case.
-        if hasattr(self, '_EASY_DW__c_track') and self.__c_track and getattr(self.__c_track, 'was_skipped', False):
-            return self.__c_track
-
-        # Final check for non-skipped tracks that might have failed after download_try returned.
-        # This handles cases where download_try didn't raise an exception but self.__c_track.success is still False.
-        if hasattr(self, '_EASY_DW__c_track') and self.__c_track and not self.__c_track.success:
-            song_title = self.__song_metadata.title
-            artist_name = getattr(self.__preferences, 'artist_separator', '; ').join([a.name for a in self.__song_metadata.artists])
-            original_error_msg = getattr(self.__c_track, 'error_message', "Download failed for an unspecified reason after attempt.")
-            error_msg_template = "Cannot download '{title}' by '{artist}'. Reason: {reason}"
-            final_error_msg = error_msg_template.format(title=song_title, artist=artist_name, reason=original_error_msg)
-            current_link = self.__c_track.link if hasattr(self.__c_track, 'link') and self.__c_track.link else self.__link
-            logger.error(f"{final_error_msg} (URL: {current_link})")
-            self.__c_track.error_message = final_error_msg # Ensure the most specific error is on the object
-            raise TrackNotFound(message=final_error_msg, url=current_link)
-            
-        # If we reach here, the track should be successful and not skipped.
-        if hasattr(self, '_EASY_DW__c_track') and self.__c_track and self.__c_track.success:
-            # Apply tags using unified utility
-            process_and_tag_track(
-                track=self.__c_track,
-                metadata_dict=self.__song_metadata_dict,
-                source_type='spotify',
-                save_cover=getattr(self.__preferences, 'save_cover', False)
-            )
-        
-        # Unregister the final successful file path after all operations are done.
-        # self.__c_track.song_path would have been updated by __convert_audio__ if conversion occurred.
-        unregister_active_download(self.__c_track.song_path)
-        
-        return self.__c_track
+    def skip_if_exists(self) -> Track:
+        """
+        Check the library for the track before anything is fetched for it.
 
-    def download_try(self) -> Track:
+        Returns:
+            Track: The track pointing at the existing file (reported as
+                   skipped), or None if the track has to be downloaded
+        """
         current_title = self.__song_metadata.title
         current_album = self.__song_metadata.album.title if self.__song_metadata.album else ''
         current_artist = getattr(self.__preferences, 'artist_separator', '; ').join([a.name for a in self.__song_metadata.artists])
@@ -397,7 +397,9 @@ class EASY_DW:
             title=current_title, 
             album=current_album, 
             convert_to=self.__preferences.convert_to, 
-            logger=logger # Pass the logger instance
+            logger=logger, # Pass the logger instance
+            isrc=self.__song_metadata_dict.get('isrc'),
+            platform_id=self.__song_metadata_dict.get('deezspot_id')
         )
 
         if exists and existing_file_path:
@@ -437,6 +439,68 @@ class EASY_DW:
             )
             return self.__c_track
 
+        return None
+
+    def easy_dw(self) -> Track:
+        # Skip tracks already in the library before the cover is fetched
+        skipped_track = self.skip_if_exists()
+        if skipped_track:
+            return skipped_track
+
+        # Process image data using unified utility
+        self.__song_metadata_dict = enhance_metadata_with_image(self.__song_metadata_dict)
+
+        try:
+            # Initialize success to False, it will be set to True if download_try is successful
+            if hasattr(self, '_EASY_DW__c_track') and self.__c_track:
+                self.__c_track.success = False
+            elif hasattr(self, '_EASY_DW__c_episode') and self.__c_episode: # For episodes
+                self.__c_episode.success = False
+            
+            self.download_try() # This should set self.__c_track.success = True if successful
+
+        except Exception as e:
+            song_title = self.__song_metadata.title
+            artist_name = getattr(self.__preferences, 'artist_separator', '; ').join([a.name for a in self.__song_metadata.artists])
+            error_message = f"Download failed for '{song_title}' by '{artist_name}' (URL: {self.__link}). Original error: {str(e)}"
+            logger.error(error_message)
+            traceback.print_exc()
+            # Store the error message on the track object if it exists
+            if hasattr(self, '_EASY_DW__c_track') and self.__c_track:
+                self.__c_track.success = False
+                self.__c_track.error_message = error_message # Store the more detailed error message
+            # Removed problematic elif for __c_episode here as easy_dw in spotloader is focused on tracks.
+            # Episode-specific error handling should be within download_eps or its callers.
+            raise TrackNotFound(message=error_message, url=self.__link) from e
+        
+        # If the track was skipped (e.g. file already exists), return it immediately.
+        # download_try sets success=False and was_skipped=True in this case.
+        if hasattr(self, '_EASY_DW__c_track') and self.__c_track and getattr(self.__c_track, 'was_skipped', False):
+            return self.__c_track
+
+        # Final check for non-skipped tracks that might have failed after download_try returned.
+        # This handles cases where download_try didn't raise an exception but self.__c_track.success is still False.
+        if hasattr(self, '_EASY_DW__c_track') and self.__c_track and not self.__c_track.success:
+            song_title = self.__song_metadata.title
+            artist_name = getattr(self.__preferences, 'artist_separator', '; ').join([a.name for a in self.__song_metadata.artists])
+            original_error_msg = getattr(self.__c_track, 'error_message', "Download failed for an unspecified reason after attempt.")
+            error_msg_template = "Cannot download '{title}' by '{artist}'. Reason: {reason}"
+            final_error_msg = error_msg_template.format(title=song_title, artist=artist_name, reason=original_error_msg)
+            current_link = self.__c_track.link if hasattr(self.__c_track, 'link') and self.__c_track.link else self.__link
+            logger.error(f"{final_error_msg} (URL: {current_link})")
+            self.__c_track.error_message = final_error_msg # Ensure the most specific error is on the object
+            raise TrackNotFound(message=final_error_msg, url=current_link)
+            
+        # If we reach here, the track is successful and download_try has
+        # already tagged the final file (and saved the cover if requested).
+
+        # Unregister the final successful file path after all operations are done.
+        # self.__c_track.song_path would have been updated by __convert_audio__ if conversion occurred.
+        unregister_active_download(self.__c_track.song_path)
+        
+        return self.__c_track
+
+    def download_try(self) -> Track:
         # Report initializing status for the track download
         parent_info, total_tracks_val = self._get_parent_info()
         
@@ -471,7 +535,7 @@ class EASY_DW:
         while True:
             try:
                 track_id_obj = TrackId.from_base62(self.__ids)
-                stream = Download_JOB.session.content_feeder().load_track(
+                stream = Download_JOB.get_session().content_feeder().load_track(
                     track_id_obj,
                     VorbisOnlyAudioQuality(self.__dw_quality),
                     False,
@@ -571,6 +635,9 @@ class EASY_DW:
                 global GLOBAL_RETRY_COUNT
                 GLOBAL_RETRY_COUNT += 1
                 retries += 1
+
+                # A dead pooled session is rebuilt before the next attempt
+                Download_JOB.refresh_session()
                 
                 # Clean up any incomplete file
                 if os.path.exists(self.__song_path):
@@ -754,7 +821,7 @@ class EASY_DW:
         episode_id = EpisodeId.from_base62(self.__ids)
         while True:
             try:
-                stream = Download_JOB.session.content_feeder().load_episode(
+                stream = Download_JOB.get_session().content_feeder().load_episode(
                     episode_id,
                     AudioQuality(self.__dw_quality),
                     False,
@@ -993,7 +1060,7 @@ class DW_ALBUM:
         report_album_initializing(album_obj)
         
         pic_url = max(album_obj.images, key=lambda i: i.get('height', 0) * i.get('width', 0)).get('url') if album_obj.images else None
-        image_bytes = request(pic_url).content if pic_url else None
+        image_bytes = fetch_and_process_image(pic_url)
         
         album = Album(self.__ids)
         album.image = image_bytes
@@ -1015,10 +1082,21 @@ class DW_ALBUM:
         # Calculate total number of discs for proper metadata tagging
         total_discs = max((track.disc_number for track in album_obj.tracks), default=1)
         
-        for a, track_in_album in enumerate(album_obj.tracks):
-            
+        def failed_album_track(a: int, e: Exception) -> Track:
+            # Create a failed track object for the summary
+            track_in_album = album_obj.tracks[a]
+            song_tags = _track_object_to_dict(track_in_album) if isinstance(track_in_album, trackObject) else {'music': 'Unknown Track'}
+            track = Track(tags=song_tags, song_path=None, file_format=None, quality=None, link=None, ids=track_in_album.ids)
+            track.success = False
+            track.error_message = str(e)
+            logger.warning(f"Track '{song_tags.get('music')}' from album '{album.album_name}' failed to download. Reason: {track.error_message}")
+            return track
+
+        def prepare_album_track(a: int):
+            """Build the track's downloader, or return its Track if it is already present or failed."""
+            track_in_album = album_obj.tracks[a]
             c_preferences = deepcopy(self.__preferences)
-            
+
             try:
                 # Fetch full track object as album endpoint only provides simplified track objects
                 full_track_obj = tracking(
@@ -1036,16 +1114,32 @@ class DW_ALBUM:
                 # Set album position for progress reporting (not for metadata - that comes from API)
                 c_preferences.track_number = a + 1
 
-                track = EASY_DW(c_preferences, parent='album').easy_dw()
+                track_dw = EASY_DW(c_preferences, parent='album')
+                return track_dw.skip_if_exists() or track_dw
 
             except (TrackNotFound, Exception) as e:
-                # Create a failed track object for the summary
-                song_tags = _track_object_to_dict(track_in_album) if isinstance(track_in_album, trackObject) else {'music': 'Unknown Track'}
-                track = Track(tags=song_tags, song_path=None, file_format=None, quality=None, link=None, ids=track_in_album.ids)
-                track.success = False
-                track.error_message = str(e)
-                logger.warning(f"Track '{song_tags.get('music')}' from album '{album.album_name}' failed to download. Reason: {track.error_message}")
+                return failed_album_track(a, e)
 
+        def download_album_track(a: int) -> Track:
+            item = prepared[a]
+            if isinstance(item, Track):
+                return item
+            try:
+                with Download_JOB.pooled_session():
+                    return item.easy_dw()
+            except (TrackNotFound, Exception) as e:
+                return failed_album_track(a, e)
+
+        workers = Download_JOB.worker_count(self.__preferences)
+        # Pre-flight: resolve every target path and skip tracks already in the
+        # library without leasing a librespot session or fetching covers for them
+        prepared = list(run_in_order(prepare_album_track, range(len(album_obj.tracks)), workers, thread_name_prefix="deezspot-spo-track"))
+        pending = sum(1 for item in prepared if isinstance(item, EASY_DW))
+        if pending < len(prepared):
+            logger.info(f"Album '{album.album_name}': {len(prepared) - pending} of {len(prepared)} tracks need no download")
+
+        # Each worker leases its own librespot session; results come back in album order
+        for track in run_in_order(download_album_track, range(len(album_obj.tracks)), workers, thread_name_prefix="deezspot-spo-track"):
             tracks.append(track)
 
         # Save album cover image
@@ -1143,8 +1237,9 @@ class DW_PLAYLIST:
 
         playlist = Playlist()
         tracks = playlist.tracks
-        for idx, c_song_metadata in enumerate(self.__song_metadata_list):
-            track = None
+        def prepare_playlist_track(idx: int):
+            """Build the item's downloader, or return its Track if it is already present or failed."""
+            c_song_metadata = self.__song_metadata_list[idx]
 
             if isinstance(c_song_metadata, dict) and 'error_type' in c_song_metadata:
                 track_title = c_song_metadata.get('name', 'Unknown Track')
@@ -1156,8 +1251,7 @@ class DW_PLAYLIST:
                 track = Track(tags=track_tags, song_path=None, file_format=None, quality=None, link=None, ids=track_ids)
                 track.success = False
                 track.error_message = error_message
-                tracks.append(track)
-                continue
+                return track
 
             # c_song_metadata is a trackObject
             c_preferences = deepcopy(self.__preferences)
@@ -1168,17 +1262,44 @@ class DW_PLAYLIST:
             c_preferences.link = f"https://open.spotify.com/track/{c_preferences.ids}" if c_preferences.ids else None
 
             easy_dw_instance = EASY_DW(c_preferences, parent='playlist')
-
             try:
-                track = easy_dw_instance.easy_dw()
+                return easy_dw_instance.skip_if_exists() or easy_dw_instance
             except (TrackNotFound, Exception) as e:
-                track = easy_dw_instance.get_no_dw_track()
-                if not isinstance(track, Track):
-                    track = Track(_track_object_to_dict(c_song_metadata), None, None, None, c_preferences.link, c_preferences.ids)
-                track.success = False
-                track.error_message = str(e)
-                logger.warning(f"Failed to download track '{c_song_metadata.title}' from playlist '{playlist_name}'. Reason: {track.error_message}")
+                return failed_playlist_track(idx, easy_dw_instance, e)
+
+        def failed_playlist_track(idx: int, easy_dw_instance, e: Exception) -> Track:
+            c_song_metadata = self.__song_metadata_list[idx]
+            track = easy_dw_instance.get_no_dw_track()
+            if not isinstance(track, Track):
+                track_id = c_song_metadata.ids.spotify
+                link = f"https://open.spotify.com/track/{track_id}" if track_id else None
+                track = Track(_track_object_to_dict(c_song_metadata), None, None, None, link, track_id)
+            track.success = False
+            track.error_message = str(e)
+            logger.warning(f"Failed to download track '{c_song_metadata.title}' from playlist '{playlist_name}'. Reason: {track.error_message}")
+            return track
+
+        def download_playlist_track(idx: int) -> Track:
+            easy_dw_instance = prepared[idx]
+            if isinstance(easy_dw_instance, Track):
+                return easy_dw_instance
 
+            try:
+                with Download_JOB.pooled_session():
+                    return easy_dw_instance.easy_dw()
+            except (TrackNotFound, Exception) as e:
+                return failed_playlist_track(idx, easy_dw_instance, e)
+
+        # Pre-flight: resolve every target path and skip tracks already in the
+        # library without leasing a librespot session or fetching covers for them
+        prepared = [prepare_playlist_track(idx) for idx in range(len(self.__song_metadata_list))]
+        pending = sum(1 for item in prepared if isinstance(item, EASY_DW))
+        if pending < len(prepared):
+            logger.info(f"Playlist '{playlist_name}': {len(prepared) - pending} of {len(prepared)} items need no download")
+
+        # Each worker leases its own librespot session; the m3u is written in playlist order
+        workers = Download_JOB.worker_count(self.__preferences)
+        for track in run_in_order(download_playlist_track, range(len(self.__song_metadata_list)), workers, thread_name_prefix="deezspot-spo-track"):
             if track:
                 tracks.append(track)
 
@@ -4,7 +4,7 @@ from os.path import isfile
 from deezspot.easy_spoty import Spo
 from librespot.core import Session
 from deezspot.exceptions import InvalidLink, MarketAvailabilityError
-from deezspot.spotloader.__spo_api__ import tracking, tracking_album, tracking_episode
+from deezspot.spotloader.__spo_api__ import tracking, tracking_album, tracking_batch, tracking_episode, cached_album
 from deezspot.spotloader.spotify_settings import stock_quality, stock_market
 from deezspot.libutils.utils import (
     get_ids,
@@ -27,6 +27,7 @@ from deezspot.spotloader.__download__ import (
     DW_EPISODE,
     Download_JOB,
 )
+from deezspot.spotloader.session_pool import SessionPool
 from deezspot.libutils.others_settings import (
     stock_output,
     stock_recursive_quality,
@@ -35,7 +36,8 @@ from deezspot.libutils.others_settings import (
     stock_zip,
     stock_save_cover,
     stock_real_time_dl,
-    stock_market
+    stock_market,
+    stock_max_workers
 )
 from deezspot.libutils.logging_utils import logger, ProgressReporter, report_progress
 
@@ -74,7 +76,9 @@ class SpoLogin:
                 logger.error("Credentials file not found")
                 raise FileNotFoundError("Please fill your credentials.json location!")
 
-            Download_JOB(session)
+            # Extra sessions for concurrent album/playlist downloads are opened on demand
+            session_pool = SessionPool(self.credentials_path, session=session)
+            Download_JOB(session, session_pool)
             Download_JOB.set_progress_reporter(self.progress_reporter)
         except Exception as e:
             logger.error(f"Failed to initialize Spotify session: {str(e)}")
@@ -182,12 +186,14 @@ class SpoLogin:
         bitrate=None,
         save_cover=stock_save_cover,
         market: list[str] | None = stock_market,
-        artist_separator: str = "; "
+        artist_separator: str = "; ",
+        max_workers: int = stock_max_workers
     ) -> Album:
         try:
             link_is_valid(link_album)
             ids = get_ids(link_album)
-            album_json = Spo.get_album(ids)
+            # Shared with tracking() and the album's tracks through the album cache
+            album_json = cached_album(ids)
             if not album_json:
                  raise Exception(f"Could not retrieve album data for {link_album}.")
             
@@ -225,6 +231,7 @@ class SpoLogin:
             preferences.save_cover = save_cover
             preferences.market = market
             preferences.artist_separator = artist_separator
+            preferences.max_workers = max_workers
 
             album = DW_ALBUM(preferences).dw()
 
@@ -256,7 +263,8 @@ class SpoLogin:
         bitrate=None,
         save_cover=stock_save_cover,
         market: list[str] | None = stock_market,
-        artist_separator: str = "; "
+        artist_separator: str = "; ",
+        max_workers: int = stock_max_workers
     ) -> Playlist:
         try:
             link_is_valid(link_playlist)
@@ -274,6 +282,12 @@ class SpoLogin:
                 logger.warning(f"Playlist {link_playlist} has no tracks or could not be fetched.")
                 # We can still proceed to create an empty playlist object for consistency
                 
+            # Metadata of every track is resolved up front with batched track/album requests
+            tracked = tracking_batch(
+                [item['track'] for item in playlist_tracks_data if item and item.get('track') and item['track'].get('id')],
+                market=market
+            )
+
             song_metadata_list = []
             for item in playlist_tracks_data:
                 if not item or 'track' not in item or not item['track']:
@@ -290,19 +304,18 @@ class SpoLogin:
                     song_metadata_list.append({'error_type': 'missing_track_id', 'error_message': 'Playlist item is missing a track ID.', 'name': track_data.get('name', 'Unknown Track without ID'), 'ids': None})
                     continue
 
-                try:
-                    song_metadata = tracking(track_id, market=market)
-                    if song_metadata:
-                        song_metadata_list.append(song_metadata)
-                    else:
-                        # Create a placeholder for tracks that fail metadata fetching
-                        failed_track_info = {'error_type': 'metadata_fetch_failed', 'error_message': f"Failed to fetch metadata for track ID: {track_id}", 'name': track_data.get('name', f'Track ID {track_id}'), 'ids': track_id}
-                        song_metadata_list.append(failed_track_info)
-                        logger.warning(f"Could not retrieve metadata for track {track_id} in playlist {link_playlist}.")
-                except MarketAvailabilityError as e:
-                    failed_track_info = {'error_type': 'market_availability_error', 'error_message': str(e), 'name': track_data.get('name', f'Track ID {track_id}'), 'ids': track_id}
+                song_metadata = tracked.get(track_id)
+                if isinstance(song_metadata, MarketAvailabilityError):
+                    failed_track_info = {'error_type': 'market_availability_error', 'error_message': str(song_metadata), 'name': track_data.get('name', f'Track ID {track_id}'), 'ids': track_id}
+                    song_metadata_list.append(failed_track_info)
+                    logger.warning(str(song_metadata))
+                elif song_metadata:
+                    song_metadata_list.append(song_metadata)
+                else:
+                    # Create a placeholder for tracks that fail metadata fetching
+                    failed_track_info = {'error_type': 'metadata_fetch_failed', 'error_message': f"Failed to fetch metadata for track ID: {track_id}", 'name': track_data.get('name', f'Track ID {track_id}'), 'ids': track_id}
                     song_metadata_list.append(failed_track_info)
-                    logger.warning(str(e))
+                    logger.warning(f"Could not retrieve metadata for track {track_id} in playlist {link_playlist}.")
 
             preferences = Preferences()
             preferences.real_time_dl = real_time_dl
@@ -333,6 +346,7 @@ class SpoLogin:
             preferences.save_cover = save_cover
             preferences.market = market
             preferences.artist_separator = artist_separator
+            preferences.max_workers = max_workers
             
             playlist = DW_PLAYLIST(preferences).dw()
 
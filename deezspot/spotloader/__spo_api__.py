@@ -4,7 +4,9 @@ from deezspot.easy_spoty import Spo
 import traceback
 from deezspot.libutils.logging_utils import logger
 from deezspot.exceptions import MarketAvailabilityError
-from typing import List, Optional, Dict, Any
+from deezspot.libutils.concurrency import MemoCache
+from deezspot.libutils.others_settings import stock_album_cache_size, stock_album_cache_ttl
+from typing import List, Optional, Dict, Any, Tuple
 
 from deezspot.models.callback.album import albumObject, artistAlbumObject, trackAlbumObject as CbTrackAlbumObject, artistTrackAlbumObject
 from deezspot.models.callback.artist import artistObject
@@ -75,9 +77,101 @@ def _json_to_album_track_object(album_json: dict) -> albumTrackObject:
         artists=[_json_to_artist_album_track_object(artist) for artist in album_json.get('artists', [])]
     )
 
-def tracking(ids, album_data_for_track=None, market: list[str] | None = None) -> Optional[trackObject]:
+# --- Album JSON and albumObjects shared by tracking, tracking_album and album downloads ---
+# Failed lookups (None) are not kept, so they are retried on the next call
+_ALBUM_JSON_CACHE = MemoCache(stock_album_cache_size, ttl=stock_album_cache_ttl, cache_none=False)
+_ALBUM_OBJECT_CACHE = MemoCache(stock_album_cache_size, ttl=stock_album_cache_ttl, cache_none=False)
+_ALBUM_INDEX_CACHE = MemoCache(stock_album_cache_size, ttl=stock_album_cache_ttl)
+
+
+def _build_album_index(album_json) -> Tuple[Dict[str, Tuple[int, int]], int]:
+    positions = {}
+    disc_track_counts = {}
+    for track_item in (album_json.get('tracks') or {}).get('items') or []:
+        if not track_item or not track_item.get('id'):
+            continue
+        disc_num = track_item.get('disc_number', 1)
+        disc_track_counts[disc_num] = disc_track_counts.get(disc_num, 0) + 1
+        # A track listed twice keeps its first position
+        positions.setdefault(track_item['id'], (disc_num, disc_track_counts[disc_num]))
+    total_discs = max((disc_num for disc_num in disc_track_counts if disc_num), default=1)
+    return positions, total_discs
+
+
+def album_track_index(album_json) -> Tuple[Dict[str, Tuple[int, int]], int]:
+    """
+    Position of every track of a Spotify album, computed once per album.
+
+    Args:
+        album_json: Album JSON with its track list
+
+    Returns:
+        tuple: ({track id: (disc number, track number within the disc)},
+               total discs)
+    """
+    album_id = album_json.get('id')
+    if not album_id:
+        return _build_album_index(album_json)
+    # The track count is part of the key so an album JSON with a partial track list gets its own index
+    key = (album_id, len((album_json.get('tracks') or {}).get('items') or []))
+    return _ALBUM_INDEX_CACHE.get(key, lambda: _build_album_index(album_json))
+
+
+def cached_album(album_id) -> Optional[dict]:
+    """Spotify album JSON with its complete track list, fetched once per album_cache_ttl."""
+    return _ALBUM_JSON_CACHE.get(album_id, lambda: Spo.get_album(album_id))
+
+
+def cached_album_object(album_id, market: list[str] | None = None) -> Optional[albumObject]:
+    """albumObject of a Spotify album, built from cached_album() once per market."""
+    return tracking_album(cached_album(album_id), market)
+
+
+def album_cache_stats(reset: bool = False) -> Dict[str, Dict[str, int]]:
+    """Hit/miss counters and sizes of the album JSON and albumObject caches."""
+    return {
+        "albums": _ALBUM_JSON_CACHE.stats(reset),
+        "album_objects": _ALBUM_OBJECT_CACHE.stats(reset),
+    }
+
+
+def clear_album_cache() -> None:
+    _ALBUM_JSON_CACHE.clear()
+    _ALBUM_OBJECT_CACHE.clear()
+    _ALBUM_INDEX_CACHE.clear()
+
+
+class SpotifyObjectCache:
+    """
+    Spotify track JSON of one download run, keyed by Spotify id.
+
+    Collection downloads seed it with the track JSON they already hold, so
+    converting and tagging their tracks does not fetch it again. Albums go
+    through the shared album caches.
+    """
+
+    def __init__(self, track_jsons=(), maxsize: int = 4096):
+        self.__tracks = MemoCache(maxsize)
+        for track_json in track_jsons:
+            self.add_track(track_json)
+
+    def add_track(self, track_json: dict) -> None:
+        if track_json and track_json.get('id'):
+            self.__tracks.put(track_json['id'], track_json)
+
+    def track(self, ids) -> Optional[dict]:
+        return self.__tracks.get(ids, lambda: Spo.get_track(ids))
+
+    def album(self, album_id) -> Optional[dict]:
+        return cached_album(album_id)
+
+    def album_object(self, album_id, market: list[str] | None = None) -> Optional[albumObject]:
+        return cached_album_object(album_id, market)
+
+
+def tracking(ids, album_data_for_track=None, market: list[str] | None = None, objects: SpotifyObjectCache | None = None) -> Optional[trackObject]:
     try:
-        json_track = Spo.get_track(ids)
+        json_track = objects.track(ids) if objects else Spo.get_track(ids)
         if not json_track:
             logger.error(f"Failed to get track details for ID: {ids} from Spotify API.")
             return None
@@ -88,58 +182,32 @@ def tracking(ids, album_data_for_track=None, market: list[str] | None = None) ->
 
         album_to_process = None
         full_album_obj = None
+        album_total_discs = None
         album_track_number = json_track.get('track_number', 1)  # Default to individual track number
         album_disc_number = json_track.get('disc_number', 1)    # Default to individual disc number
         
         if album_data_for_track:
             album_to_process = album_data_for_track
-            # When we have album context, find the track's correct position within its disc
-            simplified_tracks = album_data_for_track.get('tracks', {}).get('items', [])
-            
-            # Group tracks by disc and calculate track numbers relative to each disc
-            disc_track_counts = {}
-            for track_item in simplified_tracks:
-                if track_item and track_item.get('id'):
-                    disc_num = track_item.get('disc_number', 1)
-                    if disc_num not in disc_track_counts:
-                        disc_track_counts[disc_num] = 0
-                    
-                    if track_item.get('id') == ids:
-                        disc_track_counts[disc_num] += 1
-                        album_track_number = disc_track_counts[disc_num]  # Track number within disc
-                        album_disc_number = disc_num  # Disc number from album context
-                        break
-                    else:
-                        disc_track_counts[disc_num] += 1
+            # When we have album context, the track's position within its disc
+            # comes from the album's index, built once for all of its tracks
+            positions, album_total_discs = album_track_index(album_data_for_track)
+            if ids in positions:
+                album_disc_number, album_track_number = positions[ids]
         elif json_track.get('album'):
             album_id = json_track.get('album', {}).get('id')
             if album_id:
                 # Try to get full album data with all tracks for proper disc counting
-                full_album_data = Spo.get_album(album_id)
+                full_album_data = cached_album(album_id)
                 if full_album_data:
                     album_to_process = full_album_data
-                    # Also create a full album object to get total_discs
+                    # Also create a full album object to get total_discs (cached per album too)
                     full_album_obj = tracking_album(full_album_data, market)
             if not album_to_process:
                album_to_process = json_track.get('album')
 
-        album_for_track = _json_to_album_track_object(album_to_process) if album_to_process else albumTrackObject()
-        
         # If we have a full album object with total_discs, use that information
-        if full_album_obj and hasattr(full_album_obj, 'total_discs'):
-            album_for_track.total_discs = full_album_obj.total_discs
-        
-        track_obj = trackObject(
-            title=json_track.get('name', ''),
-            disc_number=album_disc_number,
-            track_number=album_track_number,
-            duration_ms=json_track.get('duration_ms', 0),
-            explicit=json_track.get('explicit', False),
-            genres=album_for_track.genres,
-            album=album_for_track,
-            artists=[_json_to_artist_track_object(artist) for artist in json_track.get('artists', [])],
-            ids=_json_to_ids(json_track)
-        )
+        total_discs = getattr(full_album_obj, 'total_discs', None) if full_album_obj else album_total_discs
+        track_obj = _build_track_object(json_track, album_to_process, album_track_number, album_disc_number, total_discs)
         logger.debug(f"Successfully tracked metadata for track {ids}")
         return track_obj
         
@@ -150,6 +218,112 @@ def tracking(ids, album_data_for_track=None, market: list[str] | None = None) ->
         logger.debug(traceback.format_exc())
         return None
 
+def _build_track_object(json_track: dict, album_json: dict | None, track_number, disc_number, total_discs=None) -> trackObject:
+    album_for_track = _json_to_album_track_object(album_json) if album_json else albumTrackObject()
+    if total_discs:
+        album_for_track.total_discs = total_discs
+
+    return trackObject(
+        title=json_track.get('name', ''),
+        disc_number=disc_number,
+        track_number=track_number,
+        duration_ms=json_track.get('duration_ms', 0),
+        explicit=json_track.get('explicit', False),
+        genres=album_for_track.genres,
+        album=album_for_track,
+        artists=[_json_to_artist_track_object(artist) for artist in json_track.get('artists', [])],
+        ids=_json_to_ids(json_track)
+    )
+
+def tracking_batch(tracks, market: list[str] | None = None) -> Dict[str, Any]:
+    """
+    Build the trackObjects of many tracks (e.g. a playlist) with batched
+    requests instead of the get_track + get_album + get_tracks round trips
+    tracking() makes for every track.
+
+    Tracks given by id are fetched with Spo.get_tracks; the albums of all
+    tracks are deduplicated and those not in the album cache are fetched with
+    Spo.get_albums, with their full track lists, and stored there; every
+    trackObject is then built locally. Track and album
+    numbering, total_discs and market checks match tracking().
+
+    Args:
+        tracks: Spotify track JSON objects (e.g. playlist items) or track ids
+        market: Markets the tracks must be available in
+
+    Returns:
+        dict: {track id: trackObject, None if its metadata could not be
+              fetched, or the MarketAvailabilityError raised for it}
+    """
+    market_param = ','.join(market) if market else None
+    track_jsons = {}
+    for track in tracks:
+        if isinstance(track, dict):
+            if track.get('id'):
+                track_jsons[track['id']] = track
+        elif track:
+            track_jsons.setdefault(track, None)
+
+    to_fetch = [track_id for track_id, json_track in track_jsons.items() if json_track is None]
+    if to_fetch:
+        try:
+            fetched = (Spo.get_tracks(to_fetch, market=market_param) or {}).get('tracks') or []
+        except Exception as e:
+            logger.error(f"Failed to get details of {len(to_fetch)} track(s) from Spotify API: {str(e)}")
+            fetched = []
+        for json_track in fetched:
+            if json_track and json_track.get('id') in track_jsons:
+                track_jsons[json_track['id']] = json_track
+
+    album_ids = list(dict.fromkeys(
+        (json_track.get('album') or {}).get('id')
+        for json_track in track_jsons.values()
+        if json_track and (json_track.get('album') or {}).get('id')
+    ))
+    albums = {album_id: _ALBUM_JSON_CACHE.peek(album_id) for album_id in album_ids}
+    missing_albums = [album_id for album_id, album_json in albums.items() if album_json is None]
+    if missing_albums:
+        try:
+            # Fetched like cached_album() does (no market), so they can be shared with it
+            fetched = (Spo.get_albums(missing_albums) or {}).get('albums') or []
+        except Exception as e:
+            logger.error(f"Failed to get details of {len(missing_albums)} album(s) from Spotify API: {str(e)}")
+            fetched = []
+        for album_json in fetched:
+            if album_json and album_json.get('id'):
+                albums[album_json['id']] = album_json
+                _ALBUM_JSON_CACHE.put(album_json['id'], album_json)
+
+    results = {}
+    for track_id, json_track in track_jsons.items():
+        if not json_track:
+            logger.error(f"Failed to get track details for ID: {track_id} from Spotify API.")
+            results[track_id] = None
+            continue
+        try:
+            _check_market_availability(json_track.get('name', f'Track ID {track_id}'), "Track", json_track.get('available_markets'), market)
+
+            album_json = albums.get((json_track.get('album') or {}).get('id'))
+            total_discs = None
+            if album_json:
+                # tracking() gets these from tracking_album(), which also checks the album's markets
+                _check_market_availability(album_json.get('name', f"Album ID {album_json.get('id')}"), "Album", album_json.get('available_markets'), market)
+                _, total_discs = album_track_index(album_json)
+
+            results[track_id] = _build_track_object(
+                json_track, album_json or json_track.get('album'),
+                json_track.get('track_number', 1), json_track.get('disc_number', 1), total_discs
+            )
+        except MarketAvailabilityError as e:
+            results[track_id] = e
+        except Exception as e:
+            logger.error(f"Failed to track metadata for track {track_id}: {str(e)}")
+            logger.debug(traceback.format_exc())
+            results[track_id] = None
+
+    logger.debug(f"Tracked metadata for {len(track_jsons)} track(s) from {sum(1 for album_json in albums.values() if album_json)} album(s) in batch")
+    return results
+
 def _json_to_artist_album_object(artist_json: dict) -> artistAlbumObject:
     return artistAlbumObject(
         name=artist_json.get('name', ''),
@@ -168,6 +342,13 @@ def _json_to_track_album_object(track_json: dict) -> CbTrackAlbumObject:
     )
 
 def tracking_album(album_json, market: list[str] | None = None) -> Optional[albumObject]:
+    # Market errors are raised again on every call: only built objects are cached
+    if album_json and album_json.get('id'):
+        key = (album_json['id'], tuple(market or ()))
+        return _ALBUM_OBJECT_CACHE.get(key, lambda: _tracking_album(album_json, market))
+    return _tracking_album(album_json, market)
+
+def _tracking_album(album_json, market: list[str] | None = None) -> Optional[albumObject]:
     if not album_json:
         logger.error("tracking_album received None or empty album_json.")
         return None
@@ -178,6 +359,8 @@ def tracking_album(album_json, market: list[str] | None = None) -> Optional[albu
         _check_market_availability(album_name_for_check, "Album", api_album_markets, market)
 
         album_artists = [_json_to_artist_album_object(a) for a in album_json.get('artists', [])]
+        # Index the track positions now: tracking() reuses it for every track of the album
+        album_track_index(album_json)
         
         album_tracks = []
         simplified_tracks = album_json.get('tracks', {}).get('items', [])
@@ -185,7 +368,7 @@ def tracking_album(album_json, market: list[str] | None = None) -> Optional[albu
         
         full_tracks_data = []
         if track_ids:
-            # Batch fetch full track objects. The get_tracks method should handle chunking if necessary.
+            # Batch fetch full track objects; get_tracks splits them into API-sized chunks
             full_tracks_data = Spo.get_tracks(track_ids, market=','.join(market) if market else None)
 
         track_items_to_process = []
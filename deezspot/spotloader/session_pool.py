@@ -0,0 +1,189 @@
+#!/usr/bin/python3
+
+from os.path import isfile
+from threading import Condition, Lock
+from typing import List, Optional
+from librespot.core import Session
+from deezspot.libutils.logging_utils import logger
+
+
+class SessionPool:
+    """
+    A bounded pool of librespot sessions opened from the same stored
+    credentials file, so that several tracks can be fetched at once.
+
+    The session it is given (or one fresh session) is the primary session
+    used by serial downloads; it is never leased. Leased sessions are
+    opened lazily when concurrent workers ask for them, up to `size`.
+    Every checkout is health-checked and dead sessions are closed and
+    rebuilt in place.
+    """
+
+    def __init__(
+        self,
+        credentials_path: str,
+        size: int = 1,
+        session: Optional[Session] = None
+    ) -> None:
+        self.credentials_path = credentials_path
+        self.size = max(1, int(size or 1))
+        self.__cond = Condition()
+        self.__sessions: List[Session] = []
+        self.__idle: List[Session] = []
+        self.__primary_lock = Lock()
+        self.__primary = session if session is not None else self.__build_session()
+
+    def __build_session(self) -> Session:
+        if not isfile(self.credentials_path):
+            raise FileNotFoundError("Please fill your credentials.json location!")
+
+        session_builder = Session.Builder()
+        session_builder.conf.stored_credentials_file = self.credentials_path
+        session = session_builder.stored_file().create()
+        logger.debug("Opened pooled Spotify session")
+        return session
+
+    @staticmethod
+    def is_healthy(session: Session) -> bool:
+        """
+        Check whether a librespot session is still usable.
+
+        Args:
+            session: The session to check
+
+        Returns:
+            bool: False if the session reports itself invalid or the check fails
+        """
+        if session is None:
+            return False
+        is_valid = getattr(session, 'is_valid', None)
+        if not callable(is_valid):
+            return True
+        try:
+            return bool(is_valid())
+        except Exception:
+            return False
+
+    def ensure_size(self, size: int) -> None:
+        """
+        Allow the pool to grow to at least `size` sessions.
+
+        Args:
+            size: Number of sessions concurrent workers will need
+        """
+        with self.__cond:
+            self.size = max(self.size, int(size or 1))
+
+    @property
+    def primary(self) -> Session:
+        """
+        The session used for serial downloads, rebuilt first if it died.
+        It is kept apart from the leased sessions, so no worker holds it.
+        """
+        with self.__primary_lock:
+            if not self.is_healthy(self.__primary):
+                if self.__primary is not None:
+                    logger.warning("Primary Spotify session is no longer valid, rebuilding it")
+                    try:
+                        self.__primary.close()
+                    except Exception:
+                        pass
+                    self.__primary = None
+                self.__primary = self.__build_session()
+            return self.__primary
+
+    def acquire(self) -> Session:
+        """
+        Check out a healthy session, opening a new one if the pool has
+        not reached its size yet, or waiting for one to be released.
+
+        Returns:
+            Session: A session reserved for the caller until release()
+        """
+        with self.__cond:
+            while not self.__idle and len(self.__sessions) >= self.size:
+                self.__cond.wait()
+
+            if self.__idle:
+                session = self.__idle.pop()
+            else:
+                # Reserve the slot before opening the connection outside the lock
+                session = None
+                self.__sessions.append(None)
+
+        if session is None:
+            try:
+                new_session = self.__build_session()
+            except Exception:
+                with self.__cond:
+                    self.__sessions.remove(None)
+                    self.__cond.notify()
+                raise
+            with self.__cond:
+                self.__sessions[self.__sessions.index(None)] = new_session
+            return new_session
+
+        return self.ensure_healthy(session)
+
+    def release(self, session: Session) -> None:
+        """
+        Return a session obtained from acquire() to the pool.
+
+        Args:
+            session: The session to give back
+        """
+        with self.__cond:
+            if session in self.__sessions and session not in self.__idle:
+                self.__idle.append(session)
+                self.__cond.notify()
+
+    def ensure_healthy(self, session: Session) -> Session:
+        """
+        Rebuild a checked-out session if it is no longer valid.
+
+        Args:
+            session: A session currently held by the caller
+
+        Returns:
+            Session: The same session if healthy, otherwise its replacement
+        """
+        if self.is_healthy(session):
+            return session
+
+        logger.warning("Spotify session is no longer valid, rebuilding it")
+        try:
+            session.close()
+        except Exception:
+            pass
+
+        try:
+            new_session = self.__build_session()
+        except Exception:
+            # Give the dead session's slot back, like a failed fresh build does
+            with self.__cond:
+                if session in self.__sessions:
+                    self.__sessions.remove(session)
+                self.__cond.notify()
+            raise
+        with self.__cond:
+            if session in self.__sessions:
+                self.__sessions[self.__sessions.index(session)] = new_session
+            else:
+                self.__sessions.append(new_session)
+        return new_session
+
+    def close(self) -> None:
+        """Close every session owned by the pool."""
+        with self.__cond:
+            sessions = [s for s in self.__sessions if s is not None]
+            self.__sessions = []
+            self.__idle = []
+        with self.__primary_lock:
+            if self.__primary is not None:
+                sessions.append(self.__primary)
+            self.__primary = None
+        for session in sessions:
+            try:
+                session.close()
+            except Exception:
+                pass
@@ -0,0 +1,65 @@
+import pytest
+from spotipy.exceptions import SpotifyException
+
+from deezspot import easy_spoty
+from deezspot.easy_spoty import BatchScheduler, _chunks
+
+
+def rate_limited(retry_after="2"):
+    return SpotifyException(429, -1, "rate limited", headers={"Retry-After": retry_after})
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(easy_spoty.time, "sleep", recorded.append)
+    return recorded
+
+
+def test_map_keeps_the_chunk_order():
+    scheduler = BatchScheduler(max_workers=4)
+    chunks = _chunks(range(10), 3)
+
+    assert chunks == [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]]
+    assert scheduler.map(sum, chunks) == [3, 12, 21, 9]
+
+
+def test_rate_limit_holds_off_for_retry_after(sleeps):
+    scheduler = BatchScheduler(max_workers=1)
+    answers = [rate_limited("2"), "ok"]
+
+    def call():
+        answer = answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    assert scheduler.call(call) == "ok"
+    assert len(sleeps) == 1 and 1 < sleeps[0] <= 2
+
+
+def test_other_errors_are_not_retried(sleeps):
+    scheduler = BatchScheduler(max_workers=1)
+    calls = []
+
+    def call():
+        calls.append(1)
+        raise SpotifyException(404, -1, "not found")
+
+    with pytest.raises(SpotifyException):
+        scheduler.call(call)
+    assert calls == [1]
+    assert sleeps == []
+
+
+def test_rate_limit_gives_up_after_max_retries(sleeps):
+    scheduler = BatchScheduler(max_workers=1, max_retries=2)
+    calls = []
+
+    def call():
+        calls.append(1)
+        raise rate_limited("0")
+
+    with pytest.raises(SpotifyException):
+        scheduler.call(call)
+    assert len(calls) == 3
@@ -0,0 +1,111 @@
+import threading
+import time
+
+from deezspot.libutils import concurrency
+from deezspot.libutils.concurrency import KeyLocks, MemoCache, Prefetcher
+
+
+def test_prefetcher_warms_ahead_of_the_cursor():
+    warmed = []
+    with Prefetcher(range(10), warmed.extend, lookahead=4, batch_size=2) as prefetcher:
+        prefetcher.wait(0)
+    assert sorted(warmed) == [0, 1, 2, 3, 4, 5]
+
+
+def test_prefetcher_does_not_block_when_asked_not_to():
+    release = threading.Event()
+    with Prefetcher(range(4), lambda batch: release.wait(5), lookahead=2, batch_size=2) as prefetcher:
+        prefetcher.wait(0, block=False)
+        release.set()
+
+
+def test_prefetcher_without_lookahead_only_warms_when_blocking():
+    warmed = []
+    prefetcher = Prefetcher(range(3), warmed.extend, lookahead=0)
+    prefetcher.wait(1, block=False)
+    prefetcher.wait(2)
+    assert warmed == [2]
+
+
+def test_memo_cache_recomputes_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(concurrency.time, "monotonic", lambda: now[0])
+    cache = MemoCache(ttl=10)
+    computed = []
+
+    def compute():
+        computed.append(1)
+        return len(computed)
+
+    assert cache.get("album", compute) == 1
+    now[0] += 9
+    assert cache.get("album", compute) == 1
+    now[0] += 2
+    assert cache.get("album", compute) == 2
+    assert cache.stats() == {"hits": 1, "misses": 2, "size": 1}
+
+
+def test_memo_cache_evicts_least_recently_used():
+    cache = MemoCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a", lambda: None)
+    cache.put("c", 3)
+
+    assert cache.get("a", lambda: "recomputed") == 1
+    assert cache.get("b", lambda: "recomputed") == "recomputed"
+
+
+def test_memo_cache_can_skip_none_results():
+    cache = MemoCache(cache_none=False)
+    answers = iter([None, "found"])
+
+    assert cache.get("album", lambda: next(answers)) is None
+    assert cache.get("album", lambda: next(answers)) == "found"
+
+
+def test_memo_cache_computes_once_for_concurrent_callers():
+    cache = MemoCache()
+    started, release = threading.Event(), threading.Event()
+    computed = []
+
+    def compute():
+        computed.append(1)
+        started.set()
+        release.wait(5)
+        return "album"
+
+    first = threading.Thread(target=cache.get, args=("album", compute))
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=cache.get, args=("album", compute))
+    second.start()
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    assert computed == [1]
+
+
+def test_key_lock_waiter_keeps_a_newer_lock():
+    locks = KeyLocks()
+    entered, leave = threading.Event(), threading.Event()
+
+    def waiter():
+        with locks.hold("album"):
+            entered.set()
+            leave.wait(5)
+
+    with locks.hold("album"):
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        # Let the waiter pick up this lock before it is dropped
+        time.sleep(0.1)
+    entered.wait(5)
+
+    # A newer caller gets a fresh lock while the waiter still holds the old one
+    with locks.hold("album"):
+        leave.set()
+        thread.join(5)
+        assert "album" in locks._KeyLocks__locks
+    assert "album" not in locks._KeyLocks__locks
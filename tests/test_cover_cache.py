@@ -0,0 +1,22 @@
+from deezspot.deezloader import dee_api
+from deezspot.deezloader.dee_api import API
+from deezspot.libutils.cover_cache import configure_cover_cache
+
+JPEG = b"\xff\xd8\xff\xe0" + bytes(64)
+
+
+class FakeResponse:
+    content = JPEG
+
+
+def test_album_and_track_covers_are_fetched_once(tmp_path, monkeypatch):
+    configure_cover_cache(directory=str(tmp_path))
+    fetched = []
+    monkeypatch.setattr(dee_api, "req_get", lambda url: fetched.append(url) or FakeResponse())
+
+    album_cover = API.choose_img("abc")
+    track_covers = [API.choose_img("abc") for _ in range(3)]
+
+    assert track_covers == [album_cover] * 3
+    assert len(fetched) == 1
+    assert "/1400x1400-" in fetched[0]
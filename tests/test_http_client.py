@@ -0,0 +1,58 @@
+import pytest
+import requests
+
+from deezspot.libutils import http_client
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(http_client.time, "sleep", lambda delay: None)
+
+
+def test_adapter_does_not_retry_post():
+    retries = http_client.create_adapter().max_retries
+    assert "POST" not in retries.allowed_methods
+    assert "GET" in retries.allowed_methods
+
+
+def test_read_only_request_is_retried_on_server_errors():
+    answers = [FakeResponse(503), FakeResponse(429, {"Retry-After": "1"}), FakeResponse(200)]
+    sent = []
+
+    def send():
+        sent.append(answers[len(sent)])
+        return sent[-1]
+
+    assert http_client.send_idempotent(send).status_code == 200
+    assert [response.closed for response in sent] == [True, True, False]
+
+
+def test_read_only_request_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setitem(http_client._CONFIG, "max_retries", 2)
+    calls = []
+
+    def send():
+        calls.append(1)
+        raise requests.ConnectionError("down")
+
+    with pytest.raises(requests.ConnectionError):
+        http_client.send_idempotent(send)
+    assert len(calls) == 3
+
+
+def test_pool_stats_include_sessions_with_their_own_cookies():
+    session = http_client.mount_adapter(requests.Session())
+    session.get_adapter("https://gw.example/").poolmanager.connection_from_url("https://gw.example/")
+
+    assert "https://gw.example:443" in http_client.pool_stats()["pools"]
+    assert http_client._count_response in session.hooks["response"]
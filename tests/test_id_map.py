@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+
+import pytest
+
+import deezspot.deezloader as deezloader
+from deezspot.deezloader import DeeLogin
+from deezspot.exceptions import NoDataApi, QuotaExceeded
+from deezspot.libutils import id_map
+from deezspot.libutils.id_map import IdMap
+
+QUOTA = {"error": {"type": "Exception", "message": "Quota limit exceeded", "code": 4}}
+NO_DATA = {"error": {"type": "DataException", "message": "no data", "code": 800}}
+
+
+def spotify_track(spotify_id, isrc, name="Song", number=1):
+    return {
+        "id": spotify_id, "name": name, "track_number": number,
+        "artists": [{"name": "Artist"}], "album": {"name": "Album"},
+        "external_ids": {"isrc": isrc},
+    }
+
+
+def deezer_track(deezer_id, isrc, name="Song", number=1):
+    return {"id": deezer_id, "title": name, "isrc": isrc, "track_position": number, "album": {"title": "Album"}}
+
+
+def test_id_map_keeps_matches_and_recent_misses():
+    mapping = IdMap(":memory:", miss_ttl=60)
+    mapping.put_many("track", [("s1", 11, "AAA"), ("s2", None, "BBB")])
+
+    assert mapping.get_many("track", ["s1", "s2", "s3"]) == {"s1": "11", "s2": None}
+    assert mapping.get("album", "s1") == (False, None)
+
+
+def test_id_map_forgets_expired_misses():
+    mapping = IdMap(":memory:", miss_ttl=0)
+    mapping.put_many("track", [("s1", 11, "AAA"), ("s2", None, "BBB")])
+
+    assert mapping.get_many("track", ["s1", "s2"]) == {"s1": "11"}
+
+
+@pytest.fixture
+def converter(monkeypatch):
+    id_map.configure_id_map(":memory:")
+    monkeypatch.setattr(deezloader, "_QUOTA_BACKOFF", 0)
+    return object.__new__(DeeLogin)
+
+
+def patch_api(monkeypatch, tracks, search):
+    monkeypatch.setattr(deezloader.API, "get_track_json", lambda query: tracks.get(query, NO_DATA))
+    monkeypatch.setattr(deezloader.API, "search_tracks_raw", lambda query, limit=25: search(query))
+
+
+def no_results(query):
+    raise NoDataApi(query)
+
+
+def test_matches_are_stored_and_reused(monkeypatch, converter):
+    patch_api(monkeypatch, {"isrc:AAA": deezer_track(1, "AAA")}, no_results)
+    links = converter.convert_spoty_tracks_to_dee([spotify_track("s1", "AAA"), spotify_track("s2", "ZZZ")])
+
+    assert links == {"s1": "https://www.deezer.com/track/1", "s2": None}
+    # A genuine empty result is a conclusive miss
+    assert id_map.get_id_map().get_many("track", ["s1", "s2"]) == {"s1": "1", "s2": None}
+
+    patch_api(monkeypatch, {}, lambda query: pytest.fail("looked up again"))
+    assert converter.convert_spoty_tracks_to_dee(["s1"]) == {"s1": "https://www.deezer.com/track/1"}
+
+
+def test_quota_error_on_search_is_not_a_miss(monkeypatch, converter):
+    def quota(query):
+        raise QuotaExceeded("quota")
+
+    patch_api(monkeypatch, {}, quota)
+    assert converter.convert_spoty_tracks_to_dee([spotify_track("s1", "AAA")]) == {"s1": None}
+    assert id_map.get_id_map().get_many("track", ["s1"]) == {}
+
+
+def test_quota_error_on_candidate_is_not_a_miss(monkeypatch, converter):
+    patch_api(monkeypatch, {"9": QUOTA}, lambda query: [{"id": 9, "title": "Song"}])
+    assert converter.convert_spoty_tracks_to_dee([spotify_track("s1", "AAA")]) == {"s1": None}
+    assert id_map.get_id_map().get_many("track", ["s1"]) == {}
+
+
+def test_quota_error_is_waited_out(monkeypatch, converter):
+    answers = [QUOTA, deezer_track(1, "AAA")]
+    monkeypatch.setattr(deezloader.API, "get_track_json", lambda query: answers.pop(0))
+    monkeypatch.setattr(deezloader.API, "search_tracks_raw", lambda query, limit=25: no_results(query))
+
+    assert converter.convert_spoty_tracks_to_dee([spotify_track("s1", "AAA")]) == {"s1": "https://www.deezer.com/track/1"}
+
+
+def test_quota_backoff_is_shared_by_concurrent_lookups(monkeypatch):
+    clock = [100.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(deezloader, "time", SimpleNamespace(monotonic=lambda: clock[0], sleep=sleep))
+    monkeypatch.setattr(deezloader, "_quota_resume_at", 0.0)
+
+    deezloader._quota_back_off(0)
+    clock[0] += 2
+    # A second lookup hitting the quota joins the open window
+    deezloader._quota_back_off(0)
+
+    assert deezloader._deezer_call(lambda: "answer") == "answer"
+    assert sleeps == [deezloader._QUOTA_BACKOFF - 2]
@@ -0,0 +1,145 @@
+import pytest
+
+from deezspot.deezloader import cdn_selector, media_resolver as resolver_module
+from deezspot.deezloader import __download__ as download_module
+from deezspot.deezloader.deegw_api import API_GW
+from deezspot.deezloader.media_resolver import MediaResolver, NEGATIVE_TTL, media_format
+from deezspot.exceptions import MediaUrlExpired, TrackNotFound
+
+FAR_EXPIRY = 4_000_000_000
+
+
+def track(token, **filesizes):
+    return {"TRACK_TOKEN": token, **{f"FILESIZE_{quality}": size for quality, size in filesizes.items()}}
+
+
+def media(c_format, url="https://e-cdns-proxy-0.dzcdn.net/a"):
+    return {"media": [{"format": c_format, "exp": FAR_EXPIRY, "sources": [{"url": url}]}]}
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Records every get_medias_url call; answers come from calls.answer(token, formats)."""
+    class Calls(list):
+        answer = staticmethod(lambda token, formats: media(formats if isinstance(formats, str) else formats[0]))
+
+    recorded = Calls()
+
+    def get_medias_url(tokens, formats):
+        recorded.append((list(tokens), formats))
+        return [recorded.answer(token, formats) for token in tokens]
+
+    monkeypatch.setattr(API_GW, "get_medias_url", get_medias_url)
+    return recorded
+
+
+def test_answers_are_cached_per_quality(calls):
+    resolver = MediaResolver()
+    tracks = [track("t1"), track("t2")]
+
+    first = resolver.get(tracks, "MP3_320")
+    second = resolver.get(tracks, "MP3_320")
+
+    assert first == second
+    assert len(calls) == 1
+    resolver.get(tracks, "FLAC")
+    assert len(calls) == 2
+
+
+def test_tracks_are_sent_in_chunks(calls):
+    resolver = MediaResolver(chunk_size=2)
+    resolver.get([track(f"t{i}") for i in range(5)], "MP3_320")
+
+    assert sorted(len(tokens) for tokens, _ in calls) == [1, 2, 2]
+
+
+def test_invalidate_forgets_a_token(calls):
+    resolver = MediaResolver()
+    resolver.get([track("t1"), track("t2")], "MP3_320")
+    resolver.invalidate("t1")
+    resolver.get([track("t1"), track("t2")], "MP3_320")
+
+    assert calls[-1][0] == ["t1"]
+
+
+def test_unavailable_answers_expire_sooner(calls, monkeypatch):
+    calls.answer = lambda token, formats: {"media": []}
+    resolver = MediaResolver()
+    now = 1000.0
+    monkeypatch.setattr(resolver_module.time, "time", lambda: now)
+    resolver.get([track("t1")], "FLAC")
+
+    now += NEGATIVE_TTL - 1
+    resolver.get([track("t1")], "FLAC")
+    assert len(calls) == 1
+
+    now += 2
+    resolver.get([track("t1")], "FLAC")
+    assert len(calls) == 2
+
+
+def test_expired_url_is_reported_as_such(monkeypatch):
+    monkeypatch.setattr(cdn_selector.host_scores, "rank", lambda urls: urls)
+
+    tried = []
+
+    def refuse(url):
+        tried.append(url)
+        raise MediaUrlExpired(url)
+
+    with pytest.raises(MediaUrlExpired):
+        cdn_selector.race_sources(["https://cdn.example/a", "https://cdn2.example/a"], refuse, stagger=0)
+    assert tried == ["https://cdn.example/a"]
+
+    def missing(url):
+        raise TrackNotFound(url)
+
+    with pytest.raises(TrackNotFound) as error:
+        cdn_selector.race_sources(["https://cdn.example/a"], missing, stagger=0)
+    assert not isinstance(error.value, MediaUrlExpired)
+
+
+def test_ladder_answer_is_cached_under_its_format(calls):
+    calls.answer = lambda token, formats: media("MP3_320")
+    resolver = MediaResolver()
+    tracks = [track("t1")]
+
+    negotiated = resolver.resolve_ladder(tracks, "FLAC")
+
+    assert media_format(negotiated[0]) == "MP3_320"
+    assert resolver.get(tracks, "MP3_320") == negotiated
+    assert resolver.get(tracks, "FLAC") == [{"media": []}]
+    assert len(calls) == 1
+
+
+def test_album_media_is_resolved_in_resolver_chunks(calls, monkeypatch):
+    monkeypatch.setattr(download_module, "media_resolver", MediaResolver())
+    tracks = [track(f"t{i}") for i in range(60)]
+
+    download_module.Download_JOB.resolve_media(tracks, "MP3_320")
+
+    assert sorted(len(tokens) for tokens, _ in calls) == [10, 25, 25]
+    assert all(media_format(c_track["media_url"]) == "MP3_320" for c_track in tracks)
+
+
+def test_ladder_without_media_caches_nothing(calls):
+    calls.answer = lambda token, formats: {"media": []}
+    resolver = MediaResolver()
+    tracks = [track("t1")]
+
+    assert resolver.resolve_ladder(tracks, "FLAC") == [{"media": []}]
+    resolver.resolve_ladder(tracks, "FLAC")
+    resolver.get(tracks, "MP3_128")
+
+    assert len(calls) == 3
+
+
+def test_ladder_caches_nothing_below_the_returned_format(calls):
+    calls.answer = lambda token, formats: media("MP3_320")
+    resolver = MediaResolver()
+    tracks = [track("t1")]
+    resolver.resolve_ladder(tracks, "FLAC")
+
+    calls.answer = lambda token, formats: media("MP3_128")
+    assert media_format(resolver.get(tracks, "MP3_128")[0]) == "MP3_128"
+    assert len(calls) == 2
@@ -0,0 +1,169 @@
+import json
+import os
+
+import pytest
+import requests
+from Crypto.Cipher import AES
+from Crypto.Util import Counter
+
+from deezspot.deezloader import __download_utils__ as download_utils
+from deezspot.libutils.library_index import configure_library_index
+
+KEY = "00112233445566778899aabbccddeeff"
+NONCE = "0102030405060708090a0b0c0d0e0f10"
+IDS = {"track_id": "3135556", "encryption_type": "aes", "key": KEY, "nonce": NONCE}
+WINDOW = 6144 * 256
+
+
+def encrypt(data):
+    counter = Counter.new(128, initial_value=int(NONCE, 16))
+    return AES.new(bytes.fromhex(KEY), AES.MODE_CTR, counter=counter).encrypt(data)
+
+
+class FakeStream:
+    """Encrypted file served from `start`, optionally breaking after fail_after bytes."""
+
+    def __init__(self, crypted, start=0, fail_after=None):
+        self.crypted = crypted
+        self.start = start
+        self.total_size = len(crypted)
+        self.fail_after = fail_after
+
+    def iter_content(self, chunk_size=2048):
+        sent = 0
+        for pos in range(self.start, len(self.crypted), chunk_size):
+            if self.fail_after is not None and sent >= self.fail_after:
+                raise requests.ConnectionError("connection reset")
+            chunk = self.crypted[pos:pos + chunk_size]
+            sent += len(chunk)
+            yield chunk
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def memory_index():
+    configure_library_index(":memory:")
+
+
+def opener(crypted, calls, fail_after=None):
+    def open_stream(offset):
+        calls.append(offset)
+        # Only the first attempt breaks
+        return FakeStream(crypted, offset, fail_after if len(calls) == 1 else None)
+    return open_stream
+
+
+def leave_part(song_path, data, quality):
+    """Run a download that breaks after three windows, leaving its .part and sidecar."""
+    with pytest.raises(requests.ConnectionError):
+        download_utils.decryptfile_resumable(
+            opener(encrypt(data), [], fail_after=3 * WINDOW), IDS, song_path,
+            max_resumes=0, quality=quality
+        )
+    with open(f"{song_path}.part.json") as f:
+        return json.load(f)
+
+
+def test_broken_transfer_resumes_from_checkpoint(tmp_path):
+    data = os.urandom(5 * WINDOW + 1234)
+    song_path = str(tmp_path / "song.mp3")
+    calls = []
+
+    download_utils.decryptfile_resumable(
+        opener(encrypt(data), calls, fail_after=3 * WINDOW), IDS, song_path, quality="MP3_320"
+    )
+
+    assert calls[0] == 0 and calls[1] > 0
+    with open(song_path, "rb") as f:
+        assert f.read() == data
+    assert not os.path.exists(f"{song_path}.part.json")
+
+
+def test_sidecar_records_quality_and_size_only(tmp_path):
+    data = os.urandom(5 * WINDOW)
+    state = leave_part(str(tmp_path / "song.mp3"), data, "MP3_320")
+
+    assert state["quality"] == "MP3_320"
+    assert state["file_size"] == len(data)
+    assert set(state) == {"track_id", "encryption_type", "quality", "file_size", "offset", "header_size"}
+
+
+def test_part_of_another_quality_is_not_resumed(tmp_path):
+    song_path = str(tmp_path / "song.mp3")
+    leave_part(song_path, os.urandom(5 * WINDOW), "MP3_128")
+
+    data = os.urandom(4 * WINDOW + 77)
+    calls = []
+    download_utils.decryptfile_resumable(opener(encrypt(data), calls), IDS, song_path, quality="MP3_320")
+
+    assert calls == [0]
+    with open(song_path, "rb") as f:
+        assert f.read() == data
+
+
+def test_source_of_another_size_restarts(tmp_path):
+    song_path = str(tmp_path / "song.mp3")
+    leave_part(song_path, os.urandom(5 * WINDOW), "MP3_320")
+
+    data = os.urandom(6 * WINDOW)
+    calls = []
+    download_utils.decryptfile_resumable(opener(encrypt(data), calls), IDS, song_path, quality="MP3_320")
+
+    assert calls[0] > 0 and calls[1] == 0
+    with open(song_path, "rb") as f:
+        assert f.read() == data
+
+
+def test_failure_that_cannot_resume_drops_the_part(tmp_path):
+    song_path = str(tmp_path / "song.mp3")
+    leave_part(song_path, os.urandom(5 * WINDOW), "MP3_320")
+
+    class CorruptStream(FakeStream):
+        def iter_content(self, chunk_size=2048):
+            raise ValueError("corrupt stream")
+
+    with pytest.raises(ValueError):
+        download_utils.decryptfile_resumable(
+            lambda offset: CorruptStream(b"", offset), IDS, song_path, quality="MP3_320"
+        )
+
+    assert not os.path.exists(f"{song_path}.part")
+    assert not os.path.exists(f"{song_path}.part.json")
+
+
+@pytest.fixture
+def process_pool():
+    from deezspot.deezloader import decrypt_pool
+
+    pool = decrypt_pool.enable_process_decryption(processes=1, window_size=WINDOW)
+    yield pool
+    decrypt_pool.disable_process_decryption()
+
+
+def test_process_pool_keeps_tags_and_resumes(tmp_path, process_pool):
+    from deezspot.libutils.write_tags import ID3Header
+
+    data = os.urandom(5 * WINDOW + 1234)
+    song_path = str(tmp_path / "song.mp3")
+    tag_header = ID3Header(b"tags" * 8)
+    calls = []
+
+    download_utils.decryptfile_resumable(
+        opener(encrypt(data), calls, fail_after=3 * WINDOW), IDS, song_path,
+        tag_header=tag_header, quality="MP3_320"
+    )
+
+    assert calls[0] == 0 and calls[1] > 0
+    with open(song_path, "rb") as f:
+        assert f.read() == b"tags" * 8 + data
+    assert tag_header.applied
+    assert not os.path.exists(f"{song_path}.part.json")
+
+
+def test_process_pool_leaves_a_resumable_checkpoint(tmp_path, process_pool):
+    song_path = str(tmp_path / "song.mp3")
+    state = leave_part(song_path, os.urandom(5 * WINDOW), "MP3_320")
+
+    assert state["offset"] > 0 and state["offset"] % 6144 == 0
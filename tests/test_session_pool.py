@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+
+pytest.importorskip("librespot.core")
+
+from deezspot.spotloader.session_pool import SessionPool
+
+
+class FakeSession:
+    def __init__(self, valid=True):
+        self.valid = valid
+        self.closed = False
+
+    def is_valid(self):
+        return self.valid
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(session, size=1):
+    pool = SessionPool("unused-credentials.json", size=size, session=session)
+    builds = []
+
+    def build():
+        builds.append(1)
+        if pool.fail_builds:
+            raise ConnectionError("login failed")
+        return FakeSession()
+
+    pool.fail_builds = False
+    pool._SessionPool__build_session = build
+    return pool, builds
+
+
+def acquire_with_timeout(pool, timeout=2):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("session", pool.acquire()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "acquire() blocked"
+    return result["session"]
+
+
+def test_released_session_is_reused():
+    pool, builds = make_pool(FakeSession(), size=2)
+    session = pool.acquire()
+    pool.release(session)
+    assert acquire_with_timeout(pool) is session
+    assert builds == [1]
+
+
+def test_primary_session_is_never_leased():
+    primary = FakeSession()
+    pool, builds = make_pool(primary, size=2)
+
+    leased = [pool.acquire(), acquire_with_timeout(pool)]
+
+    assert primary not in leased
+    assert pool.primary is primary
+
+
+def test_dead_session_is_rebuilt_in_place():
+    pool, builds = make_pool(FakeSession())
+    session = pool.acquire()
+    session.valid = False
+    pool.release(session)
+
+    rebuilt = acquire_with_timeout(pool)
+    assert rebuilt is not session and session.closed
+    pool.release(rebuilt)
+    assert acquire_with_timeout(pool) is rebuilt
+
+
+def test_dead_primary_is_rebuilt():
+    dead = FakeSession(valid=False)
+    pool, builds = make_pool(dead)
+
+    pool.fail_builds = True
+    with pytest.raises(ConnectionError):
+        pool.primary
+
+    pool.fail_builds = False
+    primary = pool.primary
+    assert isinstance(primary, FakeSession) and primary.valid and dead.closed
+    assert pool.primary is primary
+
+
+def test_failed_rebuild_gives_the_slot_back():
+    pool, builds = make_pool(FakeSession())
+    dead = pool.acquire()
+    dead.valid = False
+    pool.release(dead)
+
+    pool.fail_builds = True
+    with pytest.raises(ConnectionError):
+        pool.acquire()
+
+    # The slot of the dead session is free again: a later acquire opens a new session
+    pool.fail_builds = False
+    session = acquire_with_timeout(pool)
+    assert isinstance(session, FakeSession) and session is not dead
+
+
+def test_failed_fresh_build_gives_the_slot_back():
+    pool, builds = make_pool(FakeSession(), size=2)
+    held = pool.acquire()
+
+    pool.fail_builds = True
+    with pytest.raises(ConnectionError):
+        pool.acquire()
+
+    pool.fail_builds = False
+    assert acquire_with_timeout(pool) is not held
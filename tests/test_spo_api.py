@@ -0,0 +1,75 @@
+import pytest
+
+from deezspot.spotloader import __spo_api__ as spo_api
+
+
+def test_album_json_is_fetched_once_and_failures_are_retried(monkeypatch):
+    spo_api.clear_album_cache()
+    answers = {"a1": [None, {"id": "a1"}]}
+    fetched = []
+
+    def get_album(album_id):
+        fetched.append(album_id)
+        return answers[album_id].pop(0)
+
+    monkeypatch.setattr(spo_api.Spo, "get_album", get_album)
+
+    assert spo_api.cached_album("a1") is None
+    assert spo_api.cached_album("a1") == {"id": "a1"}
+    assert spo_api.cached_album("a1") == {"id": "a1"}
+    assert fetched == ["a1", "a1"]
+
+
+def album_json(album_id, items):
+    return {"id": album_id, "tracks": {"items": items}}
+
+
+def test_album_track_index_numbers_tracks_per_disc():
+    album = album_json("a2", [
+        {"id": "t1", "disc_number": 1},
+        {"id": "t2", "disc_number": 1},
+        None,
+        {"id": "t3", "disc_number": 2},
+        {"id": "t1", "disc_number": 2},
+    ])
+
+    positions, total_discs = spo_api.album_track_index(album)
+
+    assert positions == {"t1": (1, 1), "t2": (1, 2), "t3": (2, 1)}
+    assert total_discs == 2
+
+
+def test_album_track_index_is_built_once_per_track_list(monkeypatch):
+    spo_api.clear_album_cache()
+    built = []
+    build = spo_api._build_album_index
+    monkeypatch.setattr(spo_api, "_build_album_index", lambda album: built.append(1) or build(album))
+    partial = album_json("a3", [{"id": "t1", "disc_number": 1}])
+    full = album_json("a3", [{"id": "t1", "disc_number": 1}, {"id": "t2", "disc_number": 1}])
+
+    spo_api.album_track_index(partial)
+    spo_api.album_track_index(partial)
+    positions, _ = spo_api.album_track_index(full)
+
+    assert len(built) == 2
+    assert positions["t2"] == (1, 2)
+
+
+def test_tracking_batch_shares_albums_with_the_album_cache(monkeypatch):
+    spo_api.clear_album_cache()
+    requested = []
+
+    def get_albums(ids, market=None):
+        requested.append(list(ids))
+        return {"albums": [album_json(album_id, [{"id": f"{album_id}-t", "disc_number": 1}]) for album_id in ids]}
+
+    monkeypatch.setattr(spo_api.Spo, "get_albums", get_albums)
+    monkeypatch.setattr(spo_api.Spo, "get_album", lambda album_id: pytest.fail("fetched again"))
+    spo_api._ALBUM_JSON_CACHE.put("a1", album_json("a1", [{"id": "a1-t", "disc_number": 1}]))
+    tracks = [{"id": f"{album_id}-t", "name": "Song", "album": {"id": album_id}} for album_id in ("a1", "a2")]
+
+    results = spo_api.tracking_batch(tracks)
+
+    assert requested == [["a2"]]
+    assert all(results[track["id"]] is not None for track in tracks)
+    assert spo_api.cached_album("a2")["id"] == "a2"
@@ -0,0 +1,68 @@
+import struct
+
+from deezspot.libutils.library_index import configure_library_index
+from deezspot.libutils.write_tags import FLACHeader, TagHeader, count_tag_writes, tag_write_stats
+
+VORBIS_COMMENT, PICTURE, PADDING = 4, 6, 1
+
+
+def block(block_type, payload, last=False):
+    return struct.pack(">I", len(payload) | ((block_type | (0x80 if last else 0)) << 24)) + payload
+
+
+def blocks_of(data):
+    position, found = 4, []
+    while True:
+        header = data[position]
+        length = int.from_bytes(data[position + 1:position + 4], "big")
+        found.append((header & 0x7f, data[position + 4:position + 4 + length]))
+        if header & 0x80:
+            return found
+        position += 4 + length
+
+
+def test_base_header_leaves_the_stream_alone():
+    assert TagHeader(0).splice(b"anything") is None
+
+
+def test_flac_header_replaces_the_stream_tags(tmp_path):
+    configure_library_index(":memory:")
+    stream = (
+        b"fLaC" + block(0, bytes(34))
+        + block(VORBIS_COMMENT, b"stale comment")
+        + block(PICTURE, b"stale picture", last=True)
+        + b"\xff\xf8audio"
+    )
+    header = FLACHeader([(VORBIS_COMMENT, b"fresh"), (PADDING, bytes(16))])
+    head = header.splice(stream[:42])
+    path = tmp_path / "track.flac"
+    path.write_bytes(head + stream[42:])
+
+    header.commit(str(path))
+
+    data = path.read_bytes()
+    assert blocks_of(data) == [
+        (0, bytes(34)),
+        (VORBIS_COMMENT, b"fresh"),
+        (PADDING, bytes(16)),
+        (PADDING, bytes(len(b"stale comment"))),
+        (PADDING, bytes(len(b"stale picture"))),
+    ]
+    assert data.endswith(b"\xff\xf8audio")
+    assert b"stale" not in data
+
+
+def test_tag_writes_are_counted_only_when_enabled(tmp_path):
+    configure_library_index(":memory:")
+    path = str(tmp_path / "track.mp3")
+
+    TagHeader(0).commit(path)
+    assert tag_write_stats()["writes"] == 0
+
+    count_tag_writes()
+    try:
+        TagHeader(0).commit(path)
+        TagHeader(0).commit(path)
+        assert tag_write_stats(reset=True) == {"writes": 2, "files": 1, "rewritten": {path: 2}}
+    finally:
+        count_tag_writes(False)